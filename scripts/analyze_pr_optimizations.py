@@ -3,25 +3,36 @@
 Analyze PR optimizations to identify duplicates and best implementations
 """
 
+import argparse
+import difflib
+import os
 import subprocess
 import sys
 from pathlib import Path
 from collections import defaultdict
 import concurrent.futures
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from git_batch import get_repo
+from mql5_analyzer import analyze_source
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 EA_FILE = REPO_ROOT / "mt5" / "MQL5" / "Experts" / "SMC_TrendBreakout_MTF_EA.mq5"
 
+# Priority PRs analyzed when none are given on the command line
+PRIORITY_PRS = [78, 76, 75, 74, 73, 72, 71, 70, 69, 65, 62, 58, 57, 56, 54, 52]
+
 
-def run_git_command(cmd):
+def run_git_command(cmd, timeout=30, root=REPO_ROOT):
     """Run a git command."""
     try:
         result = subprocess.run(
             ["git"] + cmd,
-            cwd=REPO_ROOT,
+            cwd=root,
             capture_output=True,
             text=True,
-            timeout=30,
+            timeout=timeout,
             encoding='utf-8',
             errors='replace'
         )
@@ -31,17 +42,47 @@ def run_git_command(cmd):
         return None
 
 
-def fetch_pr(pr_number):
-    """Fetch a PR branch."""
-    branch_name = f"pr-{pr_number}"
-    result = run_git_command(["fetch", "origin", f"pull/{pr_number}/head:{branch_name}"])
-    return branch_name if result is not None else None
+def list_pr_heads(pr_numbers, root=REPO_ROOT):
+    """Head commit of each PR on origin, from one ls-remote call."""
+    if not pr_numbers:
+        return {}
+    out = run_git_command(["ls-remote", "origin", *[f"refs/pull/{n}/head" for n in pr_numbers]], timeout=120, root=root)
+    heads = {}
+    for line in (out or "").splitlines():
+        oid, _, ref = line.partition("\t")
+        parts = ref.split("/")
+        if len(parts) == 4 and parts[3] == "head" and parts[2].isdigit():
+            heads[int(parts[2])] = oid
+    return heads
+
+
+def fetch_prs(pr_numbers, root=REPO_ROOT):
+    """
+    Make the head commit of every PR available locally with a single fetch.
 
+    Nothing is written to the branch namespace: PR heads are addressed by
+    commit id, and heads that are already present are not fetched again.
+    Returns {pr_number: head_oid} for the PRs that are available.
+    """
+    repo = get_repo(Path(root))
+    heads = list_pr_heads(pr_numbers, root)
+    missing = [n for n, oid in heads.items() if repo.resolve(oid) is None]
+    if missing:
+        run_git_command(["fetch", "--no-tags", "origin", *[f"refs/pull/{n}/head" for n in missing]], timeout=600, root=root)
+    return {n: oid for n, oid in heads.items() if repo.resolve(oid) is not None}
 
-def get_pr_diff(pr_number, branch_name):
-    """Get diff for a PR."""
-    diff = run_git_command(["diff", "main.." + branch_name, "--", str(EA_FILE.relative_to(REPO_ROOT))])
-    return diff
+
+def unified_diff(base, head, path):
+    """Unified diff between two versions of a file (bytes or None), or None if neither exists."""
+    if base is None and head is None:
+        return None
+    diff = difflib.unified_diff(
+        (base or b"").decode("utf-8", "replace").splitlines(keepends=True),
+        (head or b"").decode("utf-8", "replace").splitlines(keepends=True),
+        fromfile=f"a/{path}",
+        tofile=f"b/{path}",
+    )
+    return "".join(diff)
 
 
 def analyze_optimization(diff_text):
@@ -81,56 +122,86 @@ def analyze_optimization(diff_text):
     return optimizations
 
 
-def process_pr(pr_num):
-    """Fetch and analyze a single PR. Returns tuple (pr_num, data, success)."""
-    try:
-        branch = fetch_pr(pr_num)
-        if branch:
-            diff = get_pr_diff(pr_num, branch)
-            analysis = analyze_optimization(diff)
-            data = {
-                "branch": branch,
-                "analysis": analysis,
-                "diff": diff[:500] if diff else None  # First 500 chars
-            }
-            return pr_num, data, True
-        else:
-            return pr_num, None, False
-    except Exception as e:
-        return pr_num, None, False
+def process_pr(pr_num, head, base_source, head_source, base_findings):
+    """
+    Diff and analyze one PR. Runs in a worker process, so it only gets file
+    contents and never touches git. Returns tuple (pr_num, data).
+    """
+    path = EA_FILE.relative_to(REPO_ROOT).as_posix()
+    diff = unified_diff(base_source, head_source, path)
+    analysis = analyze_optimization(diff)
+    if head_source is not None:
+        # Hot-path findings the PR leaves in (or adds to) the EA, vs. the base
+        findings = analyze_source(head_source.decode("utf-8", "replace"), path)
+        analysis["hot_path_findings"] = len(findings)
+        analysis["hot_path_delta"] = len(findings) - base_findings
+    data = {
+        "head": head,
+        "analysis": analysis,
+        "diff": diff[:500] if diff else None  # First 500 chars
+    }
+    return pr_num, data
+
+
+def analyze_prs(pr_numbers, base="main", jobs=None, root=REPO_ROOT):
+    """
+    Fetch all PRs at once, read the EA at each head through one cat-file
+    process and analyze them in a process pool. Yields (pr_num, data) as
+    each PR completes; data is None for PRs that could not be fetched.
+    """
+    repo = get_repo(Path(root))
+    if repo.resolve(base) is None and repo.resolve(f"origin/{base}") is not None:
+        base = f"origin/{base}"
+    heads = fetch_prs(pr_numbers, root)
+    for pr_num in pr_numbers:
+        if pr_num not in heads:
+            yield pr_num, None
+
+    path = EA_FILE.relative_to(REPO_ROOT).as_posix()
+    base_source = repo.show(base, path)
+    base_findings = len(analyze_source(base_source.decode("utf-8", "replace"), path)) if base_source else 0
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        futures = [
+            executor.submit(process_pr, pr_num, oid, base_source, repo.show(oid, path), base_findings)
+            for pr_num, oid in heads.items()
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
 
 
 def main():
     """Main analysis function."""
+    parser = argparse.ArgumentParser(description="Analyze PR optimizations to identify duplicates")
+    parser.add_argument("prs", nargs="*", type=int, help="PR numbers (default: the priority list)")
+    parser.add_argument("--open", action="store_true", help="Analyze every open PR in the local PR cache (pr_cache.py)")
+    parser.add_argument("--base", default="main", help="Base revision to diff against (default: main)")
+    parser.add_argument("--jobs", type=int, help="Analysis worker processes (default: CPU count)")
+    args = parser.parse_args()
+
     print("=" * 80)
     print("PR OPTIMIZATION ANALYSIS")
     print("=" * 80)
     print()
     
-    # Priority PRs to analyze
-    priority_prs = [78, 76, 75, 74, 73, 72, 71, 70, 69, 65, 62, 58, 57, 56, 54, 52]
+    priority_prs = args.prs or PRIORITY_PRS
+    if args.open:
+        from pr_cache import PRCache
+        with PRCache() as cache:
+            priority_prs = [pr["number"] for pr in cache.prs(state="OPEN")]
     
     print(f"Analyzing {len(priority_prs)} priority PRs...")
     print()
     
     pr_analyses = {}
     
-    # Use ThreadPoolExecutor for parallel processing
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-        # Submit all tasks
-        future_to_pr = {executor.submit(process_pr, pr_num): pr_num for pr_num in priority_prs}
-
-        for future in concurrent.futures.as_completed(future_to_pr):
-            pr_num = future_to_pr[future]
-            try:
-                pr_num, data, success = future.result()
-                if success:
-                    print(f"Fetching PR #{pr_num}... ✓")
-                    pr_analyses[pr_num] = data
-                else:
-                    print(f"Fetching PR #{pr_num}... ✗ Failed")
-            except Exception as exc:
-                print(f"Fetching PR #{pr_num} generated an exception: {exc}")
+    # Results are printed as they complete
+    for pr_num, data in analyze_prs(priority_prs, base=args.base, jobs=args.jobs):
+        if data is not None:
+            print(f"Analyzed PR #{pr_num} ({data['head'][:10]})... ✓")
+            pr_analyses[pr_num] = data
+        else:
+            print(f"Fetching PR #{pr_num}... ✗ Failed")
     
     print()
     print("=" * 80)
@@ -162,6 +233,8 @@ def main():
         for pr_num, data in prs:
             analysis = data['analysis']
             print(f"  PR #{pr_num}: {analysis['lines_changed']} lines changed")
+            if "hot_path_findings" in analysis:
+                print(f"    Hot-path findings: {analysis['hot_path_findings']} ({analysis['hot_path_delta']:+d} vs base)")
             if data['diff']:
                 # Show first few lines of diff
                 preview = data['diff'][:200].replace('\n', ' ')
@@ -199,11 +272,6 @@ def main():
     print("2. Merge best implementation")
     print("3. Close duplicates")
     print("4. Test merged optimization")
-    
-    # Cleanup branches
-    print("\nCleaning up temporary branches...")
-    for pr_num, data in pr_analyses.items():
-        run_git_command(["branch", "-D", data["branch"]])
 
 
 if __name__ == "__main__":
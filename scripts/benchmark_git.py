@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the git strategies used by the review scripts.
+
+Generates a synthetic repository (main history, remote-tracking branches of
+which a fraction is already merged, and refs/pull/N/head refs for PRs) with
+`git fast-import`, then times each strategy over several iterations after a
+warmup. Reports median and IQR per strategy and appends every run to a
+history file, so changes can be compared at realistic scale (1,000+
+branches) instead of from one run on the current checkout.
+
+Strategies:
+    branches/per-branch-rev-list   for-each-ref + one rev-list per branch (old review scripts)
+    branches/no-merged-rev-list    same, pre-filtered with --no-merged
+    branches/ahead-behind-atom     single for-each-ref with %(ahead-behind:) (git >= 2.41)
+    branches/git-batch             git_batch.GitBatch.branch_report
+    prs/per-pr-merge-base-diff     git merge-base + git diff per PR
+    prs/git-batch                  git_batch merge_bases + diff-tree --stdin
+
+Examples:
+    python scripts/benchmark_git.py --branches 1000 --prs 200
+    python scripts/benchmark_git.py --strategy branches/ --iterations 10
+    python scripts/benchmark_git.py --repo . --strategy branches/git-batch
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from git_batch import GitBatch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+REPO_CACHE_DIR = REPO_ROOT / ".cache" / "benchmark_repos"
+DEFAULT_HISTORY = REPO_ROOT / ".cache" / "benchmark_git_history.jsonl"
+BASE = "origin/main"
+
+
+class Unsupported(Exception):
+    """The strategy cannot run with this git version."""
+
+
+def git(repo, *args, check=True):
+    result = subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True)
+    if check and result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result
+
+
+# -- synthetic repositories ---------------------------------------------------
+
+def fast_import_stream(branches, commits, prs, merged_fraction, seed=0):
+    """
+    fast-import commands for: `commits` commits on origin/main; `branches`
+    branches under refs/remotes/origin/, the merged fraction pointing into
+    main's history and the rest carrying 1-3 commits of their own; and
+    refs/pull/N/head for `prs` of the unmerged branches.
+    """
+    rng = random.Random(seed)
+    lines = []
+    ts = 1_700_000_000
+    mark = 0
+
+    def commit(ref, parent, path, content):
+        nonlocal mark, ts
+        mark += 1
+        ts += 60
+        message = f"update {path}"
+        lines.extend([
+            f"commit {ref}",
+            f"mark :{mark}",
+            f"committer Bench <bench@example.com> {ts} +0000",
+            f"data {len(message)}",
+            message,
+        ])
+        if parent:
+            lines.append(f"from :{parent}")
+        lines.extend([f"M 644 inline {path}", f"data {len(content)}", content, ""])
+        return mark
+
+    main_marks = []
+    parent = None
+    for i in range(commits):
+        parent = commit(BASE.replace("origin/", "refs/remotes/origin/"), parent, f"src/file{i % 50}.txt", f"main {i}\n")
+        main_marks.append(parent)
+
+    unmerged = []
+    for b in range(branches):
+        ref = f"refs/remotes/origin/feature/branch-{b}"
+        base = rng.choice(main_marks)
+        if rng.random() < merged_fraction:
+            lines.extend([f"reset {ref}", f"from :{base}", ""])
+            continue
+        tip = base
+        for c in range(rng.randint(1, 3)):
+            tip = commit(ref, tip, f"features/branch{b}.txt", f"branch {b} change {c}\n")
+        unmerged.append(tip)
+
+    for n, tip in enumerate(rng.sample(unmerged, min(prs, len(unmerged))), start=1):
+        lines.extend([f"reset refs/pull/{n}/head", f"from :{tip}", ""])
+    return "\n".join(lines) + "\n"
+
+
+def make_synthetic_repo(path, branches=1000, commits=500, prs=100, merged_fraction=0.5, seed=0):
+    """Create a bare synthetic repository at `path` (which must not exist)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    git(path.parent, "init", "-q", "--bare", str(path))
+    stream = fast_import_stream(branches, commits, prs, merged_fraction, seed)
+    result = subprocess.run(["git", "fast-import", "--quiet"], cwd=path, input=stream, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"fast-import failed: {result.stderr.strip()}")
+    return path
+
+
+def synthetic_repo(params):
+    """Synthetic repository for these parameters, generated once and reused from .cache/."""
+    key = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    path = REPO_CACHE_DIR / key
+    if not (path / "HEAD").exists():
+        print(f"Generating synthetic repository ({params['branches']} branches, {params['commits']} commits, {params['prs']} PRs)...")
+        start = time.perf_counter()
+        make_synthetic_repo(path, **params)
+        print(f"✓ Generated in {time.perf_counter() - start:.1f}s: {path}")
+    return path
+
+
+# -- strategies ---------------------------------------------------------------
+
+def _remote_branches(repo, *extra):
+    out = git(repo, "for-each-ref", "--format=%(refname:short)", *extra, "refs/remotes/origin").stdout
+    return [name for name in out.split() if name not in (BASE, "origin/HEAD")]
+
+
+def _pr_refs(repo):
+    return git(repo, "for-each-ref", "--format=%(objectname)", "refs/pull").stdout.split()
+
+
+def per_branch_rev_list(repo):
+    counts = {}
+    for name in _remote_branches(repo):
+        out = git(repo, "rev-list", "--left-right", "--count", f"{BASE}...{name}").stdout.split()
+        counts[name] = (int(out[1]), int(out[0]))
+    return len(counts)
+
+
+def no_merged_rev_list(repo):
+    counts = {}
+    for name in _remote_branches(repo, "--no-merged", BASE):
+        out = git(repo, "rev-list", "--left-right", "--count", f"{BASE}...{name}").stdout.split()
+        counts[name] = (int(out[1]), int(out[0]))
+    return len(counts)
+
+
+def ahead_behind_atom(repo):
+    result = git(repo, "for-each-ref", f"--format=%(refname:short) %(ahead-behind:{BASE})", "refs/remotes/origin", check=False)
+    if result.returncode != 0:
+        raise Unsupported("%(ahead-behind:) needs git >= 2.41")
+    return len(result.stdout.splitlines())
+
+
+def git_batch_branches(repo):
+    with GitBatch(repo, use_cache=False) as batch:
+        return len(batch.branch_report(BASE))
+
+
+def per_pr_merge_base_diff(repo):
+    heads = _pr_refs(repo)
+    for oid in heads:
+        base = git(repo, "merge-base", BASE, oid).stdout.strip()
+        git(repo, "diff", base, oid)
+    return len(heads)
+
+
+def git_batch_prs(repo):
+    heads = _pr_refs(repo)
+    with GitBatch(repo, use_cache=False) as batch:
+        bases = batch.merge_bases(BASE, heads)
+        return len(batch.diffs([(bases[oid], oid) for oid in heads if oid in bases]))
+
+
+STRATEGIES = {
+    "branches/per-branch-rev-list": per_branch_rev_list,
+    "branches/no-merged-rev-list": no_merged_rev_list,
+    "branches/ahead-behind-atom": ahead_behind_atom,
+    "branches/git-batch": git_batch_branches,
+    "prs/per-pr-merge-base-diff": per_pr_merge_base_diff,
+    "prs/git-batch": git_batch_prs,
+}
+
+
+# -- measurement --------------------------------------------------------------
+
+def summarize(samples):
+    """Median and interquartile range of timing samples (seconds), in milliseconds."""
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        q1, median, q3 = statistics.quantiles(ordered, n=4, method="inclusive")
+    else:
+        q1 = median = q3 = ordered[0]
+    return {
+        "runs": len(ordered),
+        "median_ms": round(median * 1000, 3),
+        "iqr_ms": round((q3 - q1) * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def measure(func, repo, iterations=5, warmup=1):
+    """Run func(repo) `warmup` times untimed, then `iterations` timed runs."""
+    for _ in range(warmup):
+        func(repo)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        items = func(repo)
+        samples.append(time.perf_counter() - start)
+    result = summarize(samples)
+    result["items"] = items
+    return result
+
+
+def load_history(path):
+    entries = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return entries
+
+
+def previous_run(history, params):
+    """Most recent history entry benchmarked on the same repository parameters."""
+    for entry in reversed(history):
+        if entry.get("params") == params:
+            return entry
+    return None
+
+
+def append_history(path, entry):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the git strategies used by the review scripts")
+    parser.add_argument("--branches", type=int, default=1000, help="Remote branches in the synthetic repository")
+    parser.add_argument("--commits", type=int, default=500, help="Commits on main")
+    parser.add_argument("--prs", type=int, default=100, help="PR refs (refs/pull/N/head)")
+    parser.add_argument("--merged-fraction", type=float, default=0.5, help="Fraction of branches already merged")
+    parser.add_argument("--repo", type=Path, help="Benchmark an existing repository instead of a synthetic one")
+    parser.add_argument("--strategy", action="append", help="Only strategies starting with this prefix (repeatable)")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed runs per strategy")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per strategy")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help="JSONL file runs are appended to")
+    parser.add_argument("--no-history", action="store_true", help="Do not record this run")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    if args.iterations < 1:
+        parser.error("--iterations must be at least 1")
+
+    if args.repo:
+        repo = args.repo.resolve()
+        params = {"repo": str(repo)}
+    else:
+        params = {
+            "branches": args.branches,
+            "commits": args.commits,
+            "prs": args.prs,
+            "merged_fraction": args.merged_fraction,
+        }
+        repo = synthetic_repo(params)
+
+    selected = [name for name in STRATEGIES if not args.strategy or name.startswith(tuple(args.strategy))]
+    if not selected:
+        parser.error(f"no strategy matches {args.strategy}; choose from {', '.join(STRATEGIES)}")
+
+    results = {}
+    for name in selected:
+        if not args.json:
+            print(f"Running {name}...", flush=True)
+        try:
+            results[name] = measure(STRATEGIES[name], repo, args.iterations, args.warmup)
+        except Unsupported as e:
+            results[name] = {"skipped": str(e)}
+        except RuntimeError as e:
+            results[name] = {"error": str(e)}
+
+    history = load_history(args.history)
+    previous = previous_run(history, params)
+    entry = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_version": git(REPO_ROOT, "--version").stdout.strip(),
+        "commit": git(REPO_ROOT, "rev-parse", "--short", "HEAD", check=False).stdout.strip(),
+        "params": params,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "results": results,
+    }
+    if not args.no_history:
+        append_history(args.history, entry)
+
+    if args.json:
+        print(json.dumps(entry, indent=2))
+        return 0
+
+    print()
+    print("=" * 80)
+    print("GIT STRATEGY BENCHMARK")
+    print("=" * 80)
+    print(f"Repository: {repo} {params if not args.repo else ''}")
+    print(f"{entry['git_version']}, {args.iterations} iterations after {args.warmup} warmup")
+    print()
+    print(f"{'strategy':<32} {'items':>6} {'median ms':>11} {'IQR ms':>9}  vs previous")
+    for name, r in results.items():
+        if "median_ms" not in r:
+            print(f"{name:<32} ⚠ {r.get('skipped') or r.get('error')}")
+            continue
+        change = ""
+        old = previous and previous["results"].get(name, {}).get("median_ms")
+        if old:
+            change = f"{(r['median_ms'] - old) / old:+.1%}"
+        print(f"{name:<32} {r['items']:>6} {r['median_ms']:>11.1f} {r['iqr_ms']:>9.1f}  {change}")
+    if previous:
+        print(f"\nPrevious run with the same parameters: {previous['timestamp']} ({previous.get('commit') or 'unknown commit'})")
+    if not args.no_history:
+        print(f"✓ Recorded in {args.history}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Service Worker Precache Manifest Builder
+
+Walks the deployable PWA assets, hashes their contents and writes the
+precache list (URL + revision) into service-worker.js. The service worker
+keys its precache by revision, so on update only files whose hash changed
+are re-downloaded.
+
+Usage:
+    python scripts/build_sw_precache.py          # regenerate service-worker.js
+    python scripts/build_sw_precache.py --check  # exit 1 if the list is stale
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SERVICE_WORKER = REPO_ROOT / "service-worker.js"
+
+# Deployable assets, relative to the site root (= repo root)
+PRECACHE_GLOBS = [
+    "index.html",
+    "dashboard/index.html",
+    "manifest.json",
+    "sw-inspector.html",
+    "offline.html",
+    "icons/*.svg",
+    "icons/*.png",
+]
+
+# Extra URLs served by an existing file (directory index pages)
+PRECACHE_ALIASES = {
+    "/": "index.html",
+}
+
+MARKER_START = "// PRECACHE_MANIFEST:START"
+MARKER_END = "// PRECACHE_MANIFEST:END"
+BLOCK_RE = re.compile(re.escape(MARKER_START) + r".*?" + re.escape(MARKER_END), re.DOTALL)
+ASSETS_RE = re.compile(r"const PRECACHE_ASSETS = (\[.*?\]);", re.DOTALL)
+
+
+def file_revision(path):
+    """Short content hash used as the cache revision of a file."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def collect_assets(root=REPO_ROOT):
+    """Return the sorted list of deployable asset paths (relative, POSIX)."""
+    found = set()
+    for pattern in PRECACHE_GLOBS:
+        for p in root.glob(pattern):
+            if p.is_file():
+                found.add(p.relative_to(root).as_posix())
+    return sorted(found)
+
+
+def build_manifest(root=REPO_ROOT):
+    """Return precache entries [{"url": ..., "revision": ...}] for the files on disk."""
+    revisions = {rel: file_revision(root / rel) for rel in collect_assets(root)}
+    entries = [{"url": "/" + rel, "revision": rev} for rel, rev in revisions.items()]
+    for url, rel in PRECACHE_ALIASES.items():
+        if rel in revisions:
+            entries.append({"url": url, "revision": revisions[rel]})
+    return sorted(entries, key=lambda e: e["url"])
+
+
+def manifest_version(entries):
+    """Hash of the whole list, so service-worker.js changes whenever any asset does."""
+    return hashlib.sha256(json.dumps(entries, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def render_block(entries):
+    """Render the generated JavaScript block (JSON is valid JS)."""
+    return "\n".join([
+        MARKER_START + " (generated by scripts/build_sw_precache.py - do not edit)",
+        f"const PRECACHE_VERSION = '{manifest_version(entries)}';",
+        f"const PRECACHE_ASSETS = {json.dumps(entries, indent=2)};",
+        MARKER_END,
+    ])
+
+
+def read_precache_list(sw_path=SERVICE_WORKER):
+    """
+    Parse the precache list currently embedded in service-worker.js.
+    Returns None if the generated block is missing.
+    """
+    try:
+        source = sw_path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    block = BLOCK_RE.search(source)
+    if not block:
+        return None
+    assets = ASSETS_RE.search(block.group(0))
+    if not assets:
+        return None
+    try:
+        return json.loads(assets.group(1))
+    except json.JSONDecodeError:
+        return None
+
+
+def diff_manifest(current, expected):
+    """Return human-readable differences between two precache lists."""
+    cur = {e["url"]: e.get("revision") for e in current}
+    exp = {e["url"]: e["revision"] for e in expected}
+    problems = []
+    for url in sorted(exp.keys() - cur.keys()):
+        problems.append(f"missing from precache list: {url}")
+    for url in sorted(cur.keys() - exp.keys()):
+        problems.append(f"listed but not on disk: {url}")
+    for url in sorted(cur.keys() & exp.keys()):
+        if cur[url] != exp[url]:
+            problems.append(f"stale revision for {url}: {cur[url]} (file is {exp[url]})")
+    return problems
+
+
+def write_service_worker(entries, sw_path=SERVICE_WORKER):
+    """Replace the generated block in service-worker.js. Returns True if the file changed."""
+    source = sw_path.read_text(encoding="utf-8")
+    if not BLOCK_RE.search(source):
+        raise ValueError(f"{sw_path.name} has no {MARKER_START} ... {MARKER_END} block")
+    updated = BLOCK_RE.sub(lambda _: render_block(entries), source, count=1)
+    if updated == source:
+        return False
+    sw_path.write_text(updated, encoding="utf-8")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the service worker precache manifest")
+    parser.add_argument("--check", action="store_true", help="Only verify service-worker.js is up to date")
+    args = parser.parse_args()
+
+    entries = build_manifest()
+
+    if args.check:
+        current = read_precache_list()
+        if current is None:
+            print(f"✗ No generated precache list found in {SERVICE_WORKER.name}")
+            return 1
+        problems = diff_manifest(current, entries)
+        if problems:
+            print("✗ Precache list is out of date:")
+            for p in problems:
+                print(f"  - {p}")
+            print("Run: python scripts/build_sw_precache.py")
+            return 1
+        print(f"✓ Precache list matches {len(entries)} files on disk")
+        return 0
+
+    changed = write_service_worker(entries)
+    print(f"✓ {len(entries)} precache entries (version {manifest_version(entries)})")
+    print(f"✓ {SERVICE_WORKER.name} {'updated' if changed else 'already up to date'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,17 +2,94 @@
 """
 Lightweight repository sanity checks suitable for GitHub Actions.
 This is intentionally NOT a compiler for MQL5 (MetaEditor isn't available on CI).
+
+The tree is walked once (excluded directories are pruned, never descended
+into), files are checked in a process pool, and per-file results are cached
+in .cache/ci_validate_repo.json keyed by (path, size, mtime, content hash), so
+re-runs on an unchanged tree only stat files.
+
+As a git pre-commit hook (--staged, install with --install-hook) only the
+staged blobs are read, and with --diff BASE..HEAD only the paths changed in
+that range; either way the contents come from a single `git cat-file --batch`
+process, so the cost scales with the diff rather than the repository.
 """
 
 from __future__ import annotations
 
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
 import re
+import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 MQL5_DIR = REPO_ROOT / "mt5" / "MQL5"
+CACHE_PATH = REPO_ROOT / ".cache" / "ci_validate_repo.json"
+
+MQL5_SUFFIXES = {".mq5", ".mqh"}
+MAX_SOURCE_SIZE = 5_000_000
+MAX_SCAN_SIZE = 2_000_000
+
+# Known credential formats (targeted)
+SECRET_PATTERNS: list[tuple[str, str]] = [
+    ("telegram_bot_token", r"\b\d{8,}:[A-Za-z0-9_-]{20,}\b"),
+    ("github_pat", r"\bgithub_pat_[A-Za-z0-9_]{20,}\b"),
+    ("github_classic_pat", r"\bghp_[A-Za-z0-9]{30,}\b"),
+    ("github_actions_token", r"\bghs_[A-Za-z0-9]{30,}\b"),
+    ("aws_access_key_id", r"\bAKIA[0-9A-Z]{16}\b"),
+    # Very rough GCP API key format; still specific enough to avoid most noise.
+    ("gcp_api_key", r"\bAIza[0-9A-Za-z\-_]{30,}\b"),
+]
+# ⚡ All patterns combined into one alternation over raw bytes: each file is
+# searched once instead of once per pattern per line. The leading lookahead
+# lists the first character of every pattern (digits for Telegram tokens,
+# "g" for github_*/ghp_/ghs_, "A" for AKIA/AIza) so the regex engine can skip
+# most positions cheaply; extend it when adding a pattern. m.lastgroup names
+# the pattern that matched.
+SECRET_FIRST_CHARS = "0-9gA"
+SECRET_RE = re.compile(
+    (f"(?=[{SECRET_FIRST_CHARS}])(?:"
+     + "|".join(f"(?P<{name}>{rx})" for name, rx in SECRET_PATTERNS)
+     + ")").encode("ascii")
+)
+# Cheap prefilter: every pattern needs one of these literals (or a digit-colon
+# run for Telegram tokens). Plain `in` checks are memchr-fast, so most files
+# never reach the regex at all.
+SECRET_LITERALS = (b"github_pat_", b"ghp_", b"ghs_", b"AKIA", b"AIza")
+TOKEN_PREFILTER_RE = re.compile(rb"\d{8}:")
+
+# Keep this scan fast and avoid binary/large files.
+SCAN_SUFFIXES = {
+    ".md", ".txt", ".json", ".yml", ".yaml", ".toml", ".ini", ".cfg",
+    ".py", ".ps1", ".sh", ".bat",
+    ".mq5", ".mqh",
+    ".html", ".js", ".css",
+}
+SCAN_FILENAMES = {"Dockerfile", "docker-compose.yml", "docker-compose.dev.yml"}
+EXCLUDED_DIRNAMES = {
+    ".git", ".cache",
+    "dist", "logs", "data",
+    "__pycache__", "venv", "env", ".venv",
+    "node_modules",
+}
+
+# Bump when the checks change so stale cached results are discarded.
+# Pattern changes are picked up automatically.
+CACHE_VERSION = "2:" + hashlib.sha256(repr(SECRET_PATTERNS).encode("utf-8")).hexdigest()[:12]
+
+# Below this many files to (re)check, pool start-up costs more than it saves.
+PARALLEL_THRESHOLD = 64
+
+# Files modified this close to when they were checked may have changed again
+# within the same mtime tick; always re-hash those ("racy" entries, as in git).
+RACY_WINDOW_NS = 2_000_000_000
 
 
 def fail(msg: str) -> None:
@@ -20,127 +97,397 @@ def fail(msg: str) -> None:
     raise SystemExit(1)
 
 
-def validate_and_collect_files() -> list[Path]:
+def walk_repo(root: Path = REPO_ROOT) -> list[tuple[str, int, int]]:
     """
-    Iterates through MQL5 source files, validates them (size & content),
-    and returns a sorted list of valid files.
+    Single pass over the tree. Returns (relative POSIX path, size, mtime_ns)
+    for every regular file, pruning excluded directories before descending.
     """
-    if not MQL5_DIR.exists():
-        fail(f"Missing directory: {MQL5_DIR}")
-
-    files: list[Path] = []
-
-    # Single pass to find and validate files
-    for p in MQL5_DIR.rglob("*"):
-        if not p.is_file():
+    found: list[tuple[str, int, int]] = []
+    stack = [(str(root), "")]
+    while stack:
+        dir_path, rel_prefix = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
             continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in EXCLUDED_DIRNAMES:
+                            stack.append((entry.path, rel_prefix + entry.name + "/"))
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        found.append((rel_prefix + entry.name, st.st_size, st.st_mtime_ns))
+                except OSError:
+                    continue
+    return found
 
-        if p.suffix.lower() not in {".mq5", ".mqh"}:
-            continue
 
-        # Optimization: Check size BEFORE reading content
-        # Avoid accidentally committing huge build artifacts.
-        sz = p.stat().st_size
-        if sz > 5_000_000:
-            fail(f"Unexpectedly large source file (>5MB): {p.relative_to(REPO_ROOT)} ({sz} bytes)")
+def is_mql5_source(rel: str) -> bool:
+    return rel.startswith("mt5/MQL5/") and os.path.splitext(rel)[1].lower() in MQL5_SUFFIXES
 
-        # Check for NUL bytes
-        try:
-            data = p.read_bytes()
-            if b"\x00" in data:
-                fail(f"NUL byte found in {p.relative_to(REPO_ROOT)}")
-        except Exception as e:
-            fail(f"Failed to read file {p.relative_to(REPO_ROOT)}: {e}")
 
-        files.append(p)
+def is_scannable(rel: str, size: int) -> bool:
+    name = rel.rsplit("/", 1)[-1]
+    if name not in SCAN_FILENAMES and os.path.splitext(name)[1].lower() not in SCAN_SUFFIXES:
+        return False
+    return size <= MAX_SCAN_SIZE
 
-    if not files:
-        fail(f"No .mq5/.mqh files found under {MQL5_DIR}")
-
-    return sorted(files)
 
+def scan_bytes(data: bytes) -> list[tuple[str, int]]:
+    """
+    Return (pattern name, line number) for each line containing a credential.
 
-def scan_for_secrets() -> None:
+    Only the pattern name and line are reported so secrets never reach CI logs.
+    Line numbers are computed only for hits.
     """
-    Best-effort check to prevent accidentally committing credentials.
+    if not any(lit in data for lit in SECRET_LITERALS) and not TOKEN_PREFILTER_RE.search(data):
+        return []
+
+    findings: list[tuple[str, int]] = []
+    line_no, pos, last_line = 1, 0, 0
+    for m in SECRET_RE.finditer(data):
+        line_no += data.count(b"\n", pos, m.start())
+        pos = m.start()
+        # Report each line once, like the per-line scan did
+        if line_no != last_line:
+            findings.append((m.lastgroup, line_no))
+            last_line = line_no
+    return findings
+
+
+def check_file(task: tuple[str, str, bool, bool, str | None]) -> tuple[str, dict]:
+    """
+    Worker: read one file, hash it and run the checks that apply to it.
 
-    Keep patterns targeted to avoid false positives and avoid printing the
-    matched secret to CI logs (only path + line number are reported).
+    task is (root, relative path, check NUL bytes, scan for secrets, cached
+    hash). When the content hash equals the cached one the checks are
+    skipped and only the hash is returned; the caller reuses its cached
+    result.
     """
+    root, rel, check_nul, scan, cached_hash = task
+    try:
+        data = (Path(root) / rel).read_bytes()
+    except OSError as e:
+        return rel, {"error": f"Failed to read file {rel}: {e}"}
 
-    # Known credential formats (targeted)
-    patterns: list[tuple[str, re.Pattern[str]]] = [
-        ("telegram_bot_token", re.compile(r"\b\d{8,}:[A-Za-z0-9_-]{20,}\b")),
-        ("github_pat", re.compile(r"\bgithub_pat_[A-Za-z0-9_]{20,}\b")),
-        ("github_classic_pat", re.compile(r"\bghp_[A-Za-z0-9]{30,}\b")),
-        ("github_actions_token", re.compile(r"\bghs_[A-Za-z0-9]{30,}\b")),
-        ("aws_access_key_id", re.compile(r"\bAKIA[0-9A-Z]{16}\b")),
-        # Very rough GCP API key format; still specific enough to avoid most noise.
-        ("gcp_api_key", re.compile(r"\bAIza[0-9A-Za-z\-_]{30,}\b")),
-    ]
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == cached_hash:
+        return rel, {"hash": digest, "unchanged": True}
 
-    # Keep this scan fast and avoid binary/large files.
-    scan_suffixes = {
-        ".md", ".txt", ".json", ".yml", ".yaml", ".toml", ".ini", ".cfg",
-        ".py", ".ps1", ".sh", ".bat",
-        ".mq5", ".mqh",
-        ".html", ".js", ".css",
-    }
-    scan_filenames = {"Dockerfile", "docker-compose.yml", "docker-compose.dev.yml"}
-    excluded_dirnames = {
-        ".git",
-        "dist", "logs", "data",
-        "__pycache__", "venv", "env", ".venv",
-        "node_modules",
+    return rel, dict(inspect_content(data, check_nul, scan), hash=digest)
+
+
+def inspect_content(data: bytes, check_nul: bool, scan: bool) -> dict:
+    """Run the content checks on one file's bytes."""
+    return {
+        "nul": check_nul and b"\x00" in data,
+        "secrets": scan_bytes(data) if scan else [],
     }
 
-    findings: list[tuple[str, Path, int]] = []
 
-    for p in REPO_ROOT.rglob("*"):
-        if not p.is_file():
+def load_cache(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def save_cache(path: Path, files: dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": files}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        # The cache is an optimization; never fail validation because of it.
+        pass
+
+
+def run_checks(tasks: list[tuple[str, str, bool, bool, str | None]], jobs: int) -> dict[str, dict]:
+    """Run check_file over tasks, in a process pool when there are enough of them."""
+    if jobs > 1 and len(tasks) >= PARALLEL_THRESHOLD:
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            return dict(executor.map(check_file, tasks, chunksize=chunksize))
+    return dict(map(check_file, tasks))
+
+
+def validate_repo(use_cache: bool = True, jobs: int | None = None, root: Path = REPO_ROOT,
+                  cache_path: Path = CACHE_PATH) -> list[Path]:
+    """
+    Validate MQL5 sources (size & content) and scan text files for secrets.
+    Returns the sorted list of MQL5 source files.
+    """
+    mql5_dir = root / MQL5_DIR.relative_to(REPO_ROOT)
+    if not mql5_dir.exists():
+        fail(f"Missing directory: {mql5_dir}")
+
+    jobs = jobs or os.cpu_count() or 1
+    cache = load_cache(cache_path) if use_cache else {}
+    new_cache: dict[str, dict] = {}
+    now_ns = time.time_ns()
+
+    sources: list[str] = []
+    pending: list[tuple[str, str, bool, bool, str | None]] = []
+    stats: dict[str, tuple[int, int]] = {}
+
+    for rel, size, mtime_ns in walk_repo(root):
+        mql5 = is_mql5_source(rel)
+        scan = is_scannable(rel, size)
+        if not (mql5 or scan):
             continue
 
-        # Skip excluded directories anywhere in path
-        if any(part in excluded_dirnames for part in p.parts):
+        if mql5:
+            # Avoid accidentally committing huge build artifacts.
+            if size > MAX_SOURCE_SIZE:
+                fail(f"Unexpectedly large source file (>5MB): {rel} ({size} bytes)")
+            sources.append(rel)
+
+        entry = cache.get(rel)
+        if (
+            entry is not None
+            and entry["size"] == size
+            and entry["mtime_ns"] == mtime_ns
+            and entry["checked_ns"] - mtime_ns > RACY_WINDOW_NS
+        ):
+            # ⚡ Fast path: stat unchanged, reuse the cached result unread
+            new_cache[rel] = entry
             continue
 
-        if p.name not in scan_filenames and p.suffix.lower() not in scan_suffixes:
-            continue
+        stats[rel] = (size, mtime_ns)
+        pending.append((str(root), rel, mql5, scan, entry["hash"] if entry else None))
+
+    for rel, result in run_checks(pending, jobs).items():
+        if "error" in result:
+            fail(result["error"])
+        size, mtime_ns = stats[rel]
+        if result.get("unchanged"):
+            # Touched but identical content: keep the cached verdict
+            entry = dict(cache[rel], size=size, mtime_ns=mtime_ns, checked_ns=now_ns)
+        else:
+            entry = {
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "checked_ns": now_ns,
+                "hash": result["hash"],
+                "nul": result["nul"],
+                "secrets": result["secrets"],
+            }
+        new_cache[rel] = entry
+
+    if use_cache:
+        save_cache(cache_path, new_cache)
+
+    if not sources:
+        fail(f"No .mq5/.mqh files found under {mql5_dir}")
+
+    for rel in sorted(sources):
+        if new_cache[rel]["nul"]:
+            fail(f"NUL byte found in {rel}")
+
+    findings = [
+        (name, rel, line_no)
+        for rel in sorted(new_cache)
+        for name, line_no in new_cache[rel]["secrets"]
+    ]
+    if findings:
+        report_secrets(findings)
+
+    return [root / rel for rel in sorted(sources)]
 
+
+def report_secrets(findings: list[tuple[str, str, int]]) -> None:
+    """
+    Best-effort check to prevent accidentally committing credentials.
+
+    Keep patterns targeted to avoid false positives and avoid printing the
+    matched secret to CI logs (only path + line number are reported).
+    """
+    msg_lines = ["Potential secret(s) detected in tracked files:"]
+    for name, rel, line_no in findings[:25]:
+        msg_lines.append(f"- {name}: {rel}:{line_no}")
+    if len(findings) > 25:
+        msg_lines.append(f"... and {len(findings) - 25} more")
+    msg_lines.append("Remove the credential from the repository and rotate/revoke it.")
+    fail("\n".join(msg_lines))
+
+
+def git(*args: str) -> bytes:
+    """Run a git command in the repository and return its stdout."""
+    result = subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True)
+    if result.returncode != 0:
+        fail(f"git {' '.join(args)} failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout
+
+
+def iter_blobs(object_names: list[str]):
+    """
+    Yield (object name, bytes or None if missing) for each name, streaming
+    all of them through one `git cat-file --batch` process.
+
+    Names are written from a separate thread so a large request list can't
+    deadlock against git's output buffer.
+    """
+    proc = subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        cwd=REPO_ROOT,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+
+    def feed() -> None:
         try:
-            if p.stat().st_size > 2_000_000:
+            for name in object_names:
+                proc.stdin.write(name.encode("utf-8", "surrogateescape") + b"\n")
+        except BrokenPipeError:
+            pass
+        finally:
+            proc.stdin.close()
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    try:
+        for name in object_names:
+            header = proc.stdout.readline()
+            if not header or header.endswith(b" missing\n"):
+                yield name, None
                 continue
-        except OSError:
-            continue
+            size = int(header.split()[2])
+            data = proc.stdout.read(size)
+            proc.stdout.read(1)  # trailing newline
+            yield name, data
+    finally:
+        proc.stdout.close()
+        proc.wait()
+        writer.join()
 
-        try:
-            text = p.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            # Not critical; skip unreadable files rather than failing.
-            continue
 
-        # Line-by-line scan (lets us report line numbers without leaking the secret)
-        for i, line in enumerate(text.splitlines(), start=1):
-            for name, rx in patterns:
-                if rx.search(line):
-                    findings.append((name, p, i))
-                    # Stop after the first matched pattern for this line
-                    break
+def validate_blobs(blobs) -> int:
+    """
+    Validate (relative path, bytes) pairs that come from git rather than the
+    working tree. Returns the number of files checked; fails on problems.
+    """
+    findings: list[tuple[str, str, int]] = []
+    checked = 0
+    for rel, data in blobs:
+        if data is None:
+            continue
+        mql5 = is_mql5_source(rel)
+        scan = is_scannable(rel, len(data))
+        if not (mql5 or scan):
+            continue
+        checked += 1
+        if mql5 and len(data) > MAX_SOURCE_SIZE:
+            fail(f"Unexpectedly large source file (>5MB): {rel} ({len(data)} bytes)")
+        result = inspect_content(data, mql5, scan)
+        if result["nul"]:
+            fail(f"NUL byte found in {rel}")
+        findings.extend((name, rel, line_no) for name, line_no in result["secrets"])
 
     if findings:
-        msg_lines = ["Potential secret(s) detected in tracked files:"]
-        for name, path, line_no in findings[:25]:
-            msg_lines.append(f"- {name}: {path.relative_to(REPO_ROOT)}:{line_no}")
-        if len(findings) > 25:
-            msg_lines.append(f"... and {len(findings) - 25} more")
-        msg_lines.append("Remove the credential from the repository and rotate/revoke it.")
-        fail("\n".join(msg_lines))
+        report_secrets(findings)
+    return checked
+
+
+def staged_paths() -> list[str]:
+    """Paths added, copied, modified or renamed in the index."""
+    out = git("diff", "--cached", "--name-only", "-z", "--diff-filter=ACMR")
+    paths = [p.decode("utf-8", "surrogateescape") for p in out.split(b"\0") if p]
+    # cat-file reads one object name per line
+    return [p for p in paths if "\n" not in p]
+
+
+def validate_staged() -> int:
+    """Check only the staged content (what is about to be committed)."""
+    paths = staged_paths()
+    # ":<path>" names the stage-0 index entry, i.e. the staged blob
+    blobs = ((name[1:], data) for name, data in iter_blobs([f":{p}" for p in paths]))
+    return validate_blobs(blobs)
+
+
+def split_range(rev_range: str) -> tuple[str, str]:
+    """
+    Split "base..head" / "base...head" into (base, head). A bare ref means
+    base..HEAD, and an empty side defaults to HEAD, as in git.
+    """
+    for sep in ("...", ".."):
+        if sep in rev_range:
+            base, head = rev_range.split(sep, 1)
+            return base or "HEAD", head or "HEAD"
+    return rev_range, "HEAD"
+
+
+def changed_paths(rev_range: str) -> list[str]:
+    """Paths added, copied, modified or renamed in a revision range."""
+    if rev_range.startswith("-"):
+        fail(f"Invalid revision range: {rev_range}")
+    base, head = split_range(rev_range)
+    # A bare ref is expanded so that git diff compares it against HEAD, not the worktree
+    spec = rev_range if ".." in rev_range else f"{base}..{head}"
+    out = git("diff", "--name-only", "-z", "--diff-filter=ACMR", spec, "--")
+    paths = [p.decode("utf-8", "surrogateescape") for p in out.split(b"\0") if p]
+    return [p for p in paths if "\n" not in p]
+
+
+def validate_diff(rev_range: str) -> int:
+    """Check only the files changed in rev_range, as they are at its head."""
+    _, head = split_range(rev_range)
+    paths = changed_paths(rev_range)
+    prefix = f"{head}:"
+    blobs = ((name[len(prefix):], data) for name, data in iter_blobs([prefix + p for p in paths]))
+    return validate_blobs(blobs)
+
+
+HOOK_SCRIPT = """#!/bin/sh
+# Installed by scripts/ci_validate_repo.py --install-hook
+exec python3 scripts/ci_validate_repo.py --staged
+"""
+
+
+def install_hook() -> None:
+    hooks_dir = Path(git("rev-parse", "--git-path", "hooks").decode().strip())
+    if not hooks_dir.is_absolute():
+        hooks_dir = REPO_ROOT / hooks_dir
+    hook = hooks_dir / "pre-commit"
+    if hook.exists() and hook.read_text(encoding="utf-8", errors="replace") != HOOK_SCRIPT:
+        fail(f"{hook} already exists; add 'python3 scripts/ci_validate_repo.py --staged' to it manually")
+    hooks_dir.mkdir(parents=True, exist_ok=True)
+    hook.write_text(HOOK_SCRIPT, encoding="utf-8")
+    hook.chmod(0o755)
+    print(f"OK: installed pre-commit hook at {hook}")
 
 
 def main() -> int:
-    # Combined iteration and validation
-    files = validate_and_collect_files()
-    scan_for_secrets()
+    parser = argparse.ArgumentParser(description="Repository sanity checks for CI")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't update the result cache")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--staged", action="store_true", help="Check only staged blobs (pre-commit hook mode)")
+    parser.add_argument("--diff", metavar="RANGE", help="Check only files changed in a git range, e.g. origin/main...HEAD")
+    parser.add_argument("--install-hook", action="store_true", help="Install a git pre-commit hook running --staged")
+    args = parser.parse_args()
+
+    if args.install_hook:
+        install_hook()
+        return 0
+
+    if args.staged:
+        checked = validate_staged()
+        print(f"OK: checked {checked} staged file(s)")
+        return 0
+
+    if args.diff:
+        checked = validate_diff(args.diff)
+        print(f"OK: checked {checked} changed file(s) in {args.diff}")
+        return 0
+
+    files = validate_repo(use_cache=not args.no_cache, jobs=args.jobs)
 
     rel = [str(p.relative_to(REPO_ROOT)) for p in files]
     print("OK: found source files:")
@@ -6,12 +6,30 @@ Supports multiple cloud platforms: Render, Railway, Fly.io, Heroku, etc.
 
 import argparse
 import json
+import os
+import shutil
+import signal
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 CONFIG_DIR = REPO_ROOT / "config"
+DEPLOY_LOG_DIR = REPO_ROOT / "logs" / "deploy"
+
+# Platforms deployed by "all" (docker only with --build), with per-platform timeouts in seconds
+ALL_PLATFORMS = ["render", "railway", "flyio", "gcp"]
+PLATFORM_TIMEOUTS = {"render": 120, "railway": 120, "gcp": 120, "flyio": 660, "docker": 900}
+# Tools run by a deployer give up this long before the platform timeout, so the
+# deployer can still report the failure before "all" mode kills it
+CHILD_TIMEOUT_MARGIN = 60
+STATUS_ICONS = {"queued": "⏸️", "running": "⏳", "ok": "✅", "failed": "❌", "timeout": "⏱️"}
 
 
 def deploy_render():
@@ -70,40 +88,45 @@ def deploy_railway():
     return True
 
 
-def deploy_docker(dockerfile_path=None):
-    """Build and deploy Docker container"""
+def deploy_docker(images=None, force=False):
+    """Build Docker images, skipping those whose build context hash is already built"""
+    from docker_cache import IMAGES, build_images
+    
     print("=" * 60)
     print("Docker Deployment")
     print("=" * 60)
     
-    dockerfile = dockerfile_path or REPO_ROOT / "Dockerfile"
-    if not dockerfile.exists():
+    images = images or ["mql5-automation"]
+    if not (REPO_ROOT / IMAGES[images[0]][0]).exists():
         print("❌ Dockerfile not found")
         return False
-    
-    print("Building Docker image...")
-    try:
-        subprocess.run(
-            ["docker", "build", "-t", "mql5-automation", "."],
-            cwd=REPO_ROOT,
-            check=True
-        )
-        print("✅ Docker image built successfully")
-        print("\nTo run locally:")
-        print("  docker run -d --name mql5-automation mql5-automation")
-        print("\nOr use docker-compose:")
-        print("  docker-compose up -d")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Docker build failed: {e}")
-        return False
-    except FileNotFoundError:
+    if not shutil.which("docker"):
         print("❌ Docker not installed. Please install Docker first.")
         return False
+    
+    print(f"Building Docker image(s): {', '.join(images)}...")
+    results = build_images(images, force=force)
+    for name, (status, digest) in results.items():
+        if status == "cached":
+            print(f"✅ {name}: unchanged, reusing {name}:ctx-{digest[:12]}")
+        elif status == "built":
+            print(f"✅ {name}: built {name}:ctx-{digest[:12]}")
+        else:
+            print(f"❌ {name}: build {status}")
+    
+    if not all(status in ("cached", "built") for status, _ in results.values()):
+        return False
+    print("\nTo run locally:")
+    print("  docker run -d --name mql5-automation mql5-automation")
+    print("\nOr use docker-compose:")
+    print("  docker-compose up -d")
+    return True
 
 
-def deploy_flyio():
-    """Deploy to Fly.io"""
+def deploy_flyio(timeout=None):
+    """Deploy to Fly.io; `timeout` is the platform timeout in seconds (default: PLATFORM_TIMEOUTS)"""
+    timeout = timeout or PLATFORM_TIMEOUTS["flyio"]
+    deploy_timeout = max(30, timeout - CHILD_TIMEOUT_MARGIN)
     print("=" * 60)
     print("Deploying to Fly.io")
     print("=" * 60)
@@ -174,7 +197,7 @@ primary_region = "iad"
         result = subprocess.run(
             ["flyctl", "deploy"],
             cwd=REPO_ROOT,
-            timeout=600  # 10 minute timeout
+            timeout=deploy_timeout
         )
         
         if result.returncode == 0:
@@ -187,7 +210,7 @@ primary_region = "iad"
             return False
             
     except subprocess.TimeoutExpired:
-        print("⏱️ Deployment timed out after 10 minutes")
+        print(f"⏱️ Deployment timed out after {deploy_timeout} seconds")
         return False
     except Exception as e:
         print(f"❌ Error during deployment: {e}")
@@ -226,6 +249,200 @@ def deploy_gcp():
     return True
 
 
+class PlatformRun:
+    """One platform deploy in "all" mode, run as a child process of this script."""
+
+    def __init__(self, platform, timeout, log_path):
+        self.platform = platform
+        self.timeout = timeout
+        self.log_path = log_path
+        self.state = "queued"
+        self.started = None
+        self.finished = None
+        self.returncode = None
+        self.last_line = ""
+        self.process = None
+        self.timer = None
+        self.cancelled = False
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def cancel(self):
+        """Stop the deploy: kill its process tree if it is running and drop its timeout timer."""
+        self.cancelled = True
+        if self.timer is not None:
+            self.timer.cancel()
+        if self.process is not None and self.process.poll() is None:
+            _kill_tree(self.process)
+
+
+def _kill_tree(process):
+    """Kill the child and anything it started (flyctl, docker, ...)."""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+
+
+def child_command(run, extra_args=()):
+    """This script deploying one platform, with the run's timeout and any platform options."""
+    return [sys.executable, str(Path(__file__).resolve()), run.platform, "--timeout", str(run.timeout), *extra_args]
+
+
+def run_platform(run, command=None):
+    """Deploy one platform in a child process, logging its output; updates `run` as it goes."""
+    command = command or child_command(run)
+    if run.cancelled:
+        return run
+    run.state = "running"
+    run.started = time.monotonic()
+    timed_out = threading.Event()
+
+    run.log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(run.log_path, "wb") as log:
+        try:
+            process = subprocess.Popen(
+                command,
+                cwd=REPO_ROOT,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env={**os.environ, "PYTHONUNBUFFERED": "1"},
+                start_new_session=(os.name == "posix"),
+            )
+        except OSError as e:
+            run.state, run.finished, run.last_line = "failed", time.monotonic(), str(e)
+            return run
+
+        def on_timeout():
+            timed_out.set()
+            _kill_tree(process)
+
+        timer = threading.Timer(run.timeout, on_timeout)
+        run.process, run.timer = process, timer
+        timer.start()
+        if run.cancelled:
+            # cancel() ran between the check above and Popen
+            _kill_tree(process)
+        try:
+            for line in process.stdout:
+                log.write(line)
+                text = line.decode("utf-8", errors="replace").strip()
+                if text:
+                    run.last_line = text
+            run.returncode = process.wait()
+        finally:
+            timer.cancel()
+
+    run.finished = time.monotonic()
+    if timed_out.is_set():
+        run.state = "timeout"
+    else:
+        run.state = "ok" if run.returncode == 0 else "failed"
+    return run
+
+
+def render_table(runs, width=100):
+    """Status table rows for the live display and the final summary."""
+    rows = [f"{'Platform':<10} {'Status':<10} {'Time':>7}  Last output", "-" * min(width, 100)]
+    for run in runs:
+        status = f"{STATUS_ICONS[run.state]} {run.state}"
+        last = run.last_line[: max(10, width - 33)]
+        rows.append(f"{run.platform:<10} {status:<10} {run.elapsed():>6.0f}s  {last}")
+    return rows
+
+
+def deploy_all_concurrently(platforms, timeout=None, jobs=None, command=None, live=None, out=sys.stdout,
+                            extra_args=None):
+    """
+    Deploy independent platforms at the same time, each in its own process
+    with its own timeout and log file. Shows a live status table (redrawn
+    in place on a terminal, one line per state change otherwise) and returns
+    the finished PlatformRun objects. extra_args maps a platform to options
+    forwarded to its child (e.g. --image for docker).
+    """
+    extra_args = extra_args or {}
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    runs = [
+        PlatformRun(p, timeout or PLATFORM_TIMEOUTS.get(p, 300), DEPLOY_LOG_DIR / f"{stamp}_{p}.log")
+        for p in platforms
+    ]
+    live = out.isatty() if live is None else live
+    width = 100
+
+    with ThreadPoolExecutor(max_workers=jobs or len(runs)) as pool:
+        futures = [
+            pool.submit(run_platform, run,
+                        command(run.platform) if command else child_command(run, extra_args.get(run.platform, ())))
+            for run in runs
+        ]
+        drawn = 0
+        reported = {}
+        try:
+            while True:
+                done = all(f.done() for f in futures)
+                if live:
+                    rows = render_table(runs, width)
+                    out.write("\033[F" * drawn + "".join(f"\033[K{row}\n" for row in rows))
+                    out.flush()
+                    drawn = len(rows)
+                else:
+                    for run in runs:
+                        if reported.get(run.platform) != run.state:
+                            reported[run.platform] = run.state
+                            out.write(f"{STATUS_ICONS[run.state]} {run.platform}: {run.state} ({run.elapsed():.0f}s)\n")
+                    out.flush()
+                if done:
+                    break
+                time.sleep(0.5)
+        except BaseException:
+            # Ctrl-C: the children run in their own session, so the terminal's
+            # SIGINT never reaches them; stop them here instead of waiting out
+            # every platform timeout
+            for f in futures:
+                f.cancel()
+            for run in runs:
+                run.cancel()
+            raise
+        for f in futures:
+            f.result()  # surface unexpected errors from the worker threads
+    return runs
+
+
+def print_summary(runs, wall_time, out=sys.stdout):
+    ok = [r for r in runs if r.state == "ok"]
+    out.write("\n" + "=" * 60 + "\n")
+    out.write("DEPLOYMENT SUMMARY\n")
+    out.write("=" * 60 + "\n")
+    for run in runs:
+        out.write(f"{STATUS_ICONS[run.state]} {run.platform:<10} {run.state:<8} {run.elapsed():>6.1f}s  {run.log_path}\n")
+        if run.state != "ok" and run.last_line:
+            out.write(f"   {run.last_line}\n")
+    total = sum(r.elapsed() for r in runs)
+    out.write(f"\n{len(ok)}/{len(runs)} platforms succeeded in {wall_time:.1f}s (sequential would take ~{total:.1f}s)\n")
+
+
+def docker_args(images=None, force=False):
+    """Command-line options that reproduce deploy_docker(images, force) in a child process."""
+    args = [arg for image in images or [] for arg in ("--image", image)]
+    return args + (["--force-build"] if force else [])
+
+
+def deploy_one(platform, timeout=None, images=None, force=False):
+    """Run one platform's deployer with the options that apply to it."""
+    if platform == "docker":
+        return deploy_docker(images, force=force)
+    if platform == "flyio":
+        return deploy_flyio(timeout)
+    return DEPLOYERS[platform]()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Deploy MQL5 Trading Automation to cloud platforms"
@@ -240,32 +457,69 @@ def main():
         action="store_true",
         help="Build Docker image (for docker platform)"
     )
+    parser.add_argument(
+        "--image",
+        action="append",
+        help="Image to build for docker (repeatable, or 'all'; default: mql5-automation)"
+    )
+    parser.add_argument(
+        "--force-build",
+        action="store_true",
+        help="Rebuild Docker images even if their build context is unchanged"
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="With 'all': deploy one platform after another in this process"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        help="Timeout in seconds: for every platform with 'all', for flyctl deploy with flyio (default: per platform)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="With 'all': maximum platforms deployed at once (default: all)"
+    )
     
     args = parser.parse_args()
     
-    if args.platform == "render":
-        deploy_render()
-    elif args.platform == "railway":
-        deploy_railway()
-    elif args.platform == "docker":
-        deploy_docker()
-    elif args.platform == "flyio":
-        deploy_flyio()
-    elif args.platform == "gcp":
-        deploy_gcp()
-    elif args.platform == "all":
-        print("Setting up configurations for all platforms...\n")
-        deploy_render()
-        print()
-        deploy_railway()
-        print()
-        deploy_flyio()
-        print()
-        deploy_gcp()
-        print()
-        if args.build:
-            deploy_docker()
+    images = None
+    if args.platform == "docker" or (args.platform == "all" and args.build):
+        from docker_cache import IMAGES
+        images = list(IMAGES) if args.image and "all" in args.image else args.image
+        unknown = [i for i in images or [] if i not in IMAGES]
+        if unknown:
+            parser.error(f"unknown image(s): {', '.join(unknown)}; choose from {', '.join(IMAGES)}")
+    
+    if args.platform == "all":
+        platforms = ALL_PLATFORMS + (["docker"] if args.build else [])
+        if args.sequential:
+            print("Setting up configurations for all platforms...\n")
+            results = []
+            for platform in platforms:
+                results.append(deploy_one(platform, args.timeout, images, args.force_build))
+                print()
+            return 0 if all(results) else 1
+        print(f"Deploying {', '.join(platforms)} concurrently (logs in {DEPLOY_LOG_DIR})...\n")
+        start = time.monotonic()
+        runs = deploy_all_concurrently(platforms, timeout=args.timeout, jobs=args.jobs,
+                                       extra_args={"docker": docker_args(images, args.force_build)})
+        print_summary(runs, time.monotonic() - start)
+        return 0 if all(r.state == "ok" for r in runs) else 1
+    
+    return 0 if deploy_one(args.platform, args.timeout, images, args.force_build) else 1
+
+
+DEPLOYERS = {
+    "render": deploy_render,
+    "railway": deploy_railway,
+    "docker": deploy_docker,
+    "flyio": deploy_flyio,
+    "gcp": deploy_gcp,
+}
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Asyncio job queue for deployments.
+
+- one deployment per platform at a time (per-platform lock)
+- at most `max_concurrent` deployments overall (global semaphore)
+- duplicate requests coalesce: asking for a platform that already has a
+  queued job joins that job instead of queueing another one; a request that
+  arrives while the platform is deploying queues exactly one follow-up
+- every job has an ID and can be listed and cancelled
+
+Used by telegram_deploy_bot.py; it has no Telegram dependency itself.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class DeployJob:
+    def __init__(self, job_id: int, platform: str, context: Any = None):
+        self.id = job_id
+        self.platform = platform
+        self.context = context  # whatever the submitter needs to report progress
+        self.state = QUEUED
+        self.summary = ""
+        self.requests = 1
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.watchers: list = []
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def describe(self) -> str:
+        if self.state == RUNNING:
+            detail = f"running for {int(time.time() - self.started)}s"
+        elif self.state == QUEUED:
+            detail = f"queued for {int(time.time() - self.created)}s"
+        else:
+            detail = f"{self.state} in {int(self.finished - (self.started or self.finished))}s"
+        joined = f", {self.requests} requests" if self.requests > 1 else ""
+        return f"#{self.id} {self.platform}: {detail}{joined}"
+
+
+class DeployQueue:
+    """
+    Runs `runner(job) -> (success, summary)` for submitted jobs. Watchers
+    (`on_finish(job)` coroutines) are notified when a job ends, however it ends.
+    """
+
+    def __init__(self, runner: Callable[[DeployJob], Awaitable[Tuple[bool, str]]], max_concurrent: int = 2, history: int = 20):
+        self.runner = runner
+        self.max_concurrent = max_concurrent
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._platform_locks: dict = {}
+        self._ids = itertools.count(1)
+        self._active: dict = {}
+        self._finished = deque(maxlen=history)
+
+    def submit(self, platform: str, context: Any = None,
+               on_finish: Optional[Callable[[DeployJob], Awaitable[None]]] = None) -> Tuple[DeployJob, bool]:
+        """
+        Queue a deployment of `platform`. Returns (job, created); created is
+        False when the request was coalesced into an already queued job.
+        Must be called from the running event loop.
+        """
+        for job in self._active.values():
+            if job.platform == platform and job.state == QUEUED:
+                job.requests += 1
+                if on_finish:
+                    job.watchers.append(on_finish)
+                return job, False
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        job = DeployJob(next(self._ids), platform, context)
+        if on_finish:
+            job.watchers.append(on_finish)
+        self._active[job.id] = job
+        job.task = asyncio.get_running_loop().create_task(self._run(job))
+        return job, True
+
+    async def _run(self, job: DeployJob):
+        lock = self._platform_locks.setdefault(job.platform, asyncio.Lock())
+        try:
+            async with lock:
+                async with self._slots:
+                    job.state = RUNNING
+                    job.started = time.time()
+                    logger.info(f"Job #{job.id} started: {job.platform}")
+                    success, job.summary = await self.runner(job)
+                    job.state = SUCCEEDED if success else FAILED
+        except asyncio.CancelledError:
+            job.state = CANCELLED
+            job.summary = f"🛑 Job #{job.id} ({job.platform}) cancelled"
+        except Exception as e:
+            logger.exception(f"Job #{job.id} crashed")
+            job.state = FAILED
+            job.summary = f"❌ Job #{job.id} ({job.platform}) crashed: {e}"
+        finally:
+            job.finished = time.time()
+            self._active.pop(job.id, None)
+            self._finished.append(job)
+            logger.info(f"Job #{job.id} {job.state}: {job.platform}")
+
+        for watcher in job.watchers:
+            try:
+                await watcher(job)
+            except Exception:
+                logger.exception(f"Job #{job.id} watcher failed")
+
+    def get(self, job_id: int) -> Optional[DeployJob]:
+        if job_id in self._active:
+            return self._active[job_id]
+        return next((job for job in self._finished if job.id == job_id), None)
+
+    def cancel(self, job_id: int) -> Optional[DeployJob]:
+        """Cancel a queued or running job. Returns the job, or None if it is not active."""
+        job = self._active.get(job_id)
+        if job is None:
+            return None
+        job.task.cancel()
+        return job
+
+    def active(self) -> list:
+        return sorted(self._active.values(), key=lambda job: job.id)
+
+    def recent(self) -> list:
+        return list(reversed(self._finished))
+
+    async def wait(self, job: DeployJob):
+        """Wait until `job` has finished (including its watchers)."""
+        await asyncio.gather(job.task, return_exceptions=True)
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Content-addressed Docker builds.
+
+Each image is tagged with a hash of everything that can change it: the
+Dockerfile, the build args and every file of the build context that
+.dockerignore lets through (path, mode and content). If an image with that
+tag already exists locally the build is skipped and the tag is simply
+re-pointed, so a repeated deploy with no changes takes seconds. File content
+hashes are cached in .cache/ keyed by size and mtime, so hashing a large
+context is cheap after the first run. Files modified within a couple of
+seconds of being hashed are always re-hashed, since a second write in the
+same mtime tick would otherwise go unnoticed.
+
+The Python images (Dockerfile, Dockerfile.cloud, Dockerfile.dev) start with
+an identical base section (system packages plus requirements), so once one
+of them is built Docker reuses those layers for the others.
+
+Usage:
+    python scripts/docker_cache.py                 # hashes and cache state of all images
+    python scripts/docker_cache.py --build mql5-automation mql5-automation-cloud
+    python scripts/docker_cache.py --build all --force
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from ci_validate_repo import RACY_WINDOW_NS
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = REPO_ROOT / ".cache" / "docker_context.json"
+CACHE_VERSION = 2
+HASH_LABEL = "org.mql5.context-hash"
+
+# name -> (Dockerfile, build context), relative to the repository root
+IMAGES = {
+    "mql5-automation": ("Dockerfile", "."),
+    "mql5-automation-cloud": ("Dockerfile.cloud", "."),
+    "mql5-automation-dev": ("Dockerfile.dev", "."),
+    "mql5-ea-container": ("Dockerfile.mt5", "."),
+    "mql5-dashboard": ("dashboard/Dockerfile", "dashboard"),
+}
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def save_cache(path: Path, files: dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": files}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        # The cache is an optimization; never fail because of it.
+        pass
+
+
+def _pattern_regex(pattern: str):
+    """Regex for one .dockerignore pattern (anchored at the context root, like Docker)."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        elif pattern.startswith("**", i):
+            i += 2
+            if pattern.startswith("/", i):
+                i += 1
+                out.append("(?:.*/)?")
+            else:
+                out.append(".*")
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i)
+            if end == -1:
+                out.append(re.escape(pattern[i]))
+                i += 1
+            else:
+                out.append(fnmatch.translate(pattern[i:end + 1])[4:-3])
+                i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out))
+
+
+def _literal_prefix(pattern: str) -> str:
+    """The part of a pattern before its first wildcard."""
+    match = re.search(r"[*?\[\\]", pattern)
+    return pattern[:match.start()] if match else pattern
+
+
+def parse_dockerignore(text: str) -> list:
+    """[(regex, negated, pattern)] rules in file order."""
+    rules = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:].strip()
+        pattern = os.path.normpath(line.strip("/")).replace(os.sep, "/")
+        if pattern in (".", ""):
+            continue
+        rules.append((_pattern_regex(pattern), negated, pattern))
+    return rules
+
+
+def is_ignored(rel_path: str, rules) -> bool:
+    """Docker semantics: the last matching rule wins; a pattern matching a directory covers its contents."""
+    parts = rel_path.split("/")
+    candidates = ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    ignored = False
+    for regex, negated, _ in rules:
+        if any(regex.fullmatch(c) for c in candidates):
+            ignored = not negated
+    return ignored
+
+
+def _may_reinclude(rel_dir: str, rules) -> bool:
+    """Whether a negation rule could match something below rel_dir."""
+    rel_dir += "/"
+    for _, negated, pattern in rules:
+        if negated:
+            prefix = _literal_prefix(pattern)
+            if prefix.startswith(rel_dir) or rel_dir.startswith(prefix):
+                return True
+    return False
+
+
+def ignore_file_for(context: Path, dockerfile: Path = None) -> Path:
+    """
+    The ignore file Docker uses: <Dockerfile>.dockerignore next to the
+    Dockerfile if it exists (BuildKit), otherwise the context's .dockerignore.
+    """
+    if dockerfile is not None:
+        specific = Path(str(dockerfile) + ".dockerignore")
+        if specific.exists():
+            return specific
+    return Path(context) / ".dockerignore"
+
+
+def context_files(context: Path, dockerfile: Path = None) -> list:
+    """Relative paths (POSIX) of the files Docker would send as build context."""
+    context = Path(context)
+    ignore_file = ignore_file_for(context, dockerfile)
+    rules = parse_dockerignore(ignore_file.read_text(encoding="utf-8")) if ignore_file.exists() else []
+    files = []
+    for root, dirs, names in os.walk(context):
+        rel_root = Path(root).relative_to(context).as_posix()
+        rel_root = "" if rel_root == "." else rel_root + "/"
+        dirs[:] = [d for d in dirs if not is_ignored(rel_root + d, rules) or _may_reinclude(rel_root + d, rules)]
+        dirs.sort()
+        for name in sorted(names):
+            rel = rel_root + name
+            if not is_ignored(rel, rules):
+                files.append(rel)
+    return files
+
+
+def file_digest(path: Path, cache: dict, rel: str) -> str:
+    st = path.stat()
+    entry = cache.get(rel)
+    if (
+        entry
+        and entry["size"] == st.st_size
+        and entry["mtime_ns"] == st.st_mtime_ns
+        and entry["checked_ns"] - st.st_mtime_ns > RACY_WINDOW_NS
+    ):
+        return entry["hash"]
+    checked_ns = time.time_ns()
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    cache[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "checked_ns": checked_ns, "hash": digest}
+    return digest
+
+
+def context_hash(dockerfile: Path, context: Path, build_args: dict = None, cache: dict = None) -> str:
+    """Hash of the Dockerfile, build args and the context file set (paths, modes and contents)."""
+    cache = {} if cache is None else cache
+    context = Path(context).resolve()
+    dockerfile = Path(dockerfile).resolve()
+    h = hashlib.sha256()
+    h.update(b"dockerfile\0" + dockerfile.read_bytes() + b"\0")
+    for key, value in sorted((build_args or {}).items()):
+        h.update(f"arg\0{key}={value}\0".encode("utf-8"))
+    for rel in context_files(context, dockerfile):
+        path = context / rel
+        if path.is_symlink() or not path.is_file():
+            continue
+        cache_key = f"{context}/{rel}"
+        mode = "x" if os.access(path, os.X_OK) else "-"
+        h.update(f"file\0{rel}\0{mode}\0{file_digest(path, cache, cache_key)}\0".encode("utf-8"))
+    return h.hexdigest()
+
+
+def image_exists(tag: str) -> bool:
+    try:
+        result = subprocess.run(["docker", "image", "inspect", tag], capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def build_image(name: str, dockerfile: Path, context: Path, digest: str, force: bool = False, build_args: dict = None) -> str:
+    """
+    Build `name` unless `name:ctx-<digest>` already exists. Either way
+    `name:latest` ends up pointing at it. Returns "cached", "built" or "failed".
+    """
+    tag = f"{name}:ctx-{digest[:12]}"
+    if not force and image_exists(tag):
+        # A cached image only counts if :latest really points at it now
+        try:
+            result = subprocess.run(["docker", "tag", tag, f"{name}:latest"], capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            return "failed"
+        if result.returncode != 0:
+            print(f"✗ docker tag {tag} {name}:latest failed: {result.stderr.strip()}")
+            return "failed"
+        return "cached"
+
+    cmd = ["docker", "build", "-f", str(dockerfile), "-t", tag, "-t", f"{name}:latest", "--label", f"{HASH_LABEL}={digest}"]
+    for key, value in sorted((build_args or {}).items()):
+        cmd += ["--build-arg", f"{key}={value}"]
+    cmd.append(str(context))
+    env = {**os.environ, "DOCKER_BUILDKIT": "1"}
+    try:
+        result = subprocess.run(cmd, cwd=REPO_ROOT, env=env)
+    except FileNotFoundError:
+        return "failed"
+    return "built" if result.returncode == 0 else "failed"
+
+
+def build_images(names, force: bool = False, use_cache: bool = True, root: Path = REPO_ROOT) -> dict:
+    """Hash and (re)build the named images. Returns {name: (status, digest)}."""
+    cache = load_cache(CACHE_PATH) if use_cache else {}
+    results = {}
+    for name in names:
+        dockerfile, context = IMAGES[name]
+        dockerfile, context = root / dockerfile, root / context
+        if not dockerfile.exists():
+            results[name] = ("missing", "")
+            continue
+        digest = context_hash(dockerfile, context, cache=cache)
+        print(f"{name}: context {digest[:12]}")
+        results[name] = (build_image(name, dockerfile, context, digest, force), digest)
+    if use_cache:
+        save_cache(CACHE_PATH, cache)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Content-addressed Docker image builds")
+    parser.add_argument("--build", nargs="+", metavar="IMAGE", help=f"Images to build ({', '.join(IMAGES)} or all)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the context hash is unchanged")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use or update the file hash cache")
+    args = parser.parse_args()
+
+    if args.build:
+        names = list(IMAGES) if "all" in args.build else args.build
+        unknown = [n for n in names if n not in IMAGES]
+        if unknown:
+            parser.error(f"unknown image(s): {', '.join(unknown)}")
+        results = build_images(names, force=args.force, use_cache=not args.no_cache)
+        print()
+        for name, (status, digest) in results.items():
+            icon = {"cached": "✓", "built": "✓", "missing": "⚠"}.get(status, "✗")
+            print(f"{icon} {name}: {status}" + (f" ({name}:ctx-{digest[:12]})" if digest else ""))
+        return 0 if all(s in ("cached", "built") for s, _ in results.values()) else 1
+
+    cache = load_cache(CACHE_PATH) if not args.no_cache else {}
+    print("=" * 60)
+    print("DOCKER BUILD CONTEXTS")
+    print("=" * 60)
+    for name, (dockerfile, context) in IMAGES.items():
+        dockerfile, context = REPO_ROOT / dockerfile, REPO_ROOT / context
+        if not dockerfile.exists():
+            print(f"⚠ {name}: {dockerfile.name} not found")
+            continue
+        files = context_files(context, dockerfile)
+        digest = context_hash(dockerfile, context, cache=cache)
+        state = "cached" if image_exists(f"{name}:ctx-{digest[:12]}") else "needs build"
+        print(f"{name:<24} {len(files):>5} files  ctx-{digest[:12]}  {state}")
+    if not args.no_cache:
+        save_cache(CACHE_PATH, cache)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
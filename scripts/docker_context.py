@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Minimal Docker build contexts.
+
+The Python images COPY the whole repository, so every doc, icon and MQL5
+file is uploaded as build context and any change to them invalidates the
+`COPY . .` layer. This script works out which files an image actually needs:
+
+- the sources of its explicit COPY/ADD instructions
+- the scripts its CMD/ENTRYPOINT/RUN/HEALTHCHECK instructions run
+- everything those scripts reach: local Python imports, files and
+  directories they name through path expressions (REPO_ROOT / "config" ...),
+  and repository files mentioned in their string literals, shell scripts
+  and config files (e.g. the components listed in startup_config.json)
+
+The result is filtered through .dockerignore as usual. It can be written as
+a per-Dockerfile ignore file (<Dockerfile>.dockerignore, which BuildKit uses
+instead of .dockerignore and docker_cache.py honours when hashing) or staged
+as a slim context directory.
+
+An image without a traceable entrypoint (the dev image, the nginx dashboard)
+keeps its full context. Files reached only through computed paths or
+dynamic imports cannot be found; add them with --include.
+
+Usage:
+    python scripts/docker_context.py                     # full vs minimal context per image
+    python scripts/docker_context.py --list mql5-automation-cloud
+    python scripts/docker_context.py --write-dockerignore
+    python scripts/docker_context.py --check             # generated ignore files up to date (CI)
+    python scripts/docker_context.py --stage build/ctx mql5-automation
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import shlex
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from docker_cache import IMAGES, _pattern_regex, context_files
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HEADER = "# Generated by scripts/docker_context.py; regenerate with --write-dockerignore instead of editing.\n"
+SCANNED_SUFFIXES = {".py", ".sh", ".json", ".yaml", ".yml", ".toml"}
+PATH_TOKEN = re.compile(r"[\w.\-/]+")
+
+
+def dockerfile_instructions(text: str) -> list:
+    """[(KEYWORD, arguments)] with line continuations joined and comments dropped."""
+    instructions = []
+    current = ""
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith("#")):
+            continue
+        if current and stripped.startswith("#"):
+            continue
+        if stripped.endswith("\\"):
+            current += stripped[:-1] + " "
+            continue
+        current += stripped
+        keyword, _, args = current.partition(" ")
+        instructions.append((keyword.upper(), args.strip()))
+        current = ""
+    if current:
+        keyword, _, args = current.partition(" ")
+        instructions.append((keyword.upper(), args.strip()))
+    return instructions
+
+
+def _words(args: str) -> list:
+    """Words of an instruction in exec (JSON) or shell form."""
+    if args.startswith("["):
+        try:
+            return [str(word) for word in json.loads(args)]
+        except ValueError:
+            pass
+    try:
+        return shlex.split(args, comments=True)
+    except ValueError:
+        return args.split()
+
+
+def dockerfile_plan(dockerfile: Path) -> tuple:
+    """
+    (COPY/ADD sources from the build context, words of the RUN commands,
+    words of the commands the container runs: CMD/ENTRYPOINT/HEALTHCHECK).
+    """
+    sources, commands, entrypoints = [], [], []
+    for keyword, args in dockerfile_instructions(Path(dockerfile).read_text(encoding="utf-8")):
+        if keyword in ("COPY", "ADD"):
+            words = _words(args)
+            if any(w.startswith("--from") for w in words):
+                continue
+            sources += [w for w in words if not w.startswith("--")][:-1]
+        elif keyword == "RUN":
+            commands += _words(args)
+        elif keyword in ("CMD", "ENTRYPOINT"):
+            entrypoints += _words(args)
+        elif keyword == "HEALTHCHECK" and " CMD " in f" {args} ":
+            entrypoints += _words(args.split("CMD", 1)[1].strip())
+    return sources, commands, entrypoints
+
+
+def _repo_file(token: str, base: Path, root: Path):
+    """The repository file a path-like token names (relative to base or root), if any."""
+    token = token.strip("'\"`,;()")
+    if not PATH_TOKEN.fullmatch(token) or token.startswith("-") or len(token) > 255:
+        return None
+    for start in (base, root):
+        try:
+            candidate = (start / token).resolve()
+        except (OSError, ValueError):
+            continue
+        if candidate.is_file() and candidate.is_relative_to(root) and candidate != root:
+            return candidate
+    return None
+
+
+# Path methods that do not read a directory's contents
+NON_READING_METHODS = {"mkdir", "exists", "is_dir"}
+
+
+class _PathEvaluator:
+    """
+    Statically evaluates the path expressions of one Python module. A value
+    is (path, named): named is True once a string component was joined on,
+    which tells REPO_ROOT / "config" (a reference) apart from
+    Path(__file__).parent (an anchor).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.env = {}
+
+    def eval(self, node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id == "__file__":
+                return (self.path, False)
+            return self.env.get(node.id)
+        if isinstance(node, ast.Attribute):
+            value = self.eval(node.value)
+            if isinstance(value, tuple) and node.attr == "parent":
+                return (value[0].parent, value[1])
+            return None
+        if isinstance(node, ast.Subscript):
+            value = self.eval(node.value)
+            if (isinstance(node.value, ast.Attribute) and node.value.attr == "parents"
+                    and isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, int)):
+                base = self.eval(node.value.value)
+                if isinstance(base, tuple):
+                    parents = base[0].parents
+                    if node.slice.value < len(parents):
+                        return (parents[node.slice.value], base[1])
+            return value if isinstance(value, tuple) else None
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
+            return self._join(self.eval(node.left), [self.eval(node.right)])
+        if isinstance(node, ast.Call):
+            return self._call(node)
+        return None
+
+    def _call(self, node: ast.Call):
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+        args = [self.eval(arg) for arg in node.args]
+        if name in ("resolve", "absolute") and isinstance(func, ast.Attribute):
+            return self.eval(func.value)
+        if name in ("Path", "PurePath", "str", "abspath", "realpath", "normpath", "fspath") and args:
+            value = args[0]
+            if isinstance(value, str) and name in ("Path", "PurePath") and len(args) == 1:
+                return None  # a bare relative string; handled as a literal
+            return value if isinstance(value, tuple) else None
+        if name == "dirname" and args and isinstance(args[0], tuple):
+            return (args[0][0].parent, args[0][1])
+        if name in ("join", "joinpath") and args:
+            if name == "joinpath" and isinstance(func, ast.Attribute):
+                return self._join(self.eval(func.value), args)
+            return self._join(args[0], args[1:])
+        return None
+
+    @staticmethod
+    def _join(base, parts):
+        if not isinstance(base, tuple) or not parts:
+            return None
+        path, named = base
+        for part in parts:
+            if isinstance(part, str):
+                path, named = Path(os.path.normpath(path / part)), True
+            else:
+                return None
+        return (path, named)
+
+    def references(self, tree) -> set:
+        """Named paths of all outermost path expressions in the module."""
+        # Assignments first (twice, so names defined from later names resolve too)
+        assigns = [n for n in ast.walk(tree) if isinstance(n, ast.Assign) and len(n.targets) == 1
+                   and isinstance(n.targets[0], ast.Name)]
+        for _ in range(2):
+            for node in assigns:
+                value = self.eval(node.value)
+                if isinstance(value, tuple):
+                    self.env[node.targets[0].id] = value
+
+        # A name like DOCS_DIR = REPO_ROOT / "docs" that is only ever joined on
+        # (DOCS_DIR / "report.md") or created (DOCS_DIR.mkdir()) references
+        # those files, not the whole directory
+        joined = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
+                joined.add(id(node.left))
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+                if node.func.attr == "joinpath" and node.args or node.func.attr in NON_READING_METHODS:
+                    joined.add(id(node.func.value))
+                elif node.func.attr == "join" and len(node.args) > 1 or node.func.attr == "makedirs" and node.args:
+                    joined.add(id(node.args[0]))
+        loads = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                loads.setdefault(node.id, []).append(id(node) in joined)
+        only_joined = {id(n.value) for n in assigns if loads.get(n.targets[0].id) and all(loads[n.targets[0].id])}
+
+        inner = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
+                inner.update(id(child) for child in (node.left, node.right))
+            elif isinstance(node, ast.Call):
+                inner.update(id(arg) for arg in node.args)
+                if isinstance(node.func, ast.Attribute):
+                    inner.add(id(node.func.value))
+            elif isinstance(node, (ast.Attribute, ast.Subscript)):
+                inner.add(id(node.value))
+        found = set()
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.BinOp, ast.Call)) and id(node) not in inner and id(node) not in only_joined:
+                value = self.eval(node)
+                if isinstance(value, tuple) and value[1]:
+                    found.add(value[0])
+        return found
+
+
+def _module_files(name: str, level: int, path: Path, root: Path) -> list:
+    """Local files an import of `name` may load (modules and package __init__s)."""
+    if level:
+        bases = [path.parents[level - 1]]
+    else:
+        bases = [path.parent, root]
+    parts = name.split(".") if name else []
+    found = []
+    for base in bases:
+        current = base
+        for i, part in enumerate(parts):
+            current = current / part
+            init = current / "__init__.py"
+            if init.is_file():
+                found.append(init)
+            elif i == len(parts) - 1 and current.with_suffix(".py").is_file():
+                found.append(current.with_suffix(".py"))
+        if found:
+            break
+    return found
+
+
+def python_references(path: Path, root: Path = REPO_ROOT) -> tuple:
+    """(files, directories) a Python script imports or names."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (SyntaxError, UnicodeDecodeError, OSError):
+        return set(), set()
+
+    files, dirs = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                files.update(_module_files(alias.name, 0, path, root))
+        elif isinstance(node, ast.ImportFrom):
+            files.update(_module_files(node.module or "", node.level, path, root))
+            for alias in node.names:  # "from package import module"
+                files.update(_module_files(f"{node.module}.{alias.name}" if node.module else alias.name,
+                                           node.level, path, root))
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str) and len(node.value) < 500:
+            for token in node.value.split():
+                found = _repo_file(token, root, root)
+                if found:
+                    files.add(found)
+
+    for ref in _PathEvaluator(path).references(tree):
+        if ref.is_relative_to(root) and ref != root:
+            if ref.is_dir():
+                dirs.add(ref)
+            elif ref.is_file():
+                files.add(ref)
+    files.discard(path)
+    return files, dirs
+
+
+def text_references(path: Path, root: Path = REPO_ROOT) -> set:
+    """Repository files named in a shell script or config file."""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (UnicodeDecodeError, OSError):
+        return set()
+    found = set()
+    for token in set(PATH_TOKEN.findall(text)):
+        ref = _repo_file(token, path.parent, root)
+        if ref and ref != path:
+            found.add(ref)
+    return found
+
+
+def trace(entries, root: Path = REPO_ROOT, allowed=None) -> tuple:
+    """
+    (files, directories) reachable from the entry files. With `allowed`
+    (relative paths), references to other files are not followed, so caches
+    and ignored files do not pull in everything they mention.
+    """
+    root = root.resolve()
+    pending = [Path(e).resolve() for e in entries]
+    files, dirs = set(), set()
+    while pending:
+        path = pending.pop()
+        if path in files:
+            continue
+        if allowed is not None and path.relative_to(root).as_posix() not in allowed:
+            continue
+        files.add(path)
+        if path.suffix not in SCANNED_SUFFIXES:
+            continue
+        if path.suffix == ".py":
+            refs, found_dirs = python_references(path, root)
+            for directory in found_dirs - dirs:
+                # Scripts and configs inside a referenced directory are followed too
+                refs |= {f for f in directory.rglob("*") if f.suffix in SCANNED_SUFFIXES and f.is_file()}
+            dirs |= found_dirs
+        else:
+            refs = text_references(path, root)
+        pending.extend(refs - files)
+    return files, dirs
+
+
+def minimal_context(name: str, root: Path = REPO_ROOT, entries=(), include=()):
+    """
+    (full, minimal) relative file lists of an image's build context.
+    minimal is None when the image has no traceable entrypoint.
+    """
+    dockerfile, context = IMAGES[name]
+    dockerfile, context = (root / dockerfile).resolve(), (root / context).resolve()
+    full = context_files(context)
+    sources, commands, entrypoints = dockerfile_plan(dockerfile)
+
+    entry_files = [context / e for e in entries]
+    entry_files += [f for f in (_repo_file(word, context, context) for word in entrypoints) if f]
+    if not entry_files:
+        return full, None
+    entry_files += [f for f in (_repo_file(word, context, context) for word in commands) if f]
+
+    for source in sources:
+        source = source.strip("/") or "."
+        if source != "." and not (context / source).is_dir():
+            entry_files.append(context / source)
+    files, dirs = trace(entry_files, context, allowed=set(full))
+    wanted = {f.relative_to(context).as_posix() for f in files if f.is_relative_to(context)}
+    prefixes = tuple(d.relative_to(context).as_posix() + "/" for d in dirs if d.is_relative_to(context))
+
+    extra = [_pattern_regex(p.strip("/")) for p in include]
+    minimal = [
+        rel for rel in full
+        if rel in wanted or rel.startswith(prefixes)
+        or any(regex.fullmatch(rel) or regex.fullmatch(rel.split("/")[0]) for regex in extra)
+    ]
+    return full, minimal
+
+
+def _escape(rel: str) -> str:
+    return re.sub(r"([*?\[\\])", r"\\\1", rel)
+
+
+def render_dockerignore(minimal: list) -> str:
+    """Ignore file that excludes everything except the given files."""
+    lines = [HEADER, "*\n"]
+    lines += [f"!{_escape(rel)}\n" for rel in minimal]
+    return "".join(lines)
+
+
+def stage_context(name: str, minimal: list, dest: Path, root: Path = REPO_ROOT) -> Path:
+    """Copy (hard-link where possible) the minimal context and Dockerfile into dest/<name>."""
+    dockerfile, context = IMAGES[name]
+    target = Path(dest) / name
+    if target.exists():
+        shutil.rmtree(target)
+    for rel in sorted(set(minimal) | {Path(dockerfile).relative_to(Path(context)).as_posix()}):
+        src, dst = root / context / rel, target / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+    return target
+
+
+def _size(context: Path, files) -> int:
+    return sum((context / rel).stat().st_size for rel in files)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compute minimal Docker build contexts")
+    parser.add_argument("images", nargs="*", help=f"Images ({', '.join(IMAGES)}; default: all)")
+    parser.add_argument("--list", action="store_true", help="Print the minimal file list")
+    parser.add_argument("--write-dockerignore", action="store_true", help="Write <Dockerfile>.dockerignore files")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a generated ignore file is out of date")
+    parser.add_argument("--stage", metavar="DIR", help="Stage minimal contexts under DIR/<image>")
+    parser.add_argument("--entry", action="append", default=[], help="Extra entrypoint (relative to the context)")
+    parser.add_argument("--include", action="append", default=[], help="Extra .dockerignore-style pattern to keep")
+    args = parser.parse_args()
+
+    names = args.images or list(IMAGES)
+    unknown = [n for n in names if n not in IMAGES]
+    if unknown:
+        parser.error(f"unknown image(s): {', '.join(unknown)}")
+
+    if not (args.list or args.check):
+        print("=" * 60)
+        print("MINIMAL DOCKER BUILD CONTEXTS")
+        print("=" * 60)
+
+    stale = []
+    for name in names:
+        dockerfile, context = IMAGES[name]
+        context_dir = REPO_ROOT / context
+        full, minimal = minimal_context(name, entries=args.entry, include=args.include)
+        ignore_path = Path(str(REPO_ROOT / dockerfile) + ".dockerignore")
+
+        if args.list:
+            for rel in minimal if minimal is not None else full:
+                print(rel)
+            continue
+        if minimal is None:
+            if not args.check:
+                print(f"⚠ {name}: no traceable entrypoint, keeping the full context ({len(full)} files)")
+            continue
+
+        if args.check:
+            current = ignore_path.read_text(encoding="utf-8") if ignore_path.exists() else None
+            if current is not None and current != render_dockerignore(minimal):
+                stale.append(ignore_path.name)
+            continue
+
+        full_kb, minimal_kb = _size(context_dir, full) / 1024, _size(context_dir, minimal) / 1024
+        print(f"✓ {name:<24} {len(full):>5} -> {len(minimal):<5} files  "
+              f"{full_kb:>8.0f} -> {minimal_kb:.0f} KB")
+        if args.write_dockerignore:
+            ignore_path.write_text(render_dockerignore(minimal), encoding="utf-8")
+            print(f"  wrote {ignore_path.relative_to(REPO_ROOT)}")
+        if args.stage:
+            target = stage_context(name, minimal, Path(args.stage))
+            print(f"  staged {target}  (docker build -f {target / Path(dockerfile).name} {target})")
+
+    if args.check:
+        if stale:
+            print(f"✗ Out of date: {', '.join(stale)} (run scripts/docker_context.py --write-dockerignore)")
+            return 1
+        print("✓ Generated .dockerignore files are up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
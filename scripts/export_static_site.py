@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Export the web dashboard as a static site for CDN / GitHub Pages hosting.
+
+Renders the dashboard template and every docs/*.md page to HTML, writes
+shared assets under content-hashed file names (safe to cache forever), and
+precompresses text files as .gz (and .br when the optional `brotli` package
+is installed). Images the pages reference by relative path are fingerprinted
+the same way and the references rewritten. The PWA icons are also copied
+under their fixed names, which manifest.json points at; serve icons/ with a
+short cache lifetime. The result can be served without any Python process.
+
+The output directory is only ever cleared when it holds a previous export
+(marked by a .static-export file); the repository root, its parents and the
+source directories are always refused.
+
+Usage:
+    python scripts/export_static_site.py
+    python scripts/export_static_site.py --output dist/site --no-compress
+"""
+
+import argparse
+import gzip
+import hashlib
+import html
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from web_dashboard import DASHBOARD_CSS, app, get_cached_markdown, render_dashboard
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DOCS_DIR = REPO_ROOT / "docs"
+ICONS_DIR = REPO_ROOT / "icons"
+DEFAULT_OUTPUT = REPO_ROOT / "dist" / "site"
+EXPORT_MARKER = ".static-export"
+
+# Never exported into (or cleared), nor any directory above them
+SOURCE_DIRS = [DOCS_DIR, ICONS_DIR, REPO_ROOT / "scripts", REPO_ROOT / "config", REPO_ROOT / "mt5", REPO_ROOT / ".git"]
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico"}
+
+# Text formats worth precompressing; tiny files gain nothing
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml"}
+MIN_COMPRESS_SIZE = 256
+
+DOC_PAGE_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <title>{{ title }} | MQL5 Trading Automation</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <link rel="stylesheet" href="{{ stylesheet_href }}">
+</head>
+<body>
+    <a href="#content" class="skip-link">Skip to main content</a>
+    <div class="nav">
+        <a href="{{ home_href }}">Dashboard</a>
+        <a href="{{ docs_index_href }}">All Docs</a>
+    </div>
+
+    <div id="content" class="card">
+        {{ body|safe }}
+    </div>
+
+    <footer>
+        <p>&copy; {{ year }} MQL5 Trading Automation | Dashboard v1.0.0</p>
+    </footer>
+</body>
+</html>
+"""
+
+# href="something.md" or href="something.md#anchor" (relative links only)
+MD_LINK_RE = re.compile(r'href="(?![a-z][a-z0-9+.-]*:|/|#)([^"#]+\.md)(#[^"]*)?"', re.IGNORECASE)
+HEADING_RE = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+# src="img.png" / href="icons/icon.svg" (relative image references only)
+LOCAL_IMAGE_RE = re.compile(
+    r'(src|href)="(?![a-z][a-z0-9+.-]*:|/|#)([^"#?]+\.(?:png|jpe?g|gif|svg|webp|ico))(?:[?#][^"]*)?"',
+    re.IGNORECASE,
+)
+
+
+def doc_output_path(src):
+    """Site-relative output page for a docs/*.md source."""
+    # docs/INDEX.md would collide with the generated docs/index.html on
+    # case-insensitive filesystems (Windows/macOS checkouts of the pages repo)
+    if src.stem.lower() == "index":
+        return f"docs/{src.stem}-page.html"
+    return f"docs/{src.stem}.html"
+
+
+def hashed_name(rel_path, data):
+    """Insert a short content hash before the extension: app.css -> app.3f2a9c1b7d.css"""
+    stem, suffix = posixpath.splitext(rel_path)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{suffix}"
+
+
+def relative_href(from_page, to_path):
+    """Relative URL from one output page to another output path (both POSIX, site-relative)."""
+    return posixpath.relpath(to_path, posixpath.dirname(from_page) or ".")
+
+
+def rewrite_doc_links(html_text, source_path, page_path, exported):
+    """
+    Point links to exported markdown files at their rendered .html pages.
+
+    exported maps resolved source Paths to site-relative output paths. Links
+    to markdown that is not part of the export are left untouched.
+    """
+    def _sub(match):
+        target = (source_path.parent / match.group(1)).resolve()
+        out = exported.get(target)
+        if out is None:
+            return match.group(0)
+        return f'href="{relative_href(page_path, out)}{match.group(2) or ""}"'
+
+    return MD_LINK_RE.sub(_sub, html_text)
+
+
+def doc_title(md_path):
+    """First level-1 heading of a markdown file, falling back to its file name."""
+    try:
+        match = HEADING_RE.search(md_path.read_text(encoding="utf-8", errors="replace"))
+    except OSError:
+        match = None
+    return match.group(1).strip() if match else md_path.stem.replace("_", " ")
+
+
+def local_images(html_text, source_path):
+    """
+    Repository files referenced as relative images from a page rendered from
+    source_path. Pages keep their source's directory (README.md -> index.html,
+    docs/X.md -> docs/X.html), so the references stay valid once each file is
+    copied to its repo-relative path. Targets outside the repo are ignored.
+    """
+    images = set()
+    for match in LOCAL_IMAGE_RE.finditer(html_text):
+        target = _image_target(match, source_path)
+        if target is not None:
+            images.add(target)
+    return images
+
+
+def _image_target(match, source_path):
+    target = (source_path.parent / html.unescape(match.group(2))).resolve()
+    if target.is_relative_to(REPO_ROOT) and target.is_file():
+        return target
+    return None
+
+
+def rewrite_images(html_text, source_path, page_path, assets):
+    """
+    Point the local images of a page (see local_images) at content-hashed
+    copies. assets maps resolved source Paths to their hashed site-relative
+    paths and is filled in as new images are found; the caller copies them.
+    """
+    def _sub(match):
+        target = _image_target(match, source_path)
+        if target is None:
+            return match.group(0)
+        if target not in assets:
+            assets[target] = hashed_name(target.relative_to(REPO_ROOT).as_posix(), target.read_bytes())
+        return f'{match.group(1)}="{relative_href(page_path, assets[target])}"'
+
+    return LOCAL_IMAGE_RE.sub(_sub, html_text)
+
+
+def prepare_output_dir(output_dir):
+    """
+    Create output_dir, or clear a previous export in it. Raises ValueError
+    for the repository root, its parents, source directories, and existing
+    non-empty directories that were not written by this exporter.
+    """
+    target = Path(output_dir).resolve()
+    if target == REPO_ROOT or target in REPO_ROOT.parents:
+        raise ValueError(f"refusing to export into {target}: it contains the repository")
+    for source in SOURCE_DIRS:
+        if target == source or source in target.parents or target in source.parents:
+            raise ValueError(f"refusing to export into {target}: it overlaps the source directory {source.name}/")
+
+    if target.exists():
+        if not target.is_dir():
+            raise ValueError(f"refusing to export into {target}: not a directory")
+        if (target / EXPORT_MARKER).is_file():
+            shutil.rmtree(target)
+        elif any(target.iterdir()):
+            raise ValueError(f"refusing to export into {target}: not empty and not a previous export")
+    target.mkdir(parents=True, exist_ok=True)
+    (target / EXPORT_MARKER).write_bytes(b"")
+    return target
+
+
+def precompress(path):
+    """Write .gz (and .br when available) siblings. Returns the files written."""
+    data = path.read_bytes()
+    if path.suffix not in COMPRESSIBLE_SUFFIXES or len(data) < MIN_COMPRESS_SIZE:
+        return []
+
+    written = []
+    # mtime=0 keeps the output byte-for-byte reproducible between builds
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        gz_path = path.with_name(path.name + ".gz")
+        gz_path.write_bytes(gz)
+        written.append(gz_path)
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            br_path = path.with_name(path.name + ".br")
+            br_path.write_bytes(br)
+            written.append(br_path)
+    return written
+
+
+def export_site(output_dir, compress=True):
+    """
+    Build the static site into output_dir. Returns the asset manifest
+    (logical name -> site-relative path) that is also written to
+    asset-manifest.json. Raises ValueError if output_dir is not safe to
+    (re)write, see prepare_output_dir.
+    """
+    output_dir = prepare_output_dir(output_dir)
+
+    manifest = {}
+    # PWA icons keep their fixed names; images referenced by pages get hashed copies
+    icons = sorted(path for path in ICONS_DIR.glob("*") if path.suffix.lower() in IMAGE_SUFFIXES)
+    images = {}
+
+    def write(rel_path, data):
+        dest = output_dir / rel_path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_bytes(data)
+        return dest
+
+    # Hashed assets first so pages can reference their final names
+    css_bytes = DASHBOARD_CSS.encode("utf-8")
+    css_path = hashed_name("assets/dashboard.css", css_bytes)
+    write(css_path, css_bytes)
+    manifest["assets/dashboard.css"] = css_path
+
+    doc_sources = sorted(DOCS_DIR.glob("*.md"))
+    exported = {src.resolve(): doc_output_path(src) for src in doc_sources}
+    exported[Path(REPO_ROOT / "README.md").resolve()] = "index.html"
+
+    # Dashboard (README links are relative to the repo root)
+    dashboard_html = render_dashboard(stylesheet_href=css_path, docs_index_href="docs/index.html")
+    dashboard_html = rewrite_doc_links(dashboard_html, REPO_ROOT / "README.md", "index.html", exported)
+    dashboard_html = rewrite_images(dashboard_html, REPO_ROOT / "README.md", "index.html", images)
+    write("index.html", dashboard_html.encode("utf-8"))
+    manifest["index.html"] = "index.html"
+
+    # Docs pages
+    template = app.jinja_env.from_string(DOC_PAGE_HTML)
+    index_items = []
+    for src in doc_sources:
+        page_path = exported[src.resolve()]
+        body = get_cached_markdown(str(src))
+        if body is None:
+            print(f"  ⚠ Skipping unreadable {src.relative_to(REPO_ROOT)}")
+            continue
+        body = rewrite_doc_links(body, src, page_path, exported)
+        body = rewrite_images(body, src, page_path, images)
+        title = doc_title(src)
+        page = template.render(
+            title=title,
+            body=body,
+            stylesheet_href=relative_href(page_path, css_path),
+            home_href=relative_href(page_path, "index.html"),
+            docs_index_href=relative_href(page_path, "docs/index.html"),
+            year=2026,
+        )
+        write(page_path, page.encode("utf-8"))
+        manifest[page_path] = page_path
+        index_items.append((title, posixpath.basename(page_path)))
+
+    listing = "\n".join(
+        f'<li><a href="{href}">{html.escape(title)}</a></li>' for title, href in index_items
+    )
+    index_page = template.render(
+        title="Documentation",
+        body=f"<h1>Documentation</h1>\n<ul>\n{listing}\n</ul>",
+        stylesheet_href=relative_href("docs/index.html", css_path),
+        home_href="../index.html",
+        docs_index_href="index.html",
+        year=2026,
+    )
+    write("docs/index.html", index_page.encode("utf-8"))
+    manifest["docs/index.html"] = "docs/index.html"
+
+    for icon in icons:
+        rel = icon.relative_to(REPO_ROOT).as_posix()
+        write(rel, icon.read_bytes())
+        manifest[rel] = rel
+    for image, hashed in sorted(images.items()):
+        write(hashed, image.read_bytes())
+        manifest[image.relative_to(REPO_ROOT).as_posix()] = hashed
+
+    # GitHub Pages: serve files as-is without Jekyll processing
+    write(".nojekyll", b"")
+
+    write("asset-manifest.json", (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+
+    if compress:
+        for dirpath, _, filenames in os.walk(output_dir):
+            for name in filenames:
+                precompress(Path(dirpath) / name)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the web dashboard and docs as a static site")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help=f"Output directory (default: {DEFAULT_OUTPUT.relative_to(REPO_ROOT)})")
+    parser.add_argument("--no-compress", action="store_true", help="Skip writing .gz/.br precompressed files")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Static Site Export")
+    print("=" * 60)
+    try:
+        manifest = export_site(args.output, compress=not args.no_compress)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+
+    total = sum(f.stat().st_size for f in args.output.rglob("*") if f.is_file())
+    print(f"✓ Pages rendered: {sum(1 for k in manifest if k.endswith('.html'))}")
+    print(f"✓ Stylesheet: {manifest['assets/dashboard.css']}")
+    print(f"✓ Images: {sum(1 for k in manifest if posixpath.splitext(k)[1].lower() in IMAGE_SUFFIXES)}")
+    if args.no_compress:
+        print("ℹ Precompression skipped")
+    elif brotli is None:
+        print("✓ Precompressed: .gz (install 'brotli' for .br)")
+    else:
+        print("✓ Precompressed: .gz, .br")
+    print(f"✓ Output: {args.output} ({total / 1024:.1f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
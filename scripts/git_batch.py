@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Batched git access for the review tooling.
+
+Answers the questions review_pull_requests.py, review_working_trees.py and
+analyze_pr_optimizations.py ask about many branches at once, with a fixed
+number of git processes instead of several per branch:
+
+- one `git for-each-ref` snapshot of every branch (name, tip, date, HEAD)
+- one long-lived `git cat-file --batch` process for objects and file contents
+- one `git rev-list --parents` read from which ahead/behind and merged
+  status of every branch is computed in Python
+
+Ahead/behind results are cached in .cache/git_batch.json keyed by the
+(base, tip) commit ids, so they stay valid until either side moves.
+
+Usage:
+    python scripts/git_batch.py                     # branch table vs origin/main
+    python scripts/git_batch.py --base main --json
+"""
+
+import argparse
+import atexit
+import json
+import os
+import subprocess
+import sys
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = REPO_ROOT / ".cache" / "git_batch.json"
+CACHE_VERSION = 1
+MAX_CACHE_ENTRIES = 5000
+
+REF_FORMAT = "%(refname)%00%(objectname)%00%(committerdate:unix)%00%(committerdate:iso8601)%00%(HEAD)"
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("ahead_behind", {})
+
+
+def save_cache(path: Path, entries: dict) -> None:
+    # Keep the most recently added entries only
+    if len(entries) > MAX_CACHE_ENTRIES:
+        entries = dict(list(entries.items())[-MAX_CACHE_ENTRIES:])
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "ahead_behind": entries}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        # The cache is an optimization; never fail because of it.
+        pass
+
+
+def count_ahead_behind(parents: dict[str, list[str]], base: str, tips) -> dict[str, tuple[int, int]]:
+    """
+    Ahead/behind counts of each tip relative to base, from a commit -> parents
+    map covering the history of all of them. Same result as
+    `git rev-list --left-right --count base...tip`.
+    """
+    def reachable(start):
+        seen = set()
+        stack = [start]
+        while stack:
+            oid = stack.pop()
+            if oid in seen:
+                continue
+            seen.add(oid)
+            stack.extend(parents.get(oid, ()))
+        return seen
+
+    base_set = reachable(base)
+    result = {}
+    for tip in tips:
+        if tip in result:
+            continue
+        if tip == base:
+            result[tip] = (0, 0)
+            continue
+        tip_set = reachable(tip)
+        result[tip] = (len(tip_set - base_set), len(base_set - tip_set))
+    return result
+
+
+def find_merge_bases(parents: dict[str, list[str]], base: str, tips) -> dict[str, str]:
+    """
+    Best common ancestor of base and each tip, from the same commit -> parents
+    map as count_ahead_behind. Tips with no common history are omitted.
+    """
+    def reachable(starts, within=None):
+        seen = set()
+        stack = list(starts)
+        while stack:
+            oid = stack.pop()
+            if oid in seen or (within is not None and oid not in within):
+                continue
+            seen.add(oid)
+            stack.extend(parents.get(oid, ()))
+        return seen
+
+    base_set = reachable([base])
+    result = {}
+    for tip in tips:
+        if tip in base_set:
+            result[tip] = tip
+            continue
+        # Walk the tip's own commits; the base-side commits it runs into are candidates
+        boundary, seen, stack = set(), set(), [tip]
+        while stack:
+            oid = stack.pop()
+            if oid in seen:
+                continue
+            seen.add(oid)
+            if oid in base_set:
+                boundary.add(oid)
+                continue
+            stack.extend(parents.get(oid, ()))
+        # Drop candidates that are ancestors of other candidates
+        best = [
+            c for c in boundary
+            if not any(c in reachable(parents.get(d, ()), base_set) for d in boundary if d != c)
+        ]
+        if best:
+            result[tip] = sorted(best)[0]
+    return result
+
+
+class GitBatch:
+    """A repository handle that keeps its git processes open between queries."""
+
+    def __init__(self, root: Path = REPO_ROOT, use_cache: bool = True):
+        self.root = Path(root)
+        self.use_cache = use_cache
+        self._cat_file = None
+        self._cat_file_lock = threading.Lock()
+        self._refs = None
+        self._commits = {}
+        self._cache = load_cache(CACHE_PATH) if use_cache else {}
+        self._cache_dirty = False
+
+    # -- process management ---------------------------------------------
+
+    def run(self, *args: str) -> str:
+        """Run a one-off git command and return its stdout (text)."""
+        result = subprocess.run(
+            ["git", *args], cwd=self.root, capture_output=True,
+            text=True, encoding="utf-8", errors="replace",
+        )
+        if result.returncode != 0:
+            raise GitError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    def close(self) -> None:
+        with self._cat_file_lock:
+            self._close_cat_file()
+        if self._cache_dirty:
+            save_cache(CACHE_PATH, self._cache)
+            self._cache_dirty = False
+
+    def _close_cat_file(self) -> None:
+        if self._cat_file is not None:
+            try:
+                self._cat_file.stdin.close()
+                self._cat_file.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._cat_file.kill()
+            self._cat_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- objects ----------------------------------------------------------
+
+    def read_object(self, rev: str) -> tuple[str, str, bytes] | None:
+        """
+        Read any object by revision expression ("main", "abc123^{tree}",
+        "origin/x:path/file"). Returns (oid, type, data), or None if missing.
+        Safe to call from several threads; requests are serialized.
+        """
+        if "\n" in rev:
+            raise ValueError(f"invalid revision: {rev!r}")
+        with self._cat_file_lock:
+            return self._read_object(rev)
+
+    def _read_object(self, rev: str) -> tuple[str, str, bytes] | None:
+        if self._cat_file is None:
+            self._cat_file = subprocess.Popen(
+                ["git", "cat-file", "--batch"], cwd=self.root,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        proc = self._cat_file
+        proc.stdin.write(rev.encode("utf-8") + b"\n")
+        proc.stdin.flush()
+        header = proc.stdout.readline()
+        if not header:
+            self._cat_file = None
+            raise GitError("git cat-file --batch exited unexpectedly")
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+        parts = header.split()
+        oid, kind, size = parts[0].decode("ascii"), parts[1].decode("ascii"), int(parts[2])
+        data = proc.stdout.read(size)
+        proc.stdout.read(1)  # trailing newline
+        return oid, kind, data
+
+    def resolve(self, rev: str) -> str | None:
+        """Commit id for a revision, or None if it doesn't exist."""
+        obj = self.read_object(f"{rev}^{{commit}}")
+        return obj[0] if obj else None
+
+    def show(self, rev: str, path: str) -> bytes | None:
+        """Contents of path at rev, or None if either is missing."""
+        obj = self.read_object(f"{rev}:{path}")
+        return obj[2] if obj and obj[1] == "blob" else None
+
+    def commit(self, rev: str) -> dict | None:
+        """Parsed commit: oid, parents, author, committer timestamp and subject."""
+        obj = self.read_object(f"{rev}^{{commit}}")
+        if obj is None:
+            return None
+        oid, _, data = obj
+        if oid in self._commits:
+            return self._commits[oid]
+        head, _, message = data.decode("utf-8", "replace").partition("\n\n")
+        info = {"oid": oid, "parents": [], "author": "", "timestamp": 0, "subject": message.split("\n", 1)[0]}
+        for line in head.split("\n"):
+            key, _, value = line.partition(" ")
+            if key == "parent":
+                info["parents"].append(value)
+            elif key == "author":
+                info["author"] = value.rsplit(" ", 2)[0]
+            elif key == "committer":
+                try:
+                    info["timestamp"] = int(value.rsplit(" ", 2)[1])
+                except (IndexError, ValueError):
+                    pass
+        self._commits[oid] = info
+        return info
+
+    # -- refs -------------------------------------------------------------
+
+    def refs(self) -> list[dict]:
+        """
+        Every local and remote-tracking branch, from one for-each-ref call.
+        Each entry: ref, name (short), oid, timestamp, date, is_head, remote.
+        """
+        if self._refs is None:
+            out = self.run("for-each-ref", f"--format={REF_FORMAT}", "refs/heads", "refs/remotes")
+            refs = []
+            for line in out.splitlines():
+                fields = line.split("\0")
+                if len(fields) != 5:
+                    continue
+                ref, oid, ts, date, head = fields
+                if ref.endswith("/HEAD"):
+                    continue  # origin/HEAD is a symbolic alias
+                remote = ref.startswith("refs/remotes/")
+                refs.append({
+                    "ref": ref,
+                    "name": ref[len("refs/remotes/"):] if remote else ref[len("refs/heads/"):],
+                    "oid": oid,
+                    "timestamp": int(ts) if ts.isdigit() else 0,
+                    "date": date,
+                    "is_head": head == "*",
+                    "remote": remote,
+                })
+            self._refs = refs
+        return self._refs
+
+    def remote_branches(self, remote: str = "origin") -> list[dict]:
+        return [r for r in self.refs() if r["remote"] and r["name"].startswith(remote + "/")]
+
+    def local_branches(self) -> list[dict]:
+        return [r for r in self.refs() if not r["remote"]]
+
+    def ahead_behind(self, base: str, tips) -> dict[str, tuple[int, int]]:
+        """
+        {tip: (ahead, behind)} relative to base for each tip revision. All
+        uncached pairs are computed from a single rev-list read.
+        """
+        base_oid = self.resolve(base)
+        if base_oid is None:
+            raise GitError(f"unknown revision: {base}")
+        tip_oids = {tip: self.resolve(tip) for tip in tips}
+
+        result, todo = {}, set()
+        for tip, oid in tip_oids.items():
+            if oid is None:
+                continue
+            cached = self._cache.get(f"{base_oid}:{oid}")
+            if cached is not None:
+                result[tip] = tuple(cached)
+            else:
+                todo.add(oid)
+
+        if todo:
+            counts = count_ahead_behind(self.history(base_oid, todo), base_oid, todo)
+            for oid, pair in counts.items():
+                self._cache[f"{base_oid}:{oid}"] = list(pair)
+            self._cache_dirty = self.use_cache
+            for tip, oid in tip_oids.items():
+                if oid in counts:
+                    result[tip] = counts[oid]
+        return result
+
+    def history(self, base_oid: str, oids) -> dict[str, list[str]]:
+        """commit -> parents map for everything reachable from base and oids (one rev-list read)."""
+        out = self.run("rev-list", "--parents", base_oid, *sorted(oids), "--")
+        parents = {}
+        for line in out.splitlines():
+            fields = line.split()
+            if fields:
+                parents[fields[0]] = fields[1:]
+        return parents
+
+    def merge_bases(self, base: str, tips) -> dict[str, str]:
+        """{tip: merge-base commit with base} for each tip revision."""
+        base_oid = self.resolve(base)
+        if base_oid is None:
+            raise GitError(f"unknown revision: {base}")
+        tip_oids = {tip: self.resolve(tip) for tip in tips}
+        wanted = {oid for oid in tip_oids.values() if oid}
+        if not wanted:
+            return {}
+        bases = find_merge_bases(self.history(base_oid, wanted), base_oid, wanted)
+        return {tip: bases[oid] for tip, oid in tip_oids.items() if oid in bases}
+
+    def diffs(self, pairs) -> dict[str, str]:
+        """
+        Patches for many (old, new) commit pairs from one `git diff-tree --stdin`
+        process. Returns {new: patch text}; commits are given as full ids and
+        each new commit should appear in one pair only.
+        """
+        pairs = list(dict.fromkeys(pairs))
+        proc = subprocess.Popen(
+            ["git", "diff-tree", "-p", "--no-color", "--always", "--stdin"], cwd=self.root,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+
+        def feed():
+            try:
+                for old, new in pairs:
+                    # "<commit> <parent>": diff-tree compares the commit against the given parent
+                    proc.stdin.write(f"{new} {old}\n".encode("ascii"))
+            except BrokenPipeError:
+                pass
+            finally:
+                proc.stdin.close()
+
+        # Written from a separate thread so a long list can't deadlock against git's output
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        wanted = {new for _, new in pairs}
+        patches, current, chunks = {}, None, []
+        try:
+            for raw in proc.stdout:
+                line = raw.decode("utf-8", "replace")
+                header = line.rstrip("\n")
+                if header in wanted and header not in patches:
+                    if current is not None:
+                        patches[current] = "".join(chunks)
+                    current, chunks = header, []
+                elif current is not None:
+                    chunks.append(line)
+            if current is not None:
+                patches[current] = "".join(chunks)
+        finally:
+            proc.stdout.close()
+            proc.wait()
+            writer.join()
+        return patches
+
+    def branch_report(self, base: str = "origin/main", remote: str | None = "origin") -> list[dict]:
+        """
+        Branch details relative to base: the ref entry plus ahead, behind and
+        merged (ahead == 0), and base_oid, the base commit they were counted
+        against. Branches are remote-tracking ones of `remote`, or local
+        branches when remote is None. base itself is excluded.
+        """
+        branches = self.remote_branches(remote) if remote else self.local_branches()
+        branches = [b for b in branches if b["name"] != base]
+        counts = self.ahead_behind(base, [b["ref"] for b in branches])
+        base_oid = self.resolve(base)
+        report = []
+        for b in branches:
+            ahead, behind = counts.get(b["ref"], (0, 0))
+            report.append({**b, "ahead": ahead, "behind": behind, "merged": ahead == 0, "base_oid": base_oid})
+        return report
+
+
+@lru_cache(maxsize=None)
+def get_repo(root: Path = REPO_ROOT) -> GitBatch:
+    """Shared handle for the repository, closed (and its cache saved) at exit."""
+    repo = GitBatch(root)
+    atexit.register(repo.close)
+    return repo
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Branch ahead/behind report using batched git access")
+    parser.add_argument("--base", default="origin/main", help="Base revision (default: origin/main)")
+    parser.add_argument("--local", action="store_true", help="Report local branches instead of origin/*")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    with GitBatch() as repo:
+        try:
+            report = repo.branch_report(args.base, remote=None if args.local else "origin")
+        except GitError as e:
+            print(f"✗ {e}", file=sys.stderr)
+            return 1
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print("=" * 80)
+    print(f"Branches vs {args.base}")
+    print("=" * 80)
+    print(f"{'branch':<50}{'ahead':>7}{'behind':>8}  last commit")
+    for b in sorted(report, key=lambda r: -r["timestamp"]):
+        print(f"{b['name'][:49]:<50}{b['ahead']:>7}{b['behind']:>8}  {b['date'][:10]}")
+    merged = sum(1 for b in report if b["merged"])
+    print(f"\n✓ {len(report)} branches, {merged} merged into {args.base}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Rate-limit-aware batch executor for GitHub REST operations.
+
+Runs many API calls (merge PR, comment, close PR, ...) concurrently while
+staying inside GitHub's limits:
+
+- tracks the remaining quota from X-RateLimit-* response headers and pauses
+  until the reset time instead of burning through the last requests
+- adapts concurrency: grows slowly while requests succeed, halves on a
+  secondary rate limit
+- retries secondary limits (honouring Retry-After) and 5xx errors with
+  exponential backoff
+- journals every completed step of a batch to a JSONL file named after the
+  batch (repo + every step and its body), so an interrupted run restarted
+  with --resume skips what is already done; the journal is deleted once the
+  whole batch has succeeded. Callers that run several batches from one plan
+  (merge_best_prs.py) can name a shared journal and manage it themselves.
+
+Usage:
+    python scripts/github_batch.py close 52 54 56 --comment "Duplicate of #75"
+    python scripts/github_batch.py merge 75 --method squash
+    python scripts/github_batch.py merge 75 --method squash --resume   # after an interrupted run
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import requests
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_JOURNAL_DIR = REPO_ROOT / ".cache" / "github_ops"
+API_URL = "https://api.github.com"
+REQUEST_TIMEOUT = 30  # seconds
+
+
+class GitHubAPIError(RuntimeError):
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class RateLimitState:
+    """
+    Shared view of the API quota plus the adaptive concurrency limit.
+
+    Concurrency follows additive-increase / multiplicative-decrease: +1 after
+    `increase_after` consecutive successes (up to max_concurrency), halved on
+    a secondary rate limit.
+    """
+
+    def __init__(self, initial_concurrency=2, max_concurrency=8, reserve=10, increase_after=5,
+                 clock=time.time, sleep=time.sleep):
+        self.limit = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.reserve = reserve
+        self.increase_after = increase_after
+        self.remaining = None
+        self.reset_at = None
+        self.paused_until = 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def update(self, headers):
+        """Record quota headers from a response."""
+        with self._cond:
+            try:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+                self.reset_at = float(headers["X-RateLimit-Reset"])
+            except (KeyError, ValueError):
+                pass
+
+    def quota_wait(self):
+        """Seconds to wait before the next request may be sent."""
+        now = self.clock()
+        wait = max(0.0, self.paused_until - now)
+        if self.remaining is not None and self.remaining <= self.reserve and self.reset_at:
+            wait = max(wait, self.reset_at - now)
+        return wait
+
+    def acquire(self):
+        """Block until a concurrency slot is free and the quota allows a request."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        while True:
+            wait = self.quota_wait()
+            if wait <= 0:
+                break
+            self.sleep(min(wait, 60))
+            if self.reset_at is not None and self.clock() >= self.reset_at:
+                # The window has reset; the next response will report the new quota
+                with self._cond:
+                    self.remaining = None
+
+    def release(self, ok):
+        with self._cond:
+            self._in_flight -= 1
+            if ok:
+                self._successes += 1
+                if self._successes >= self.increase_after and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+    def throttle(self, retry_after):
+        """Secondary rate limit: halve concurrency and pause everyone for retry_after seconds."""
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+            self.paused_until = max(self.paused_until, self.clock() + retry_after)
+
+
+class GitHubClient:
+    """Minimal REST client that feeds response headers into a RateLimitState."""
+
+    def __init__(self, token, repo, api_url=API_URL, state=None, max_retries=5, session=None):
+        self.repo = repo
+        self.api_url = api_url.rstrip("/")
+        self.state = state or RateLimitState()
+        self.max_retries = max_retries
+        self.session = session or requests.Session()
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {token}",
+            "X-GitHub-Api-Version": "2022-11-28",
+        })
+
+    @classmethod
+    def from_environment(cls, **kwargs):
+        """Token from GITHUB_TOKEN/GH_TOKEN (or `gh auth token`), repo from GITHUB_REPOSITORY or origin."""
+        token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN") or _command_output(["gh", "auth", "token"])
+        repo = os.environ.get("GITHUB_REPOSITORY") or repo_from_remote(_command_output(["git", "remote", "get-url", "origin"]))
+        if not token or not repo:
+            raise GitHubAPIError(0, "set GITHUB_TOKEN and GITHUB_REPOSITORY (or log in with gh inside a clone)")
+        return cls(token, repo, **kwargs)
+
+    def request(self, method, path, body=None):
+        """
+        Send one request, retrying rate limits and server errors. Returns the
+        decoded JSON body (or None). Raises GitHubAPIError on final failure.
+        """
+        url = f"{self.api_url}{path.format(repo=self.repo)}"
+        for attempt in range(self.max_retries + 1):
+            self.state.acquire()
+            ok = False
+            try:
+                try:
+                    resp = self.session.request(method, url, json=body, timeout=REQUEST_TIMEOUT)
+                except requests.exceptions.RequestException as e:
+                    if attempt == self.max_retries:
+                        raise GitHubAPIError(0, str(e))
+                    self.state.sleep(backoff(attempt))
+                    continue
+                self.state.update(resp.headers)
+
+                if resp.status_code in (403, 429):
+                    retry_after = resp.headers.get("Retry-After")
+                    if retry_after is not None or "secondary rate limit" in resp.text.lower():
+                        # Secondary limit: back off everyone, not just this request
+                        self.state.throttle(float(retry_after) if retry_after else backoff(attempt))
+                        if attempt < self.max_retries:
+                            continue
+                    elif resp.headers.get("X-RateLimit-Remaining") == "0":
+                        # Primary quota exhausted; acquire() waits for the reset
+                        if attempt < self.max_retries:
+                            continue
+                elif resp.status_code >= 500 and attempt < self.max_retries:
+                    self.state.sleep(backoff(attempt))
+                    continue
+
+                if resp.status_code >= 400:
+                    try:
+                        message = resp.json().get("message", resp.text)
+                    except ValueError:
+                        message = resp.text
+                    raise GitHubAPIError(resp.status_code, message)
+                ok = True
+                return resp.json() if resp.content else None
+            finally:
+                self.state.release(ok)
+        raise GitHubAPIError(429, "rate limited after retries")
+
+
+def backoff(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _command_output(cmd):
+    try:
+        result = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def repo_from_remote(url):
+    """owner/name from an https or ssh GitHub remote URL."""
+    if not url or "github.com" not in url:
+        return None
+    path = url.split("github.com", 1)[1].lstrip(":/")
+    return path[:-4] if path.endswith(".git") else path
+
+
+# -- operations ---------------------------------------------------------------
+# An operation is a named list of steps; each step is journaled on its own so a
+# resumed run never repeats a step that already succeeded (e.g. a comment).
+# Journals are per batch: the same PRs with another comment or merge method
+# are a different batch and never inherit each other's progress.
+
+def merge_pr_op(number, method="squash"):
+    return {"id": f"merge:{number}", "steps": [
+        ("merge", "PUT", f"/repos/{{repo}}/pulls/{number}/merge", {"merge_method": method}),
+    ]}
+
+
+def close_pr_op(number, comment=None):
+    steps = []
+    if comment:
+        steps.append(("comment", "POST", f"/repos/{{repo}}/issues/{number}/comments", {"body": comment}))
+    steps.append(("close", "PATCH", f"/repos/{{repo}}/pulls/{number}", {"state": "closed"}))
+    return {"id": f"close:{number}", "steps": steps}
+
+
+def pr_is_merged(client, number):
+    """Whether PR `number` has already been merged (False if it cannot be fetched)."""
+    try:
+        pr = client.request("GET", f"/repos/{{repo}}/pulls/{number}")
+    except GitHubAPIError:
+        return False
+    return bool(pr and pr.get("merged"))
+
+
+def batch_id(repo, operations):
+    """Stable id of a batch of operations, covering every step and its body."""
+    payload = json.dumps([repo, [[op["id"], op["steps"]] for op in operations]], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class Journal:
+    """Append-only JSONL record of completed steps."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done = set()
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.done.add(json.loads(line)["step"])
+                    except (ValueError, KeyError):
+                        continue  # a torn last line from an interrupted run
+        except OSError:
+            pass
+
+    def record(self, step_id):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"step": step_id, "at": time.time()}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.done.add(step_id)
+
+
+class BatchExecutor:
+    """
+    Run operations concurrently through a GitHubClient, journaling each step.
+
+    Without `resume` a batch always starts from scratch; with it, steps
+    recorded in that batch's journal are skipped.
+    """
+
+    def __init__(self, client, journal_dir=DEFAULT_JOURNAL_DIR, resume=False):
+        self.client = client
+        self.journal_dir = Path(journal_dir)
+        self.resume = resume
+
+    def journal_path(self, operations, name=None):
+        return self.journal_dir / f"{name or batch_id(self.client.repo, operations)}.jsonl"
+
+    def _run_op(self, op, journal):
+        for name, method, path, body in op["steps"]:
+            step_id = f"{op['id']}:{name}"
+            if step_id in journal.done:
+                continue
+            try:
+                self.client.request(method, path, body)
+            except GitHubAPIError as e:
+                return op["id"], False, str(e)
+            journal.record(step_id)
+        return op["id"], True, None
+
+    def run(self, operations, on_result=None, max_workers=None, journal=None):
+        """
+        Execute operations; returns {op_id: (ok, error)}. on_result(op_id, ok,
+        error) is called as each one finishes, in completion order. The thread
+        pool is sized to max_workers (default: the maximum concurrency);
+        RateLimitState decides how many actually run. The batch journal is
+        removed when everything succeeded.
+
+        A named `journal` is shared by several runs and owned by the caller:
+        it is neither reset nor removed here.
+        """
+        path = self.journal_path(operations, journal)
+        if not self.resume and journal is None:
+            path.unlink(missing_ok=True)
+        steps = Journal(path)
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers or self.client.state.max_concurrency) as pool:
+            futures = [pool.submit(self._run_op, op, steps) for op in operations]
+            for future in as_completed(futures):
+                op_id, ok, error = future.result()
+                results[op_id] = (ok, error)
+                if on_result:
+                    on_result(op_id, ok, error)
+        if journal is None and all(ok for ok, _ in results.values()):
+            path.unlink(missing_ok=True)
+        return results
+
+
+def print_result(op_id, ok, error):
+    print(f"  {'✓' if ok else '✗'} {op_id}" + (f": {error}" if error else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run GitHub PR operations with rate-limit awareness")
+    parser.add_argument("action", choices=("merge", "close"))
+    parser.add_argument("prs", nargs="+", type=int, help="PR numbers")
+    parser.add_argument("--comment", help="Comment to post before closing")
+    parser.add_argument("--method", default="squash", choices=("merge", "squash", "rebase"), help="Merge method")
+    parser.add_argument("--journal-dir", type=Path, default=DEFAULT_JOURNAL_DIR, help="Directory for per-batch journals of completed steps")
+    parser.add_argument("--resume", action="store_true", help="Skip steps an interrupted run of the same batch already completed")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    try:
+        client = GitHubClient.from_environment(state=RateLimitState(max_concurrency=args.max_concurrency))
+    except GitHubAPIError as e:
+        print(f"✗ {e}")
+        return 1
+
+    if args.action == "merge":
+        ops = [merge_pr_op(n, args.method) for n in args.prs]
+    else:
+        ops = [close_pr_op(n, args.comment) for n in args.prs]
+
+    print(f"Running {len(ops)} {args.action} operation(s) on {client.repo}...")
+    results = BatchExecutor(client, args.journal_dir, resume=args.resume).run(ops, on_result=print_result)
+    failed = sum(1 for ok, _ in results.values() if not ok)
+    state = client.state
+    print(f"\n{'✓' if not failed else '✗'} {len(results) - failed}/{len(results)} succeeded "
+          f"(quota remaining: {state.remaining if state.remaining is not None else 'unknown'}, concurrency: {state.limit})")
+    if failed:
+        print("  Re-run the same command with --resume to skip the steps that already succeeded.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
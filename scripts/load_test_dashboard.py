@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Load test for the web dashboard.
+
+Runs a reproducible request scenario against web_dashboard.py (started
+in-process on an ephemeral port, or an existing deployment via --url),
+records p50/p95/p99 latency and requests per second to JSON, and fails when
+the run regresses against a stored baseline.
+
+Examples:
+    python scripts/load_test_dashboard.py --concurrency 8 --requests 2000
+    python scripts/load_test_dashboard.py --output logs/load.json --save-baseline
+    python scripts/load_test_dashboard.py --tolerance 0.10
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PATHS = ["/", "/health", "/metrics"]
+DEFAULT_BASELINE = REPO_ROOT / "logs" / "dashboard_load_baseline.json"
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil without floats
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Summarize a list of latencies (seconds) into a result dict (milliseconds)."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+def start_local_server():
+    """Start web_dashboard's Flask app on an ephemeral port. Returns (base_url, server)."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from web_dashboard import app
+
+    class QuietKeepAliveHandler(WSGIRequestHandler):
+        # Keep-alive like a production server, and no per-request access log
+        protocol_version = "HTTP/1.1"
+
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietKeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def run_worker(base_url, schedule, timeout):
+    """
+    Issue the given request paths sequentially over one keep-alive connection.
+    Returns a list of (path, latency_seconds, ok).
+    """
+    parts = urlsplit(base_url)
+    conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    prefix = parts.path.rstrip("/")
+    conn = conn_cls(parts.netloc, timeout=timeout)
+    results = []
+    try:
+        for path in schedule:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", prefix + path)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status < 400
+                if response.will_close:
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                ok = False
+                conn.close()
+            results.append((path, time.perf_counter() - start, ok))
+    finally:
+        conn.close()
+    return results
+
+
+def run_scenario(base_url, paths, concurrency, total_requests, warmup=0, timeout=10):
+    """
+    Run the load scenario and return the result document.
+
+    Requests are assigned round-robin over `paths` and split evenly across
+    workers, so the same arguments always produce the same request mix.
+    """
+    if warmup:
+        run_worker(base_url, [paths[i % len(paths)] for i in range(warmup)], timeout)
+
+    schedule = [paths[i % len(paths)] for i in range(total_requests)]
+    per_worker = [schedule[w::concurrency] for w in range(concurrency)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run_worker, base_url, chunk, timeout) for chunk in per_worker if chunk]
+        samples = [sample for f in futures for sample in f.result()]
+    elapsed = time.perf_counter() - start
+
+    by_path = {}
+    for path in paths:
+        path_samples = [s for s in samples if s[0] == path]
+        by_path[path] = summarize(
+            [lat for _, lat, ok in path_samples if ok],
+            elapsed,
+            errors=sum(1 for _, _, ok in path_samples if not ok),
+        )
+
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "target": base_url,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "overall": summarize(
+            [lat for _, lat, ok in samples if ok],
+            elapsed,
+            errors=sum(1 for _, _, ok in samples if not ok),
+        ),
+        "paths": by_path,
+    }
+
+
+def compare_to_baseline(result, baseline, tolerance):
+    """
+    Compare a run against a baseline. Returns a list of regression messages
+    (empty when the run is within tolerance).
+    """
+    regressions = []
+    cur, base = result["overall"], baseline["overall"]
+
+    if base["rps"] and cur["rps"] < base["rps"] * (1 - tolerance):
+        regressions.append(f"throughput {cur['rps']} rps < baseline {base['rps']} rps (-{tolerance:.0%} allowed)")
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        if base[key] and cur[key] > base[key] * (1 + tolerance):
+            regressions.append(f"{key} {cur[key]} > baseline {base[key]} (+{tolerance:.0%} allowed)")
+    if cur["errors"] > base.get("errors", 0):
+        regressions.append(f"{cur['errors']} failed requests (baseline {base.get('errors', 0)})")
+    return regressions
+
+
+def print_report(result):
+    print("=" * 72)
+    print(f"Dashboard load test: {result['target']} (concurrency {result['concurrency']})")
+    print("=" * 72)
+    print(f"{'path':<20}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = list(result["paths"].items()) + [("TOTAL", result["overall"])]
+    for path, s in rows:
+        print(f"{path:<20}{s['requests']:>10}{s['errors']:>8}{s['rps']:>10}{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the web dashboard")
+    parser.add_argument("--url", help="Base URL of a running dashboard (default: start one in-process)")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS, help="Request paths to exercise")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of concurrent keep-alive clients")
+    parser.add_argument("--requests", type=int, default=1000, help="Total measured requests")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured warmup requests")
+    parser.add_argument("--output", type=Path, help="Write the JSON result to this file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression (default 0.15)")
+    args = parser.parse_args()
+
+    if args.concurrency < 1 or args.requests < 1:
+        parser.error("--concurrency and --requests must be positive")
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        base_url, server = start_local_server()
+
+    try:
+        result = run_scenario(base_url, args.paths, args.concurrency, args.requests, args.warmup)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print_report(result)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResult written to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(result, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regression against baseline:")
+            for r in regressions:
+                print(f"  - {r}")
+            return 1
+        print(f"\n✅ Within {args.tolerance:.0%} of baseline ({args.baseline})")
+    else:
+        print(f"\nℹ No baseline at {args.baseline}; run with --save-baseline to create one")
+
+    return 1 if result["overall"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
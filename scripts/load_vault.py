@@ -2,105 +2,263 @@
 """
 Load credentials from personal vault (config/vault.json)
 Used by Python scripts to securely access credentials
+
+The vault is parsed once and kept in memory; the file is re-read only when
+its mtime or size changes (checked at most once per RELOAD_CHECK_INTERVAL),
+so repeated lookups do not touch the disk.
+
+Environment variables override the file: the usual names
+(TELEGRAM_BOT_TOKEN, GITHUB_PAT, ...) for the known keys, and
+VAULT_<SECTION>_<KEY> for any key (e.g. VAULT_CLOUDFLARE_ZONE_ID).
+
+The vault can also be stored encrypted as config/vault.json.enc (Fernet,
+needs the optional `cryptography` package) with the key in VAULT_KEY:
+    python scripts/load_vault.py --generate-key
+    VAULT_KEY=... python scripts/load_vault.py --encrypt    # vault.json -> vault.json.enc
 """
 
+import argparse
 import json
 import os
+import sys
+import threading
+import time
 from pathlib import Path
+from typing import Any, Optional
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = InvalidToken = None
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 VAULT_PATH = REPO_ROOT / "config" / "vault.json"
+ENCRYPTED_SUFFIX = ".enc"
+KEY_ENV = "VAULT_KEY"
+RELOAD_CHECK_INTERVAL = 1.0  # seconds
 
 # Default values
 DEFAULT_TELEGRAM_BOT_NAME = "t.me/your_bot_name"
 DEFAULT_TELEGRAM_WEBHOOK_URL = "https://core.telegram.org/bots/api"
 
+# Environment variables that override vault keys (besides VAULT_<SECTION>_<KEY>)
+ENV_OVERRIDES = {
+    "telegram_bot.token": "TELEGRAM_BOT_TOKEN",
+    "telegram_bot.name": "TELEGRAM_BOT_NAME",
+    "telegram_bot.webhook_url": "TELEGRAM_WEBHOOK_URL",
+    "telegram_bot.allowed_user_ids": "TELEGRAM_ALLOWED_USER_IDS",
+    "github.pat": "GITHUB_PAT",
+}
+
+
+class Vault:
+    """Credentials from a vault file, with an environment override layer."""
+
+    def __init__(self, path: Path = VAULT_PATH, environ=None, reload_interval: float = RELOAD_CHECK_INTERVAL):
+        self.path = Path(path)
+        self.environ = os.environ if environ is None else environ
+        self.reload_interval = reload_interval
+        self.loads = 0
+        self._data: Optional[dict] = None
+        self._stamp = None
+        self._checked = float("-inf")
+        self._lock = threading.Lock()
+
+    def _source(self) -> Path:
+        """vault.json, or vault.json.enc when only the encrypted form exists."""
+        encrypted = self.path.with_name(self.path.name + ENCRYPTED_SUFFIX)
+        if not self.path.exists() and encrypted.exists():
+            return encrypted
+        return self.path
+
+    def _read(self, source: Path) -> Optional[dict]:
+        self.loads += 1
+        try:
+            raw = source.read_bytes()
+            if source.name.endswith(ENCRYPTED_SUFFIX):
+                if Fernet is None:
+                    print("❌ Encrypted vault found but the 'cryptography' package is not installed")
+                    return None
+                key = self.environ.get(KEY_ENV)
+                if not key:
+                    print(f"❌ Encrypted vault found but {KEY_ENV} is not set")
+                    return None
+                raw = Fernet(key.encode()).decrypt(raw)
+            vault = json.loads(raw)
+        except json.JSONDecodeError as e:
+            print(f"❌ Error parsing {source.name}: {e}")
+            return None
+        except Exception as e:
+            if InvalidToken is not None and isinstance(e, InvalidToken):
+                print(f"❌ Cannot decrypt {source.name}: wrong {KEY_ENV}")
+            else:
+                print(f"❌ Error loading vault: {e}")
+            return None
+        return vault if isinstance(vault, dict) else None
+
+    def data(self) -> Optional[dict]:
+        """The parsed vault (None if missing or unreadable), reloaded when the file changes."""
+        now = time.monotonic()
+        if self._stamp is not None and now - self._checked < self.reload_interval:
+            return self._data
+        with self._lock:
+            self._checked = now
+            source = self._source()
+            try:
+                st = source.stat()
+                stamp = (str(source), st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                stamp = (str(source), None, None)
+            if stamp != self._stamp:
+                self._data = self._read(source) if stamp[1] is not None else None
+                self._stamp = stamp
+            return self._data
+
+    def invalidate(self):
+        """Force a re-read on the next access."""
+        self._stamp = None
+
+    def _env(self, key: str) -> Optional[str]:
+        for name in (ENV_OVERRIDES.get(key), "VAULT_" + key.upper().replace(".", "_")):
+            if name and self.environ.get(name):
+                return self.environ[name]
+        return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value of a dotted key ("telegram_bot.token"); the environment wins over the file."""
+        value = self._env(key)
+        if value is not None:
+            return value
+        node = self.data()
+        for part in key.split("."):
+            if not isinstance(node, dict) or part not in node:
+                return default
+            node = node[part]
+        return node
+
+    def get_str(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.get(key)
+        return str(value) if value not in (None, "") else default
+
+    def get_list(self, key: str) -> list:
+        """A list value; from the environment as a comma-separated string."""
+        value = self.get(key)
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [item.strip() for item in value.split(",") if item.strip()]
+        return list(value) if isinstance(value, (list, tuple)) else [value]
+
+    def get_int(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        try:
+            return int(self.get(key))
+        except (TypeError, ValueError):
+            return default
+
+
+vault = Vault()
+
 
 def load_vault():
     """Load credentials from vault.json"""
-    if not VAULT_PATH.exists():
+    data = vault.data()
+    if data is None and not vault._source().exists():
         print(f"⚠️ Vault file not found at: {VAULT_PATH}")
-        return None
-    
-    try:
-        with open(VAULT_PATH, 'r') as f:
-            vault = json.load(f)
-        return vault
-    except json.JSONDecodeError as e:
-        print(f"❌ Error parsing vault.json: {e}")
-        return None
-    except Exception as e:
-        print(f"❌ Error loading vault: {e}")
-        return None
+    return data
 
 
 def get_telegram_token():
     """Get Telegram bot token from vault
-    
+
     Note: Prefers 'token' field over 'api' field if both exist.
     Both fields are supported for backward compatibility.
     """
-    vault = load_vault()
-    if vault and 'telegram_bot' in vault:
-        return vault['telegram_bot'].get('token') or vault['telegram_bot'].get('api')
-    return None
+    return vault.get_str('telegram_bot.token') or vault.get_str('telegram_bot.api')
 
 
 def get_telegram_bot_name():
     """Get Telegram bot name from vault"""
-    vault = load_vault()
-    if vault and 'telegram_bot' in vault:
-        return vault['telegram_bot'].get('name', DEFAULT_TELEGRAM_BOT_NAME)
-    return DEFAULT_TELEGRAM_BOT_NAME
+    return vault.get_str('telegram_bot.name', DEFAULT_TELEGRAM_BOT_NAME)
 
 
 def get_telegram_webhook_url():
     """Get Telegram webhook URL from vault"""
-    vault = load_vault()
-    if vault and 'telegram_bot' in vault:
-        return vault['telegram_bot'].get('webhook_url', DEFAULT_TELEGRAM_WEBHOOK_URL)
-    return DEFAULT_TELEGRAM_WEBHOOK_URL
+    return vault.get_str('telegram_bot.webhook_url', DEFAULT_TELEGRAM_WEBHOOK_URL)
 
 
 def get_telegram_allowed_users():
     """Get allowed Telegram user IDs from vault"""
-    vault = load_vault()
-    if vault and 'telegram_bot' in vault:
-        return vault['telegram_bot'].get('allowed_user_ids', [])
-    return []
+    return vault.get_list('telegram_bot.allowed_user_ids')
 
 
 def get_github_pat():
     """Get GitHub Personal Access Token from vault"""
-    vault = load_vault()
-    if vault and 'github' in vault:
-        return vault['github'].get('pat')
-    return None
+    return vault.get_str('github.pat')
 
 
-if __name__ == "__main__":
+def encrypt_vault(path: Path = VAULT_PATH) -> Path:
+    """Write path + '.enc' encrypted with VAULT_KEY. The plaintext file is left for you to delete."""
+    if Fernet is None:
+        raise RuntimeError("the 'cryptography' package is required: pip install cryptography")
+    key = os.environ.get(KEY_ENV)
+    if not key:
+        raise RuntimeError(f"{KEY_ENV} is not set (create one with --generate-key)")
+    data = path.read_bytes()
+    json.loads(data)  # refuse to encrypt a broken vault
+    target = path.with_name(path.name + ENCRYPTED_SUFFIX)
+    target.write_bytes(Fernet(key.encode()).encrypt(data))
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load credentials from the vault")
+    parser.add_argument("--generate-key", action="store_true", help=f"Print a new {KEY_ENV} for the encrypted vault")
+    parser.add_argument("--encrypt", action="store_true", help="Encrypt config/vault.json to config/vault.json.enc")
+    args = parser.parse_args()
+
+    if args.generate_key or args.encrypt:
+        if Fernet is None:
+            print("❌ The 'cryptography' package is required: pip install cryptography")
+            return 1
+        if args.generate_key:
+            print(Fernet.generate_key().decode())
+            return 0
+        try:
+            target = encrypt_vault()
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Encrypted vault written to {target}")
+        print(f"   Delete {VAULT_PATH.name} once you have checked it; keep {KEY_ENV} outside the repository.")
+        return 0
+
     # Set environment variables when run directly
     token = get_telegram_token()
     if token:
         os.environ['TELEGRAM_BOT_TOKEN'] = token
         print("✅ Telegram bot token loaded from vault")
-    
+
     bot_name = get_telegram_bot_name()
     if bot_name:
         os.environ['TELEGRAM_BOT_NAME'] = bot_name
         print(f"✅ Telegram bot name: {bot_name}")
-    
+
     webhook_url = get_telegram_webhook_url()
     if webhook_url:
         os.environ['TELEGRAM_WEBHOOK_URL'] = webhook_url
         print(f"✅ Telegram webhook URL: {webhook_url}")
-    
+
     allowed_users = get_telegram_allowed_users()
     if allowed_users:
         os.environ['TELEGRAM_ALLOWED_USER_IDS'] = ','.join(map(str, allowed_users))
         print(f"✅ Allowed users loaded: {len(allowed_users)}")
-    
+
     github_pat = get_github_pat()
     if github_pat:
         os.environ['GITHUB_PAT'] = github_pat
-        print("✅ GitHub PAT loaded from vault")
\ No newline at end of file
+        print("✅ GitHub PAT loaded from vault")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
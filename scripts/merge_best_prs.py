@@ -1,115 +1,173 @@
 #!/usr/bin/env python3
 """
 Script to merge best PRs and close duplicates
+
+An --apply run first writes its cluster plan (representative plus members)
+next to the step journal in .cache/github_ops. If the run is interrupted,
+--resume finishes that exact plan instead of re-clustering the PRs that are
+still open, so a representative that already merged is never replaced by a
+second near-identical one.
 """
 
-import subprocess
+import argparse
+import json
+import os
 import sys
-import concurrent.futures
 from pathlib import Path
 
-REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from github_batch import (
+    DEFAULT_JOURNAL_DIR, BatchExecutor, GitHubAPIError, GitHubClient,
+    batch_id, close_pr_op, merge_pr_op, pr_is_merged, print_result,
+)
+from pr_clusters import DEFAULT_THRESHOLD, find_duplicate_clusters
+
+
+def plan_path(repo, journal_dir=DEFAULT_JOURNAL_DIR):
+    """Plan of the unfinished --apply run for `repo`; removed once the run completes."""
+    return Path(journal_dir) / f"merge_plan-{repo.replace('/', '_')}.json"
+
+
+def close_ops(cluster):
+    rep = cluster["representative"]
+    return [
+        close_pr_op(pr, f"Merged via PR #{rep} (near-duplicate change, diff similarity {cluster['similarity'][pr]:.2f})")
+        for pr in cluster["members"] if pr != rep
+    ]
+
+
+def save_plan(path, repo, clusters):
+    """Write the plan for `clusters` and return it; its journal name covers every planned step."""
+    ops = [merge_pr_op(c["representative"]) for c in clusters] + [op for c in clusters for op in close_ops(c)]
+    plan = {"repo": repo, "journal": f"merge_plan-{batch_id(repo, ops)}", "clusters": clusters}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2)
+    os.replace(tmp, path)
+    return plan
 
 
-def run_command(cmd, check=True):
-    """Run a command."""
+def load_plan(path):
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=30,
-            encoding='utf-8',
-            errors='replace'
-        )
-        if check and result.returncode != 0:
-            print(f"Error: {result.stderr}", file=sys.stderr)
-            return None
-        return result.stdout
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
+        with open(path, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+    except (OSError, ValueError):
         return None
+    for c in plan["clusters"]:
+        # JSON object keys are strings
+        c["similarity"] = {int(pr): sim for pr, sim in c["similarity"].items()}
+    return plan
 
 
-def merge_pr(pr_number, method="squash"):
-    """Merge a PR."""
-    print(f"Merging PR #{pr_number}...")
-    result = run_command(["gh", "pr", "merge", str(pr_number), f"--{method}", "--delete-branch=false"], check=False)
-    if result:
-        print(f"✓ PR #{pr_number} merged successfully")
-        return True
-    else:
-        print(f"✗ Failed to merge PR #{pr_number}")
-        return False
+def apply_plan(executor, plan, check_merged=False):
+    """
+    Merge each representative, then close the duplicates of those that merged.
+    With check_merged, representatives GitHub already reports as merged count
+    as done. Returns True when every step of the plan has succeeded.
+    """
+    clusters = plan["clusters"]
 
+    # Step 1: Merge best PRs
+    print("Step 1: Merging best PRs...")
+    print()
 
-def close_pr(pr_number, comment):
-    """Close a PR with a comment."""
-    print(f"Closing PR #{pr_number}...")
-    result = run_command(["gh", "pr", "close", str(pr_number), "--comment", comment], check=False)
-    if result:
-        print(f"✓ PR #{pr_number} closed")
-        return True
-    else:
-        print(f"✗ Failed to close PR #{pr_number}")
-        return False
+    merged, pending = [], []
+    for c in clusters:
+        if check_merged and pr_is_merged(executor.client, c["representative"]):
+            print(f"  ✓ merge:{c['representative']} (already merged)")
+            merged.append(c)
+        else:
+            pending.append(c)
+    # One at a time: concurrent merges into the same base branch are rejected
+    # with "Base branch was modified"
+    results = executor.run(
+        [merge_pr_op(c["representative"]) for c in pending],
+        on_result=print_result, max_workers=1, journal=plan["journal"],
+    )
+    merged += [c for c in pending if results[f"merge:{c['representative']}"][0]]
+
+    print()
+
+    # Step 2: Close duplicates (only for clusters whose representative merged)
+    print("Step 2: Closing duplicate PRs...")
+    print()
+
+    ops = [op for c in merged for op in close_ops(c)]
+    closed = executor.run(ops, on_result=print_result, journal=plan["journal"])
+    return len(merged) == len(clusters) and all(ok for ok, _ in closed.values())
 
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Merge the best PR of each duplicate cluster and close the rest")
+    parser.add_argument("prs", nargs="*", type=int, help="PR numbers to consider (default: all open PRs)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"Minimum diff similarity for duplicates (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--apply", action="store_true", help="Actually merge and close PRs (default: only print the plan)")
+    parser.add_argument("--resume", action="store_true", help="Finish the plan of an interrupted --apply run instead of re-clustering")
+    args = parser.parse_args()
+    if args.resume and not args.apply:
+        parser.error("--resume requires --apply")
+
     print("=" * 80)
     print("PR MERGE AND CONSOLIDATION")
     print("=" * 80)
     print()
-    
-    # Step 1: Merge best PRs
-    print("Step 1: Merging best PRs...")
-    print()
-    
-    # PR #76: Early exit optimization
-    if merge_pr(76):
-        print("  ✓ PR #76 merged")
-    else:
-        print("  ✗ PR #76 merge failed or already merged")
-    
-    # PR #75: New bar check + CopyRates optimization
-    if merge_pr(75):
-        print("  ✓ PR #75 merged")
+
+    plan = None
+    if args.apply:
+        try:
+            client = GitHubClient.from_environment()
+        except GitHubAPIError as e:
+            print(f"✗ {e}")
+            return 1
+        path = plan_path(client.repo)
+        plan = load_plan(path)
+        if plan and not args.resume:
+            print(f"✗ An interrupted --apply run left its plan in {path}")
+            print("  Re-run with --apply --resume to finish it (or delete the file to start over).")
+            return 1
+        if args.resume and not plan:
+            print(f"✗ No interrupted run to resume for {client.repo}")
+            return 1
+
+    if plan:
+        print(f"Resuming the interrupted run: {len(plan['clusters'])} duplicate cluster(s)")
+        print()
     else:
-        print("  ✗ PR #75 merge failed or already merged")
-    
-    print()
-    
-    # Step 2: Close duplicates
-    print("Step 2: Closing duplicate PRs...")
-    print()
-    
-    # New bar check duplicates (if PR #75 merged)
-    new_bar_duplicates = [74, 73, 72, 71, 70, 69, 65, 62, 58, 57, 56, 54, 52]
-
-    # Early exit duplicates (if PR #76 merged)
-    early_exit_duplicates = [65, 56, 54]  # Note: some overlap with new_bar
-
-    # Collect all PRs to close
-    tasks = []
-    for pr_num in new_bar_duplicates:
-        tasks.append((pr_num, "Merged via PR #75 - New bar check optimization"))
-
-    for pr_num in early_exit_duplicates:
-        if pr_num not in new_bar_duplicates:  # Don't close twice
-            tasks.append((pr_num, "Merged via PR #76 - Early exit optimization"))
-
-    # Execute in parallel to mask network latency
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(close_pr, pr, msg): pr for pr, msg in tasks}
-        concurrent.futures.wait(futures)
-    
+        # Duplicate groups come from diff similarity instead of hand-maintained lists
+        clusters, diffs = find_duplicate_clusters(args.prs, args.threshold)
+        print(f"Analyzed {len(diffs)} PRs: {len(clusters)} duplicate cluster(s)")
+        print()
+
+        if not args.apply:
+            for c in clusters:
+                rep = c["representative"]
+                others = [pr for pr in c["members"] if pr != rep]
+                print(f"Would merge PR #{rep} and close {', '.join(f'#{pr}' for pr in others)}")
+            print("\nRe-run with --apply to merge and close.")
+            return 0
+        plan = save_plan(path, client.repo, clusters)
+
+    # All API calls go through the rate-limit-aware executor; the plan's
+    # journal lets an interrupted run be finished with --resume without
+    # repeating steps that already succeeded
+    executor = BatchExecutor(client, resume=args.resume)
+    done = apply_plan(executor, plan, check_merged=args.resume)
+
     print()
     print("=" * 80)
+    if not done:
+        print("✗ Some steps failed. Re-run with --apply --resume to finish this plan.")
+        print("=" * 80)
+        return 1
+    path.unlink(missing_ok=True)
+    executor.journal_path([], plan["journal"]).unlink(missing_ok=True)
     print("CONSOLIDATION COMPLETE")
     print("=" * 80)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Static analyzer for MQL5 hot-path anti-patterns.
+
+Tokenizes Expert Advisors and indicators, finds the OnTick / OnCalculate
+bodies and every same-file function reachable from them, and reports:
+
+  handle-in-hot-path     indicator handle creation (iCustom, iMA, ...) per tick;
+                         lazy one-time creation (`if(h == INVALID_HANDLE) h = iMA(...)`,
+                         `if(!initialized) {...}`, `static int h = iMA(...)`) is allowed
+  per-tick-copy          CopyRates/CopyBuffer/... executed before any new-bar guard
+  missing-new-bar-guard  an entry point that copies series data with no guard at all
+  unbounded-object-loop  ObjectCreate inside a loop bounded by bar/object counts
+
+Findings are structured (rule, severity, file, line, function, message) and
+can be printed as text, JSON or GitHub Actions annotations.
+
+Usage:
+    python scripts/mql5_analyzer.py
+    python scripts/mql5_analyzer.py mt5/MQL5/Experts/MyEA.mq5 --format json
+    python scripts/mql5_analyzer.py --format github --fail-on error
+    python scripts/mql5_analyzer.py --diff origin/main...HEAD  # only programs affected by a branch
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mql5_deps import affected_roots, build_index, changed_files
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DIRS = [
+    REPO_ROOT / "mt5" / "MQL5" / "Experts",
+    REPO_ROOT / "mt5" / "MQL5" / "Indicators",
+]
+
+ENTRY_POINTS = ("OnTick", "OnCalculate")
+
+# Functions that create an indicator handle (expensive, belong in OnInit)
+HANDLE_FUNCTIONS = {
+    "iAC", "iAD", "iADX", "iADXWilder", "iAlligator", "iAMA", "iAO", "iATR",
+    "iBands", "iBearsPower", "iBullsPower", "iBWMFI", "iCCI", "iChaikin",
+    "iCustom", "iDEMA", "iDeMarker", "iEnvelopes", "iForce", "iFractals",
+    "iFrAMA", "iGator", "iIchimoku", "iMA", "iMACD", "iMFI", "iMomentum",
+    "iOBV", "iOsMA", "iRSI", "iRVI", "iSAR", "iStdDev", "iStochastic",
+    "iTEMA", "iTriX", "iVIDyA", "iVolumes", "iWPR", "IndicatorCreate",
+}
+
+# Series copies: cheap once per bar, wasteful on every tick
+COPY_FUNCTIONS = {
+    "CopyBuffer", "CopyRates", "CopyTime", "CopyOpen", "CopyHigh", "CopyLow",
+    "CopyClose", "CopyTickVolume", "CopyRealVolume", "CopySpread",
+    "CopyTicks", "CopyTicksRange",
+}
+
+SEVERITY = {
+    "handle-in-hot-path": "error",
+    "per-tick-copy": "warning",
+    "missing-new-bar-guard": "warning",
+    "unbounded-object-loop": "warning",
+}
+SEVERITY_RANK = {"warning": 1, "error": 2}
+
+NOT_CALLS = {"if", "for", "while", "switch", "return", "sizeof", "catch", "do", "else"}
+SCOPE_KEYWORDS = {"class", "struct", "union", "namespace", "interface"}
+
+# `if(...) return` whose condition looks like a new-bar / unchanged-data check
+GUARD_NAME_RE = re.compile(r"new_?bar|last\w*(bar|time)|prev_calculated", re.IGNORECASE)
+# `if(h == INVALID_HANDLE)` / `if(!initialized)` / `if(initialized == false)`:
+# the body runs once, not on every tick
+LAZY_INIT_HANDLE = "INVALID_HANDLE"
+# Loop bounds that are a fixed cap rather than "all bars" / "all objects"
+BOUNDED_NAME_RE = re.compile(r"max|limit|cap", re.IGNORECASE)
+
+TOKEN_RE = re.compile(
+    r"""
+    (?P<space>[ \t\r\f\v]+)
+  | (?P<newline>\n)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:[^"\\\n]|\\.)*"?)
+  | (?P<char>'(?:[^'\\\n]|\\.)*'?)
+  | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_]\w*)
+  | (?P<op>::|->|\+\+|--|&&|\|\||<<=?|>>=?|[-+*/%&|^!=<>]=|.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+PREPROCESSOR_RE = re.compile(r"#(?:[^\n\\]|\\.)*", re.DOTALL)
+
+
+class Token:
+    __slots__ = ("kind", "value", "line")
+
+    def __init__(self, kind, value, line):
+        self.kind = kind
+        self.value = value
+        self.line = line
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value!r}, {self.line})"
+
+
+def tokenize(source):
+    """
+    Split MQL5 source into tokens with 1-based line numbers.
+    Comments, whitespace and preprocessor lines are dropped.
+    """
+    tokens = []
+    line = 1
+    pos = 0
+    at_line_start = True
+    end = len(source)
+    while pos < end:
+        if at_line_start and source[pos] == "#":
+            match = PREPROCESSOR_RE.match(source, pos)
+            line += match.group(0).count("\n")
+            pos = match.end()
+            continue
+        match = TOKEN_RE.match(source, pos)
+        kind = match.lastgroup
+        value = match.group(0)
+        pos = match.end()
+        if kind == "newline":
+            line += 1
+            at_line_start = True
+            continue
+        if kind == "space":
+            continue
+        if kind == "comment":
+            line += value.count("\n")
+            continue
+        at_line_start = False
+        tokens.append(Token(kind, value, line))
+    return tokens
+
+
+def match_close(tokens, i):
+    """Index of the bracket closing tokens[i] (or the last token if unbalanced)."""
+    opener = tokens[i].value
+    closer = {"(": ")", "{": "}", "[": "]"}[opener]
+    depth = 0
+    for j in range(i, len(tokens)):
+        v = tokens[j].value
+        if v == opener:
+            depth += 1
+        elif v == closer:
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(tokens) - 1
+
+
+def statement_end(tokens, i):
+    """Index of the last token of the statement starting at tokens[i]."""
+    if tokens[i].value == "{":
+        return match_close(tokens, i)
+    j = i
+    while j < len(tokens):
+        v = tokens[j].value
+        if v in ("(", "[", "{"):
+            j = match_close(tokens, j)
+        elif v == ";":
+            return j
+        j += 1
+    return len(tokens) - 1
+
+
+class Function:
+    """A function or method definition: name plus the token range of its body."""
+
+    def __init__(self, name, qualname, line, body_start, body_end):
+        self.name = name
+        self.qualname = qualname
+        self.line = line
+        self.body_start = body_start
+        self.body_end = body_end
+
+
+def find_functions(tokens):
+    """Find function definitions at file scope and inside class/struct bodies."""
+    functions = []
+    scopes = []  # one entry per open '{': True if functions may be defined inside
+    pending_scope = False
+    i = 0
+    n = len(tokens)
+    while i < n:
+        tok = tokens[i]
+        v = tok.value
+        in_decl_scope = all(scopes)
+
+        if tok.kind == "ident" and v in SCOPE_KEYWORDS:
+            pending_scope = True
+        elif v == ";":
+            pending_scope = False
+        elif v == "{":
+            scopes.append(pending_scope and in_decl_scope)
+            pending_scope = False
+        elif v == "}":
+            if scopes:
+                scopes.pop()
+        elif v == "(" and in_decl_scope and i > 0 and tokens[i - 1].kind == "ident":
+            close = match_close(tokens, i)
+            j = close + 1
+            while j < n and tokens[j].value == "const":
+                j += 1
+            if j < n and tokens[j].value == "{":
+                name_tok = tokens[i - 1]
+                qualname = name_tok.value
+                if i >= 3 and tokens[i - 2].value == "::":
+                    qualname = f"{tokens[i - 3].value}::{name_tok.value}"
+                body_end = match_close(tokens, j)
+                functions.append(Function(name_tok.value, qualname, name_tok.line, j, body_end))
+                i = body_end + 1
+                continue
+            i = close
+        i += 1
+    return functions
+
+
+def is_guard_condition(cond_tokens):
+    return any(t.kind == "ident" and GUARD_NAME_RE.search(t.value) for t in cond_tokens)
+
+
+def is_lazy_init_condition(cond_tokens):
+    """True for a one-time initialization check: an INVALID_HANDLE comparison or an unset flag."""
+    values = [t.value for t in cond_tokens]
+    if LAZY_INIT_HANDLE in values:
+        return True
+    if len(cond_tokens) == 2 and values[0] == "!" and cond_tokens[1].kind == "ident":
+        return True
+    return len(cond_tokens) == 3 and cond_tokens[0].kind == "ident" and values[1:] == ["==", "false"]
+
+
+def is_bounded_condition(cond_tokens):
+    """True if a loop condition compares against a literal or a *max*/*limit* cap."""
+    for t in cond_tokens:
+        if t.kind == "number":
+            return True
+        if t.kind == "ident" and BOUNDED_NAME_RE.search(t.value):
+            return True
+    return False
+
+
+def scan_body(tokens, func):
+    """
+    Collect calls, loops and the new-bar guard position inside a function body.
+
+    Returns (calls, loops, guard, once) where calls are (name, token_index,
+    line), loops are (start, end, bounded) token ranges, guard is the index
+    of the first `if(<new-bar check>) return` or None, and once are (start,
+    end) token ranges that run only once: lazy-init `if` bodies and static
+    local declarations.
+    """
+    calls = []
+    loops = []
+    guard = None
+    once = []
+    start, end = func.body_start + 1, func.body_end
+    i = start
+    while i < end:
+        tok = tokens[i]
+        v = tok.value
+        if tok.kind == "ident" and i + 1 < end and tokens[i + 1].value == "(":
+            prev = tokens[i - 1].value
+            if v in ("for", "while"):
+                cond_close = match_close(tokens, i + 1)
+                body_end = statement_end(tokens, cond_close + 1) if cond_close + 1 < end else cond_close
+                cond = tokens[i + 2:cond_close]
+                if v == "for":
+                    parts = [t for t in cond if t.value == ";"]
+                    if len(parts) == 2:
+                        first = cond.index(parts[0])
+                        second = cond.index(parts[1])
+                        cond = cond[first + 1:second]
+                loops.append((i, body_end, is_bounded_condition(cond)))
+            elif v == "if":
+                cond_close = match_close(tokens, i + 1)
+                cond = tokens[i + 2:cond_close]
+                if cond_close + 1 < end and is_lazy_init_condition(cond):
+                    once.append((cond_close, statement_end(tokens, cond_close + 1)))
+                k = cond_close + 1
+                if k < end and tokens[k].value == "{":
+                    k += 1
+                if guard is None and k < end and tokens[k].value == "return" and is_guard_condition(cond):
+                    guard = i
+            elif v not in NOT_CALLS and prev not in (".", "->"):
+                calls.append((v, i, tok.line))
+        elif v == "static":
+            # A static local's initializer runs on the first call only
+            once.append((i, statement_end(tokens, i)))
+        elif v == "do" and i + 1 < end:
+            body_end = statement_end(tokens, i + 1)
+            # do { ... } while(cond);
+            cond_open = body_end + 2
+            bounded = False
+            if cond_open < end and tokens[cond_open].value == "(":
+                bounded = is_bounded_condition(tokens[cond_open + 1:match_close(tokens, cond_open)])
+            loops.append((i, body_end, bounded))
+        i += 1
+    return calls, loops, guard, once
+
+
+def finding(rule, path, line, function, message):
+    return {
+        "rule": rule,
+        "severity": SEVERITY[rule],
+        "file": path,
+        "line": line,
+        "function": function,
+        "message": message,
+    }
+
+
+def analyze_source(source, path="<source>"):
+    """Analyze one MQL5 source file. Returns a list of finding dicts sorted by line."""
+    tokens = tokenize(source)
+    functions = find_functions(tokens)
+    by_name = {}
+    for func in functions:
+        by_name.setdefault(func.name, []).append(func)
+    bodies = {id(func): scan_body(tokens, func) for func in functions}
+
+    findings = {}
+
+    def report(rule, line, function, message):
+        findings.setdefault((rule, line), finding(rule, path, line, function, message))
+
+    for entry in functions:
+        if entry.qualname not in ENTRY_POINTS:
+            continue
+        unguarded_copies = []
+        visited = set()
+
+        def visit(func, unguarded, in_unbounded_loop, chain):
+            key = (id(func), unguarded, in_unbounded_loop)
+            if key in visited:
+                return
+            visited.add(key)
+            calls, loops, guard, once = bodies[id(func)]
+            via = " -> ".join(chain)
+            for name, idx, line in calls:
+                call_unguarded = unguarded and (guard is None or idx < guard)
+                call_unbounded = in_unbounded_loop or any(
+                    start < idx <= stop and not bounded for start, stop, bounded in loops
+                )
+                if name in HANDLE_FUNCTIONS:
+                    if any(start < idx <= stop for start, stop in once):
+                        continue
+                    report("handle-in-hot-path", line, func.qualname,
+                           f"{name}() creates an indicator handle on the {entry.name} path ({via}); create it once in OnInit")
+                elif name in COPY_FUNCTIONS and call_unguarded:
+                    unguarded_copies.append(line)
+                    report("per-tick-copy", line, func.qualname,
+                           f"{name}() runs on every tick ({via}); move it after a new-bar guard")
+                elif name == "ObjectCreate" and call_unbounded:
+                    report("unbounded-object-loop", line, func.qualname,
+                           f"ObjectCreate() inside a loop over all bars/objects ({via}); cap the number of objects")
+                for callee in by_name.get(name, ()):
+                    if callee is not func:
+                        visit(callee, call_unguarded, call_unbounded, chain + [callee.qualname])
+
+        visit(entry, True, False, [entry.qualname])
+
+        if unguarded_copies and bodies[id(entry)][2] is None:
+            report("missing-new-bar-guard", entry.line, entry.qualname,
+                   f"{entry.name} copies series data ({len(unguarded_copies)} call(s)) without a new-bar guard")
+
+    return sorted(findings.values(), key=lambda f: (f["line"], f["rule"]))
+
+
+def collect_sources(paths):
+    """Expand files and directories into a sorted list of .mq5/.mqh files."""
+    files = set()
+    for p in paths:
+        p = Path(p)
+        if p.is_dir():
+            files.update(f for f in p.rglob("*") if f.suffix.lower() in (".mq5", ".mqh") and f.is_file())
+        elif p.is_file():
+            files.add(p)
+    return sorted(files)
+
+
+def analyze_paths(paths):
+    """Analyze files/directories. Returns (files_analyzed, findings)."""
+    files = collect_sources(paths)
+    results = []
+    for f in files:
+        source = f.read_text(encoding="utf-8", errors="replace")
+        try:
+            rel = f.resolve().relative_to(REPO_ROOT).as_posix()
+        except ValueError:
+            rel = str(f)
+        results.extend(analyze_source(source, rel))
+    return files, results
+
+
+def print_text(files, findings):
+    print("=" * 60)
+    print("MQL5 Hot-Path Analysis")
+    print("=" * 60)
+    print(f"Files analyzed: {len(files)}")
+    if not findings:
+        print("✓ No hot-path issues found")
+        return
+    for f in findings:
+        glyph = "✗" if f["severity"] == "error" else "⚠"
+        print(f"{glyph} {f['file']}:{f['line']} [{f['rule']}] {f['function']}: {f['message']}")
+    errors = sum(1 for f in findings if f["severity"] == "error")
+    print(f"\n{len(findings)} finding(s): {errors} error(s), {len(findings) - errors} warning(s)")
+
+
+def print_github(findings):
+    """GitHub Actions workflow commands, shown as inline annotations on the PR."""
+    for f in findings:
+        level = "error" if f["severity"] == "error" else "warning"
+        message = f["message"].replace("%", "%25").replace("\n", "%0A")
+        print(f"::{level} file={f['file']},line={f['line']},title={f['rule']}::{message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find per-tick anti-patterns in MQL5 OnTick/OnCalculate code")
+    parser.add_argument("paths", nargs="*", type=Path, help="Files or directories (default: Experts and Indicators)")
+    parser.add_argument("--diff", metavar="RANGE", help="Analyze only programs affected by a git revision range")
+    parser.add_argument("--format", choices=("text", "json", "github"), default="text", help="Output format")
+    parser.add_argument("--fail-on", choices=("warning", "error", "never"), default="error",
+                        help="Exit 1 when a finding of this severity or worse exists (default: error)")
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_DIRS
+    if args.diff:
+        # Programs whose own source or any included header changed
+        paths = [REPO_ROOT / p for p in affected_roots(build_index(), changed_files(args.diff))]
+    files, findings = analyze_paths(paths)
+
+    if args.format == "json":
+        print(json.dumps({"files": len(files), "findings": findings}, indent=2))
+    elif args.format == "github":
+        print_github(findings)
+        print(f"{len(findings)} MQL5 hot-path finding(s) in {len(files)} file(s)")
+    else:
+        print_text(files, findings)
+
+    if args.fail_on == "never":
+        return 0
+    threshold = SEVERITY_RANK[args.fail_on]
+    return 1 if any(SEVERITY_RANK[f["severity"]] >= threshold for f in findings) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+MQL5 include graph / build-dependency index.
+
+Parses #include directives under mt5/MQL5 into a dependency graph and
+answers "which experts/indicators are affected by this change?", so
+packaging, validation and PR analysis can process only those.
+
+The parsed include lists are cached in .cache/mql5_deps.json keyed by file
+size and mtime, so repeated runs only re-read files that changed.
+
+Usage:
+    python scripts/mql5_deps.py                                  # print the graph
+    python scripts/mql5_deps.py --affected mt5/MQL5/Include/ZoloBridge.mqh
+    python scripts/mql5_deps.py --diff origin/main...HEAD        # roots affected by a branch
+    python scripts/mql5_deps.py --diff origin/main...HEAD --closure --json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+MQL5_DIR = REPO_ROOT / "mt5" / "MQL5"
+INCLUDE_DIR = MQL5_DIR / "Include"
+CACHE_PATH = REPO_ROOT / ".cache" / "mql5_deps.json"
+CACHE_VERSION = 1
+
+SOURCE_SUFFIXES = {".mq5", ".mqh"}
+
+# #include <Path\File.mqh>  or  #include "File.mqh"
+INCLUDE_RE = re.compile(rb'^[ \t]*#include[ \t]*([<"])([^>"\r\n]+)[>"]', re.MULTILINE)
+
+
+def rel(path: Path) -> str:
+    return path.relative_to(REPO_ROOT).as_posix()
+
+
+def parse_includes(data: bytes) -> list[tuple[str, str]]:
+    """Return (kind, target) for each #include; kind is "<" (library) or '"' (local)."""
+    return [
+        (m.group(1).decode("ascii"), m.group(2).decode("utf-8", "replace").strip().replace("\\", "/"))
+        for m in INCLUDE_RE.finditer(data)
+    ]
+
+
+def resolve_include(source: str, kind: str, target: str, known: dict[str, str]) -> str | None:
+    """
+    Resolve an include the way MetaEditor does: "file" relative to the
+    including file first, then MQL5/Include; <file> from MQL5/Include only.
+    Returns a repo-relative path, or None for headers not in this repository
+    (the MetaTrader standard library). `known` maps lower-cased paths of
+    the repository's sources to their real spelling.
+    """
+    candidates = []
+    if kind == '"':
+        candidates.append(os.path.normpath(os.path.join(os.path.dirname(source), target)))
+    candidates.append(os.path.normpath(os.path.join(rel(INCLUDE_DIR), target)))
+    for cand in candidates:
+        # MQL5 paths are case-insensitive
+        found = known.get(cand.replace(os.sep, "/").lower())
+        if found:
+            return found
+    return None
+
+
+def list_sources(root: Path = MQL5_DIR) -> list[Path]:
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in SOURCE_SUFFIXES:
+                found.append(Path(dirpath) / name)
+    return sorted(found)
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def save_cache(path: Path, files: dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": files}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        # The cache is an optimization; never fail because of it.
+        pass
+
+
+def build_index(use_cache: bool = True) -> dict[str, dict]:
+    """
+    Return {source: {"includes": [in-repo deps], "external": [library headers]}}
+    for every .mq5/.mqh file under mt5/MQL5.
+    """
+    cache = load_cache(CACHE_PATH) if use_cache else {}
+    sources = list_sources()
+    known = {rel(p).lower(): rel(p) for p in sources}
+
+    parsed = {}
+    for path in sources:
+        key = rel(path)
+        st = path.stat()
+        entry = cache.get(key)
+        if not (entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns):
+            entry = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "raw": parse_includes(path.read_bytes()),
+            }
+        parsed[key] = entry
+
+    if use_cache and parsed != cache:
+        save_cache(CACHE_PATH, parsed)
+
+    # Resolution depends on which files exist, so it is redone on every run (cheap)
+    index = {}
+    for key, entry in parsed.items():
+        includes, external = [], []
+        for kind, target in entry["raw"]:
+            dep = resolve_include(key, kind, target, known)
+            if dep is None:
+                external.append(target)
+            elif dep != key and dep not in includes:
+                includes.append(dep)
+        index[key] = {"includes": includes, "external": external}
+    return index
+
+
+def is_root(path: str) -> bool:
+    """Compilable programs (experts, indicators, scripts) as opposed to headers."""
+    return path.lower().endswith(".mq5")
+
+
+def dependency_closure(index: dict[str, dict], sources) -> set[str]:
+    """The given sources plus every in-repo header they include, transitively."""
+    seen = set()
+    stack = [s for s in sources if s in index]
+    while stack:
+        cur = stack.pop()
+        if cur in seen:
+            continue
+        seen.add(cur)
+        stack.extend(index[cur]["includes"])
+    return seen
+
+
+def dependents(index: dict[str, dict]) -> dict[str, set[str]]:
+    """Reverse graph: header -> files that include it directly."""
+    reverse = {}
+    for src, entry in index.items():
+        for dep in entry["includes"]:
+            reverse.setdefault(dep, set()).add(src)
+    return reverse
+
+
+def affected_roots(index: dict[str, dict], changed) -> list[str]:
+    """
+    .mq5 programs that must be rebuilt when any of `changed` (repo-relative
+    paths) changes. Deleted headers still affect the files that included
+    them, so paths missing from the index are matched case-insensitively
+    against unresolved includes too.
+    """
+    reverse = dependents(index)
+    lowered = {k.lower(): k for k in index}
+    affected = set()
+    stack = []
+    for path in changed:
+        path = path.replace("\\", "/")
+        key = lowered.get(path.lower())
+        if key is not None:
+            stack.append(key)
+            continue
+        if not path.lower().startswith(rel(MQL5_DIR).lower() + "/"):
+            continue
+        # A removed file: anything still referring to it by name is affected
+        gone = path.lower()
+        for src, entry in index.items():
+            for target in entry["external"]:
+                if gone.endswith("/" + target.lower()):
+                    stack.append(src)
+
+    seen = set()
+    while stack:
+        cur = stack.pop()
+        if cur in seen:
+            continue
+        seen.add(cur)
+        if is_root(cur):
+            affected.add(cur)
+        stack.extend(reverse.get(cur, ()))
+    return sorted(affected)
+
+
+def repo_path(arg: str) -> str:
+    """
+    A --affected argument as a repo-relative path. Existing files are resolved
+    from the working directory; anything else (deleted files, paths outside
+    the repository) is passed through unchanged.
+    """
+    path = Path(arg)
+    if path.exists():
+        try:
+            return rel(path.resolve())
+        except ValueError:
+            pass
+    return arg
+
+
+def changed_files(rev_range: str) -> list[str]:
+    """All paths touched by a revision range, including deletions and both sides of renames."""
+    if rev_range.startswith("-"):
+        raise SystemExit(f"ERROR: Invalid revision range: {rev_range}")
+    spec = rev_range if ".." in rev_range else f"{rev_range}..HEAD"
+    result = subprocess.run(
+        ["git", "diff", "--name-only", "-z", "--no-renames", spec, "--"],
+        cwd=REPO_ROOT, capture_output=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"ERROR: git diff {spec} failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return [p.decode("utf-8", "surrogateescape") for p in result.stdout.split(b"\0") if p]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="MQL5 include graph and affected-program lookup")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--affected", nargs="+", metavar="PATH", help="List programs affected by these changed files")
+    group.add_argument("--diff", metavar="RANGE", help="List programs affected by a git revision range")
+    parser.add_argument("--closure", action="store_true", help="Also list the in-repo headers the affected programs need")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    parser.add_argument("--no-cache", action="store_true", help=f"Ignore and don't update {rel(CACHE_PATH)}")
+    args = parser.parse_args()
+
+    index = build_index(use_cache=not args.no_cache)
+
+    if args.affected or args.diff:
+        changed = changed_files(args.diff) if args.diff else [repo_path(p) for p in args.affected]
+        roots = affected_roots(index, changed)
+        files = sorted(dependency_closure(index, roots)) if args.closure else roots
+        if args.json:
+            print(json.dumps({"changed": changed, "affected": roots, "files": files}, indent=2))
+        else:
+            # One path per line so shell scripts can consume it directly
+            for f in files:
+                print(f)
+        return 0
+
+    if args.json:
+        print(json.dumps(index, indent=2, sort_keys=True))
+        return 0
+
+    print("=" * 60)
+    print("MQL5 Include Graph")
+    print("=" * 60)
+    for src in sorted(s for s in index if is_root(s)):
+        deps = sorted(dependency_closure(index, [src]) - {src})
+        external = sorted({t for d in [src, *deps] for t in index[d]["external"]})
+        print(f"{src}")
+        for d in deps:
+            print(f"  ├─ {d}")
+        if external:
+            print(f"  └─ {len(external)} standard library header(s)")
+    headers = [s for s in index if not is_root(s)]
+    print(f"\n✓ {len(index) - len(headers)} program(s), {len(headers)} header(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,24 @@ ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 SRC_DIR="$ROOT_DIR/mt5/MQL5"
 OUT_DIR="$ROOT_DIR/dist"
 OUT_ZIP="$OUT_DIR/Exness_MT5_MQL5.zip"
+ONLY_FILES=""
+
+# --diff RANGE: package only the programs affected by a revision range
+# (plus the in-repo headers they include), using the MQL5 include graph.
+if [[ "${1:-}" == "--diff" ]]; then
+  if [[ -z "${2:-}" ]]; then
+    echo "Usage: $0 [--diff <base>...<head>]" >&2
+    exit 2
+  fi
+  ONLY_FILES="$(python3 "$ROOT_DIR/scripts/mql5_deps.py" --diff "$2" --closure)"
+  if [[ -z "$ONLY_FILES" ]]; then
+    echo "No MQL5 programs affected by $2; nothing to package."
+    exit 0
+  fi
+  OUT_ZIP="$OUT_DIR/Exness_MT5_MQL5_changed.zip"
+fi
 
-export ROOT_DIR SRC_DIR OUT_ZIP
+export ROOT_DIR SRC_DIR OUT_ZIP ONLY_FILES
 
 if [[ ! -d "$SRC_DIR" ]]; then
   echo "ERROR: Missing source directory: $SRC_DIR" >&2
@@ -22,6 +38,7 @@ import zipfile
 root_dir = os.environ["ROOT_DIR"]
 src_dir = os.environ["SRC_DIR"]
 out_zip = os.environ["OUT_ZIP"]
+only = {p for p in os.environ.get("ONLY_FILES", "").splitlines() if p}
 
 def should_include(path: str) -> bool:
     # Package only source code (mq5/mqh) so users compile locally.
@@ -34,6 +51,8 @@ with zipfile.ZipFile(out_zip, "w", compression=zipfile.ZIP_DEFLATED) as z:
             full = os.path.join(dirpath, fn)
             if not should_include(full):
                 continue
+            if only and os.path.relpath(full, root_dir).replace(os.sep, "/") not in only:
+                continue
             rel_under_src = os.path.relpath(full, src_dir)
             arcname = os.path.join("MQL5", rel_under_src)
             z.write(full, arcname)
@@ -0,0 +1,131 @@
+"""
+Background status poller for the cloud platforms.
+
+Runs each platform's status CLI (flyctl, render, railway) asynchronously on
+an interval and caches the results, so callers such as the Telegram bot can
+answer instantly from the cache instead of blocking on a subprocess.
+Concurrent refresh requests share one poll.
+
+Used by telegram_deploy_bot.py; it has no Telegram dependency itself.
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+STATUS_COMMANDS = {
+    'flyio': ['flyctl', 'status'],
+    'render': ['render', 'services', '--output', 'text', '--confirm'],
+    'railway': ['railway', 'status'],
+}
+POLL_INTERVAL = 300  # seconds
+POLL_TIMEOUT = 30  # seconds per platform
+MAX_OUTPUT_CHARS = 1000  # keeps three platforms inside one Telegram message
+
+
+class PlatformStatus:
+    def __init__(self, platform: str, ok: bool, output: str, checked_at: float, duration: float):
+        self.platform = platform
+        self.ok = ok
+        self.output = output
+        self.checked_at = checked_at
+        self.duration = duration
+
+    def age(self) -> float:
+        return time.time() - self.checked_at
+
+
+async def check_platform(platform: str, cmd, timeout: float = POLL_TIMEOUT) -> PlatformStatus:
+    """Run one status command without blocking the event loop."""
+    start = time.monotonic()
+    checked_at = time.time()
+
+    def result(ok, output):
+        output = output.strip()
+        if len(output) > MAX_OUTPUT_CHARS:
+            output = output[:MAX_OUTPUT_CHARS] + "\n…"
+        return PlatformStatus(platform, ok, output, checked_at, time.monotonic() - start)
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=REPO_ROOT,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+    except FileNotFoundError:
+        return result(False, f"{cmd[0]} not found. Is the {platform} CLI installed?")
+    except Exception as e:
+        return result(False, f"Error running {cmd[0]}: {e}")
+
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return result(False, f"{' '.join(cmd)} timed out after {timeout:g}s")
+    return result(process.returncode == 0, stdout.decode('utf-8', errors='replace'))
+
+
+class StatusPoller:
+    """Caches the latest PlatformStatus per platform and refreshes it in the background."""
+
+    def __init__(self, commands: Optional[Dict[str, list]] = None, interval: float = POLL_INTERVAL, timeout: float = POLL_TIMEOUT):
+        self.commands = dict(STATUS_COMMANDS if commands is None else commands)
+        self.interval = interval
+        self.timeout = timeout
+        self.cache: Dict[str, PlatformStatus] = {}
+        self.polls = 0
+        self._refreshing: Optional[asyncio.Task] = None
+        self._refreshing_platforms: set = set()
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def _poll(self, platforms):
+        results = await asyncio.gather(*(check_platform(p, self.commands[p], self.timeout) for p in platforms))
+        for status in results:
+            self.cache[status.platform] = status
+        self.polls += 1
+
+    async def refresh(self, platforms: Optional[Iterable[str]] = None) -> Dict[str, PlatformStatus]:
+        """
+        Poll now and return the cache. A refresh already in progress is
+        joined instead of starting a second one (unless it covers different
+        platforms).
+        """
+        wanted = sorted(self.commands if platforms is None else (p for p in platforms if p in self.commands))
+        task = self._refreshing
+        if task is None or task.done() or not set(wanted) <= self._refreshing_platforms:
+            task = asyncio.get_running_loop().create_task(self._poll(wanted))
+            self._refreshing, self._refreshing_platforms = task, set(wanted)
+        await asyncio.shield(task)
+        return self.get(wanted)
+
+    def get(self, platforms: Optional[Iterable[str]] = None) -> Dict[str, PlatformStatus]:
+        """Cached statuses (platforms never polled yet are missing)."""
+        names = self.commands if platforms is None else platforms
+        return {p: self.cache[p] for p in names if p in self.cache}
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Status poll failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start polling in the background on the running event loop."""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
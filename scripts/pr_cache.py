@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Persistent PR and branch metadata cache (SQLite).
+
+Stores `gh pr list` results keyed by PR number and head SHA, plus the
+branch report from git_batch keyed by branch name, tip and base commit
+(ahead/behind/merged change when main moves, too). Each sync only
+asks GitHub for PRs updated since the previous sync and only rewrites rows
+that actually changed, so reports over thousands of PRs are answered from
+indexed tables instead of re-fetching and re-parsing everything.
+
+Usage:
+    python scripts/pr_cache.py            # incremental sync, then summary
+    python scripts/pr_cache.py --full     # re-fetch every PR
+    python scripts/pr_cache.py --offline  # summary from the cache only
+"""
+
+import argparse
+import json
+import sqlite3
+import subprocess
+import sys
+from contextlib import closing
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DB_PATH = REPO_ROOT / ".cache" / "pr_cache.sqlite3"
+
+GH_FIELDS = "number,title,state,author,createdAt,updatedAt,headRefName,headRefOid,baseRefName,isDraft,labels"
+DEFAULT_LIMIT = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prs (
+    number      INTEGER PRIMARY KEY,
+    title       TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    author      TEXT,
+    created_at  TEXT,
+    updated_at  TEXT NOT NULL,
+    head_ref    TEXT,
+    head_sha    TEXT,
+    base_ref    TEXT,
+    is_draft    INTEGER NOT NULL DEFAULT 0,
+    category    TEXT NOT NULL DEFAULT 'other'
+);
+CREATE INDEX IF NOT EXISTS prs_state ON prs(state, updated_at);
+CREATE INDEX IF NOT EXISTS prs_category ON prs(category, state);
+
+CREATE TABLE IF NOT EXISTS pr_labels (
+    number  INTEGER NOT NULL REFERENCES prs(number) ON DELETE CASCADE,
+    name    TEXT NOT NULL,
+    PRIMARY KEY (number, name)
+);
+CREATE INDEX IF NOT EXISTS pr_labels_name ON pr_labels(name);
+
+CREATE TABLE IF NOT EXISTS branches (
+    name              TEXT PRIMARY KEY,
+    oid               TEXT NOT NULL,
+    base_oid          TEXT,
+    ahead             INTEGER NOT NULL,
+    behind            INTEGER NOT NULL,
+    merged            INTEGER NOT NULL,
+    last_commit_date  TEXT,
+    category          TEXT NOT NULL DEFAULT 'other'
+);
+CREATE INDEX IF NOT EXISTS branches_category ON branches(merged, category);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT
+);
+"""
+
+
+def fetch_prs_via_gh(since=None, limit=DEFAULT_LIMIT):
+    """
+    Run `gh pr list` for all states, optionally only PRs updated at or after
+    `since` (ISO timestamp). Returns the parsed list, or None if gh is
+    unavailable or fails.
+    """
+    cmd = ["gh", "pr", "list", "--state", "all", "--limit", str(limit), "--json", GH_FIELDS]
+    if since:
+        cmd += ["--search", f"updated:>={since}"]
+    try:
+        result = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True, timeout=120, encoding="utf-8", errors="replace")
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        return json.loads(result.stdout)
+    except json.JSONDecodeError:
+        return None
+
+
+class PRCache:
+    """SQLite-backed PR/branch metadata store."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        # Databases created before base_oid was tracked
+        columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(branches)")}
+        if "base_oid" not in columns:
+            self.conn.execute("ALTER TABLE branches ADD COLUMN base_oid TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- meta -------------------------------------------------------------
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT INTO meta(key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    # -- PRs --------------------------------------------------------------
+
+    def upsert_prs(self, prs, categorize=None):
+        """
+        Insert or update PRs from gh JSON. Rows whose updatedAt, head SHA
+        and category are unchanged are left alone. Returns the number of
+        rows written.
+        """
+        written = 0
+        with self.conn:
+            for pr in prs:
+                head_ref = pr.get("headRefName") or ""
+                cur = self.conn.execute(
+                    """
+                    INSERT INTO prs(number, title, state, author, created_at, updated_at,
+                                    head_ref, head_sha, base_ref, is_draft, category)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(number) DO UPDATE SET
+                        title = excluded.title, state = excluded.state, author = excluded.author,
+                        created_at = excluded.created_at, updated_at = excluded.updated_at,
+                        head_ref = excluded.head_ref, head_sha = excluded.head_sha,
+                        base_ref = excluded.base_ref, is_draft = excluded.is_draft,
+                        category = excluded.category
+                    WHERE excluded.updated_at != prs.updated_at
+                       OR excluded.head_sha IS NOT prs.head_sha
+                       OR excluded.category != prs.category
+                    """,
+                    (
+                        pr["number"],
+                        pr.get("title") or "",
+                        (pr.get("state") or "UNKNOWN").upper(),
+                        (pr.get("author") or {}).get("login"),
+                        pr.get("createdAt"),
+                        pr.get("updatedAt") or "",
+                        head_ref,
+                        pr.get("headRefOid"),
+                        pr.get("baseRefName"),
+                        1 if pr.get("isDraft") else 0,
+                        categorize(head_ref) if categorize else "other",
+                    ),
+                )
+                if cur.rowcount:
+                    written += 1
+                    self.conn.execute("DELETE FROM pr_labels WHERE number = ?", (pr["number"],))
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO pr_labels(number, name) VALUES (?, ?)",
+                        [(pr["number"], label["name"]) for label in pr.get("labels") or [] if label.get("name")],
+                    )
+        return written
+
+    def recategorize(self, categorize):
+        """
+        Re-apply categorize to every cached PR, so rows gh did not return
+        pick up changed category rules. Returns the number of rows updated.
+        """
+        rows = self.conn.execute("SELECT number, head_ref, category FROM prs").fetchall()
+        changed = []
+        for r in rows:
+            category = categorize(r["head_ref"] or "")
+            if category != r["category"]:
+                changed.append((category, r["number"]))
+        with self.conn:
+            self.conn.executemany("UPDATE prs SET category = ? WHERE number = ?", changed)
+        return len(changed)
+
+    def sync(self, fetch=fetch_prs_via_gh, categorize=None, full=False):
+        """
+        Incremental refresh: fetch PRs updated since the newest updatedAt
+        already stored (everything on the first run or with full=True), then
+        recategorize the rest. Returns the number of rows written, or None if
+        fetching failed.
+        """
+        since = None if full else self.get_meta("last_updated_at")
+        prs = fetch(since=since)
+        if prs is None:
+            return None
+        written = self.upsert_prs(prs, categorize)
+        if categorize:
+            written += self.recategorize(categorize)
+        with self.conn:
+            newest = self.conn.execute("SELECT MAX(updated_at) AS m FROM prs").fetchone()["m"]
+            if newest:
+                self.set_meta("last_updated_at", newest)
+        return written
+
+    def count_prs(self):
+        return self.conn.execute("SELECT COUNT(*) AS n FROM prs").fetchone()["n"]
+
+    def counts_by_state(self):
+        rows = self.conn.execute("SELECT state, COUNT(*) AS n FROM prs GROUP BY state ORDER BY state")
+        return {r["state"]: r["n"] for r in rows}
+
+    def counts_by_category(self, state=None):
+        if state:
+            rows = self.conn.execute(
+                "SELECT category, COUNT(*) AS n FROM prs WHERE state = ? GROUP BY category ORDER BY category",
+                (state,),
+            )
+        else:
+            rows = self.conn.execute("SELECT category, COUNT(*) AS n FROM prs GROUP BY category ORDER BY category")
+        return {r["category"]: r["n"] for r in rows}
+
+    def prs(self, state=None, category=None, limit=None):
+        """PR rows (most recently updated first) with a `labels` list."""
+        sql = "SELECT * FROM prs"
+        where, params = [], []
+        if state:
+            where.append("state = ?")
+            params.append(state)
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY updated_at DESC, number DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = [dict(r) for r in self.conn.execute(sql, params)]
+        if rows:
+            placeholders = ",".join("?" * len(rows))
+            labels = {}
+            for r in self.conn.execute(
+                f"SELECT number, name FROM pr_labels WHERE number IN ({placeholders}) ORDER BY name",
+                [r["number"] for r in rows],
+            ):
+                labels.setdefault(r["number"], []).append(r["name"])
+            for r in rows:
+                r["labels"] = labels.get(r["number"], [])
+        return rows
+
+    # -- branches -----------------------------------------------------------
+
+    def sync_branches(self, report, categorize=None):
+        """
+        Store a git_batch branch report. Branches whose tip, base commit and
+        category are unchanged are skipped (rows without a base_oid in the
+        report are always rewritten) and branches that no longer exist are
+        removed. Returns the number of rows written.
+        """
+        written = 0
+        with self.conn:
+            known = {
+                r["name"]: (r["oid"], r["base_oid"], r["category"])
+                for r in self.conn.execute("SELECT name, oid, base_oid, category FROM branches")
+            }
+            for b in report:
+                category = categorize(b["name"]) if categorize else "other"
+                if b.get("base_oid") and known.get(b["name"]) == (b["oid"], b["base_oid"], category):
+                    continue
+                self.conn.execute(
+                    """
+                    INSERT OR REPLACE INTO branches(name, oid, base_oid, ahead, behind, merged, last_commit_date, category)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        b["name"], b["oid"], b.get("base_oid"), b["ahead"], b["behind"],
+                        1 if b["merged"] else 0, b.get("date"), category,
+                    ),
+                )
+                written += 1
+            gone = set(known) - {b["name"] for b in report}
+            self.conn.executemany("DELETE FROM branches WHERE name = ?", [(name,) for name in gone])
+        return written
+
+    def branches(self, merged=None, category=None):
+        sql = "SELECT * FROM branches"
+        where, params = [], []
+        if merged is not None:
+            where.append("merged = ?")
+            params.append(1 if merged else 0)
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY name"
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync and summarize the local PR metadata cache")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--full", action="store_true", help="Re-fetch every PR instead of only updated ones")
+    mode.add_argument("--offline", action="store_true", help="Don't call gh; report from the cache only")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help=f"Cache database (default: {DB_PATH.relative_to(REPO_ROOT)})")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from review_pull_requests import branch_category
+
+    with closing(PRCache(args.db)) as cache:
+        if not args.offline:
+            written = cache.sync(categorize=branch_category, full=args.full)
+            if written is None:
+                print("⚠ gh unavailable; showing cached data")
+            else:
+                print(f"✓ Synced: {written} PR(s) updated")
+
+        print(f"PRs cached: {cache.count_prs()} (last update seen: {cache.get_meta('last_updated_at', 'never')})")
+        for state, n in cache.counts_by_state().items():
+            print(f"  {state}: {n}")
+        for category, n in cache.counts_by_category("OPEN").items():
+            print(f"  open/{category}: {n}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Cluster near-duplicate pull requests by diff similarity.
+
+Each PR's diff (against its merge base) is reduced to the set of token
+shingles of its added/removed lines, summarized as a MinHash signature and
+bucketed with locality-sensitive hashing. Only PRs that share an LSH
+bucket are ever compared, so the cost grows with the number of PRs and
+duplicates rather than with the number of PR pairs. Each cluster gets a
+proposed representative: the member most similar to all the others.
+
+Usage:
+    python scripts/pr_clusters.py                    # open PRs from the PR cache
+    python scripts/pr_clusters.py 52 54 56 57 --threshold 0.7
+    python scripts/pr_clusters.py --json
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+
+# Universal hashing h(x) = (a*x + b) mod P with a fixed seed, so signatures
+# are comparable between runs
+MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def changed_tokens(diff_text):
+    """Tokens of the added/removed lines of a unified diff, each line led by its sign."""
+    tokens = []
+    for line in diff_text.splitlines():
+        if not line or line[0] not in "+-" or line.startswith(("+++", "---")):
+            continue
+        tokens.append(line[0])
+        tokens.extend(TOKEN_RE.findall(line[1:]))
+    return tokens
+
+
+def shingles(diff_text, k=SHINGLE_SIZE):
+    """Set of 64-bit hashes of k-token shingles of the changed lines."""
+    tokens = changed_tokens(diff_text)
+    if len(tokens) < k:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = (" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1))
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big") % MERSENNE_PRIME
+        for g in grams
+    }
+
+
+def minhash(shingle_set, num_perm=NUM_PERM):
+    """MinHash signature of a non-empty shingle set."""
+    return tuple(
+        min((a * x + b) % MERSENNE_PRIME for x in shingle_set)
+        for a, b in PERMUTATIONS[:num_perm]
+    )
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity: the fraction of agreeing signature slots."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def choose_bands(num_perm, threshold):
+    """
+    (bands, rows) with bands * rows <= num_perm whose LSH threshold
+    (1/bands) ** (1/rows) is closest to the requested similarity.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        err = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or err < best[0]:
+            best = (err, bands, rows)
+    return best[1], best[2]
+
+
+class DisjointSet:
+    def __init__(self, items):
+        self.parent = {item: item for item in items}
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def cluster_signatures(signatures, threshold=DEFAULT_THRESHOLD):
+    """
+    Group keys whose signatures are estimated to be at least `threshold`
+    similar. Returns clusters (sorted lists of keys) with two or more members.
+    """
+    num_perm = len(next(iter(signatures.values()))) if signatures else NUM_PERM
+    bands, rows = choose_bands(num_perm, threshold)
+
+    buckets = {}
+    for key, sig in signatures.items():
+        for band in range(bands):
+            chunk = sig[band * rows:(band + 1) * rows]
+            buckets.setdefault((band, chunk), []).append(key)
+
+    groups = DisjointSet(signatures)
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        # Compare against a few anchors per bucket instead of every pair, so
+        # hundreds of identical bot PRs in one bucket stay linear
+        anchors = []
+        for key in members:
+            for anchor in anchors:
+                if groups.find(key) == groups.find(anchor) or similarity(signatures[key], signatures[anchor]) >= threshold:
+                    groups.union(key, anchor)
+                    break
+            else:
+                anchors.append(key)
+
+    clusters = {}
+    for key in signatures:
+        clusters.setdefault(groups.find(key), []).append(key)
+    return sorted((sorted(c) for c in clusters.values() if len(c) > 1), key=lambda c: c[0])
+
+
+def pick_representative(cluster, signatures, drafts=()):
+    """The medoid: highest mean similarity to the others. Non-drafts, then older PRs, win ties."""
+    def score(key):
+        total = sum(similarity(signatures[key], signatures[other]) for other in cluster if other != key)
+        return (total / (len(cluster) - 1), key not in drafts, -key)
+
+    return max(cluster, key=score)
+
+
+def cluster_prs(diffs, threshold=DEFAULT_THRESHOLD, drafts=()):
+    """
+    Cluster PRs by diff text ({pr_number: diff}). Returns a list of
+    {"representative", "members", "similarity"} dicts, where similarity maps
+    each member to its estimated similarity with the representative.
+    """
+    signatures = {}
+    for pr, diff in diffs.items():
+        sh = shingles(diff or "")
+        if sh:  # empty diffs carry no signal
+            signatures[pr] = minhash(sh)
+
+    result = []
+    for cluster in cluster_signatures(signatures, threshold):
+        rep = pick_representative(cluster, signatures, drafts)
+        result.append({
+            "representative": rep,
+            "members": cluster,
+            "similarity": {pr: round(similarity(signatures[rep], signatures[pr]), 3) for pr in cluster},
+        })
+    return result
+
+
+def load_pr_diffs(pr_numbers, base="origin/main"):
+    """
+    Diff of each PR against its merge base with `base`, using one fetch,
+    one rev-list read and one diff-tree process for all PRs.
+    Returns {pr_number: diff text}.
+    """
+    from analyze_pr_optimizations import fetch_prs
+    from git_batch import get_repo
+
+    repo = get_repo()
+    heads = fetch_prs(pr_numbers)
+    if not heads:
+        return {}
+    merge_bases = repo.merge_bases(base, heads.values())
+    patches = repo.diffs([(merge_bases[oid], oid) for oid in heads.values() if oid in merge_bases])
+    return {pr: patches.get(oid, "") for pr, oid in heads.items()}
+
+
+def open_prs_from_cache():
+    """Open PR numbers and draft flags from the local PR cache, refreshed via gh when possible."""
+    from pr_cache import PRCache
+    from review_pull_requests import branch_category
+
+    with PRCache() as cache:
+        cache.sync(categorize=branch_category)
+        prs = cache.prs(state="OPEN")
+    return [pr["number"] for pr in prs], {pr["number"] for pr in prs if pr["is_draft"]}
+
+
+def find_duplicate_clusters(pr_numbers=None, threshold=DEFAULT_THRESHOLD, base="origin/main"):
+    """End to end: open PRs (or the given ones) -> diffs -> clusters."""
+    drafts = set()
+    if not pr_numbers:
+        pr_numbers, drafts = open_prs_from_cache()
+    diffs = load_pr_diffs(pr_numbers, base)
+    return cluster_prs(diffs, threshold, drafts), diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate PRs by diff similarity (MinHash + LSH)")
+    parser.add_argument("prs", nargs="*", type=int, help="PR numbers (default: open PRs from the PR cache)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"Minimum estimated similarity (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--base", default="origin/main", help="Base branch PR diffs are taken against")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be in (0, 1]")
+
+    clusters, diffs = find_duplicate_clusters(args.prs, args.threshold, args.base)
+
+    if args.json:
+        print(json.dumps({"analyzed": sorted(diffs), "clusters": clusters}, indent=2))
+        return 0
+
+    print("=" * 80)
+    print(f"DUPLICATE PR CLUSTERS (similarity >= {args.threshold})")
+    print("=" * 80)
+    print(f"PRs analyzed: {len(diffs)}")
+    for c in clusters:
+        rep = c["representative"]
+        print(f"\nKeep PR #{rep}; duplicates:")
+        for pr in c["members"]:
+            if pr != rep:
+                print(f"  - PR #{pr} (similarity {c['similarity'][pr]:.2f})")
+    duplicates = sum(len(c["members"]) - 1 for c in clusters)
+    print(f"\n✓ {len(clusters)} cluster(s), {duplicates} PR(s) proposed for closing")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
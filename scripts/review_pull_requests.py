@@ -4,66 +4,32 @@ Pull Request Review Script
 Reviews all pull requests and creates a comprehensive summary
 """
 
-import subprocess
 import sys
-import json
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
-REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 
+from git_batch import GitError, get_repo
+from pr_cache import PRCache, fetch_prs_via_gh
 
-def run_command(cmd, capture_output=True):
-    """Run a command and return the result."""
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd=REPO_ROOT,
-            capture_output=capture_output,
-            text=True,
-            timeout=30,
-            encoding='utf-8',
-            errors='replace'
-        )
-        return result
-    except Exception as e:
-        print(f"Error running command: {e}", file=sys.stderr)
-        return None
+REPO_ROOT = Path(__file__).resolve().parents[1]
 
 
-def get_prs_via_gh_cli():
-    """Get PRs using GitHub CLI."""
-    result = run_command(["gh", "pr", "list", "--state", "all", "--json", "number,title,state,author,createdAt,updatedAt,headRefName,baseRefName,isDraft,labels"])
-    if result and result.returncode == 0:
-        try:
-            return json.loads(result.stdout)
-        except json.JSONDecodeError:
-            return []
-    return None
+def get_prs_via_gh_cli(since=None):
+    """Get PRs using GitHub CLI (only those updated since `since`, if given)."""
+    return fetch_prs_via_gh(since=since)
 
 
-def get_prs_via_git():
-    """Get PR information via git branches."""
-    # Get all branches that might be PR branches
+def get_branch_report():
+    """Branch details relative to origin/main, or None if they can't be read."""
     # Use origin/main as base for robust comparison in CI/CD
-    result = run_command(["git", "branch", "-r", "--no-merged", "origin/main"])
-    branches = []
-    if result and result.returncode == 0:
-        branches = [b.strip() for b in result.stdout.strip().split("\n") 
-                    if b.strip() and "origin/main" not in b and "HEAD" not in b]
-    
-    # Get merged branches that might have been PRs
-    result_merged = run_command(["git", "branch", "-r", "--merged", "origin/main"])
-    merged_branches = []
-    if result_merged and result_merged.returncode == 0:
-        merged_branches = [b.strip() for b in result_merged.stdout.strip().split("\n") 
-                          if b.strip() and "origin/main" not in b and "HEAD" not in b]
-    
-    return {
-        "open": branches,
-        "merged": merged_branches
-    }
+    try:
+        return get_repo().branch_report("origin/main")
+    except GitError as e:
+        print(f"Error reading branches: {e}", file=sys.stderr)
+        return None
 
 
 def analyze_branch_name(branch_name):
@@ -101,74 +67,9 @@ def analyze_branch_name(branch_name):
     return info
 
 
-def get_all_branch_details():
-    """Get detailed information about unmerged branches using a single git command."""
-    # We use git for-each-ref to get commit date and ahead/behind counts relative to origin/main
-    # Note: %(ahead-behind:origin/main) requires git 2.41+
-    # ⚡ Performance Optimization: Only fetch details for unmerged branches to avoid overhead on old merged branches
-    cmd = ["git", "for-each-ref", "--no-merged", "origin/main", "--format=%(refname:short)|%(committerdate:iso8601)|%(ahead-behind:origin/main)", "refs/remotes/origin"]
-    result = run_command(cmd)
-
-    details = {}
-    if result and result.returncode == 0:
-        for line in result.stdout.strip().split("\n"):
-            if not line.strip():
-                continue
-            parts = line.split("|")
-            if len(parts) >= 3:
-                ref = parts[0].strip()
-                date = parts[1].strip()
-                ahead_behind = parts[2].strip()
-
-                # Parse ahead/behind
-                try:
-                    # Output is "ahead behind"
-                    ahead_str, _ = ahead_behind.split()
-                    ahead = int(ahead_str)
-                except (ValueError, IndexError):
-                    ahead = 0
-
-                # ref is like "origin/branchname"
-                branch_short = ref.replace("origin/", "")
-
-                details[ref] = {
-                    "branch": branch_short,
-                    "full_name": ref,
-                    "commit_count": ahead,
-                    "last_commit_date": date,
-                    "commits": []  # Empty list to match get_branch_info structure
-                }
-    return details
-
-
-def get_branch_info(branch_name):
-    """Get detailed information about a branch."""
-    branch = branch_name.replace("origin/", "")
-    
-    # ⚡ Performance Optimization: Use rev-list --count instead of log --oneline
-    # This avoids fetching and parsing commit messages, which is O(N) -> O(1)
-    # Use origin/main for comparison to handle environments where local main is missing
-    result = run_command(["git", "rev-list", "--count", f"origin/main..{branch_name}"])
-    commit_count = 0
-    if result and result.returncode == 0:
-        try:
-            commit_count = int(result.stdout.strip())
-        except ValueError:
-            commit_count = 0
-    
-    # Get last commit date
-    result = run_command(["git", "log", "-1", "--format=%ci", branch_name])
-    last_commit = None
-    if result and result.returncode == 0 and result.stdout.strip():
-        last_commit = result.stdout.strip()
-    
-    return {
-        "branch": branch,
-        "full_name": branch_name,
-        "commit_count": commit_count,
-        "commits": [],  # Empty list as we don't use commit details
-        "last_commit_date": last_commit
-    }
+def branch_category(branch_name):
+    """Category stored with each cached PR/branch."""
+    return analyze_branch_name(branch_name)["category"]
 
 
 def main():
@@ -179,59 +80,64 @@ def main():
     print("=" * 80)
     print()
     
-    # Try GitHub CLI first
-    prs = get_prs_via_gh_cli()
+    cache = PRCache()
+
+    # Try GitHub CLI first; only PRs updated since the last run are fetched
+    synced = cache.sync(fetch=get_prs_via_gh_cli, categorize=branch_category)
     
-    if prs is not None:
-        print(f"Found {len(prs)} pull requests via GitHub CLI")
+    if synced is not None or cache.count_prs():
+        if synced is None:
+            print(f"GitHub CLI not available, using {cache.count_prs()} cached pull requests")
+        else:
+            print(f"Found {cache.count_prs()} pull requests ({synced} updated via GitHub CLI)")
         print()
         
         # Group by state
-        by_state = defaultdict(list)
-        for pr in prs:
-            by_state[pr.get("state", "unknown")].append(pr)
+        by_state = cache.counts_by_state()
         
         print("Pull Requests by State:")
-        for state, pr_list in sorted(by_state.items()):
-            print(f"  {state.upper()}: {len(pr_list)}")
+        for state, count in by_state.items():
+            print(f"  {state}: {count}")
         print()
         
         # Show open PRs
-        open_prs = by_state.get("OPEN", [])
+        open_prs = cache.prs(state="OPEN")
         if open_prs:
             print("=" * 80)
             print("OPEN PULL REQUESTS")
             print("=" * 80)
             for pr in open_prs:
-                print(f"\nPR #{pr.get('number', 'N/A')}: {pr.get('title', 'No title')}")
-                print(f"  Author: {pr.get('author', {}).get('login', 'Unknown')}")
-                print(f"  Branch: {pr.get('headRefName', 'N/A')} -> {pr.get('baseRefName', 'main')}")
-                print(f"  Created: {pr.get('createdAt', 'N/A')}")
-                print(f"  Updated: {pr.get('updatedAt', 'N/A')}")
-                print(f"  Draft: {'Yes' if pr.get('isDraft') else 'No'}")
-                labels = [l.get('name') for l in pr.get('labels', [])]
-                if labels:
-                    print(f"  Labels: {', '.join(labels)}")
+                print(f"\nPR #{pr['number']}: {pr['title'] or 'No title'}")
+                print(f"  Author: {pr['author'] or 'Unknown'}")
+                print(f"  Branch: {pr['head_ref'] or 'N/A'} -> {pr['base_ref'] or 'main'}")
+                print(f"  Created: {pr['created_at'] or 'N/A'}")
+                print(f"  Updated: {pr['updated_at'] or 'N/A'}")
+                print(f"  Draft: {'Yes' if pr['is_draft'] else 'No'}")
+                if pr["labels"]:
+                    print(f"  Labels: {', '.join(pr['labels'])}")
         
         # Show merged PRs
-        merged_prs = by_state.get("MERGED", [])
-        if merged_prs:
+        merged_total = by_state.get("MERGED", 0)
+        if merged_total:
             print("\n" + "=" * 80)
-            print(f"MERGED PULL REQUESTS ({len(merged_prs)} total)")
+            print(f"MERGED PULL REQUESTS ({merged_total} total)")
             print("=" * 80)
             print(f"\nShowing last 10 merged PRs:")
-            for pr in merged_prs[-10:]:
-                print(f"  PR #{pr.get('number', 'N/A')}: {pr.get('title', 'No title')}")
+            for pr in cache.prs(state="MERGED", limit=10):
+                print(f"  PR #{pr['number']}: {pr['title'] or 'No title'}")
     
     else:
         # Fallback to git branch analysis
         print("GitHub CLI not available, analyzing branches...")
         print()
         
-        branch_info = get_prs_via_git()
+        report = get_branch_report()
+        if report is not None:
+            # Only branches whose tip or base moved are rewritten
+            cache.sync_branches(report, categorize=branch_category)
         
-        open_branches = branch_info["open"]
-        merged_branches = branch_info["merged"]
+        open_branches = cache.branches(merged=False)
+        merged_branches = cache.branches(merged=True)
         
         print(f"Open branches (potential PRs): {len(open_branches)}")
         print(f"Merged branches (completed PRs): {len(merged_branches)}")
@@ -240,31 +146,22 @@ def main():
         # Categorize open branches
         categories = defaultdict(list)
         for branch in open_branches:
-            info = analyze_branch_name(branch)
-            categories[info["category"]].append((branch, info))
+            categories[branch["category"]].append(branch)
         
         print("=" * 80)
         print("OPEN BRANCHES (Potential Pull Requests)")
         print("=" * 80)
         print()
         
-        # Pre-fetch all branch details to avoid N+1 git calls
-        all_branch_details = get_all_branch_details()
-
         for category, branches in sorted(categories.items()):
             print(f"{category.upper()}: {len(branches)} branches")
-            for branch, info in branches[:10]:  # Show first 10
-                # Use pre-fetched details if available, otherwise fallback
-                branch_details = all_branch_details.get(branch)
-
-                if not branch_details:
-                    branch_details = get_branch_info(branch)
-
+            for branch in branches[:10]:  # Show first 10
+                info = analyze_branch_name(branch["name"])
                 print(f"  - {info['description']}")
-                print(f"    Branch: {branch_details['branch']}")
-                print(f"    Commits: {branch_details['commit_count']}")
-                if branch_details.get('last_commit_date'):
-                    print(f"    Last commit: {branch_details['last_commit_date']}")
+                print(f"    Branch: {branch['name'].replace('origin/', '', 1)}")
+                print(f"    Commits: {branch['ahead']}")
+                if branch["last_commit_date"]:
+                    print(f"    Last commit: {branch['last_commit_date']}")
             if len(branches) > 10:
                 print(f"    ... and {len(branches) - 10} more")
             print()
@@ -275,9 +172,11 @@ def main():
         print(f"\nTotal merged: {len(merged_branches)}")
         print("\nRecent merged branches:")
         for branch in merged_branches[:20]:
-            info = analyze_branch_name(branch)
+            info = analyze_branch_name(branch["name"])
             print(f"  - {info['description']}")
     
+    cache.close()
+    
     print("\n" + "=" * 80)
     print("REVIEW COMPLETE")
     print("=" * 80)
@@ -10,6 +10,10 @@ from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from git_batch import GitError, get_repo
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
 
@@ -40,22 +44,25 @@ def get_branch_info():
     print("=" * 80)
     print()
     
+    repo = get_repo()
+    try:
+        refs = repo.refs()
+    except GitError as e:
+        print(f"Error reading branches: {e}", file=sys.stderr)
+        refs = []
+
     # Local branches
-    result = run_git_command(["branch"])
-    local_branches = []
-    if result and result.returncode == 0:
-        local_branches = [b.strip().replace("*", "").strip() for b in result.stdout.strip().split("\n") if b.strip()]
+    local_branches = [r for r in refs if not r["remote"]]
+    if local_branches:
         print(f"📌 Local Branches: {len(local_branches)}")
         for branch in local_branches:
-            current = "*" if branch == local_branches[0] else " "
-            print(f"  {current} {branch}")
+            current = "*" if branch["is_head"] else " "
+            print(f"  {current} {branch['name']}")
     print()
-    
+
     # Remote branches
-    result = run_git_command(["branch", "-r"])
-    remote_branches = []
-    if result and result.returncode == 0:
-        remote_branches = [b.strip() for b in result.stdout.strip().split("\n") if b.strip() and "HEAD" not in b]
+    remote_branches = [r["name"] for r in refs if r["remote"]]
+    if remote_branches:
         print(f"🌐 Remote Branches: {len(remote_branches)}")
         
         # Group by prefix
@@ -73,26 +80,21 @@ def get_branch_info():
                 print(f"    ... and {len(branches) - 5} more")
     print()
     
-    # Merged branches
-    result = run_git_command(["branch", "-r", "--merged", "main"])
-    merged_branches = []
-    if result and result.returncode == 0:
-        merged_branches = [b.strip() for b in result.stdout.strip().split("\n") 
-                          if b.strip() and "origin/main" not in b and "HEAD" not in b]
-        if merged_branches:
-            print(f"✅ Merged into main: {len(merged_branches)} branches")
-            print("   (These can potentially be deleted)")
+    # Merged / unmerged remote branches, from one ahead/behind computation
+    try:
+        counts = repo.ahead_behind("main", [f"refs/remotes/{b}" for b in remote_branches if b != "origin/main"])
+    except GitError:
+        counts = {}
+    merged_branches = [ref for ref, (ahead, _) in counts.items() if ahead == 0]
+    unmerged_branches = [ref for ref, (ahead, _) in counts.items() if ahead > 0]
+    if merged_branches:
+        print(f"✅ Merged into main: {len(merged_branches)} branches")
+        print("   (These can potentially be deleted)")
     print()
     
-    # Unmerged branches
-    result = run_git_command(["branch", "-r", "--no-merged", "main"])
-    unmerged_branches = []
-    if result and result.returncode == 0:
-        unmerged_branches = [b.strip() for b in result.stdout.strip().split("\n") 
-                            if b.strip() and "origin/main" not in b and "HEAD" not in b]
-        if unmerged_branches:
-            print(f"⚠️  Not merged into main: {len(unmerged_branches)} branches")
-            print("   (These may contain unmerged changes)")
+    if unmerged_branches:
+        print(f"⚠️  Not merged into main: {len(unmerged_branches)} branches")
+        print("   (These may contain unmerged changes)")
     print()
 
 
@@ -6,19 +6,32 @@ Allows deploying to Fly.io, Render, Railway via Telegram commands
 
 import os
 import sys
-import subprocess
+import argparse
+import html
+import io
 import logging
 import asyncio
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Awaitable, Callable, Optional, Tuple
 
 try:
     from telegram import Update
+    from telegram.error import BadRequest, RetryAfter, TimedOut
     from telegram.ext import Application, CommandHandler, ContextTypes
 except ImportError:
     print("python-telegram-bot not installed. Install with: pip install python-telegram-bot")
     sys.exit(1)
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from deploy_queue import CANCELLED, DeployJob, DeployQueue
+from load_vault import DEFAULT_TELEGRAM_WEBHOOK_URL, get_telegram_token, get_telegram_webhook_url, vault
+from platform_status import StatusPoller
+
 # Setup logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -28,9 +41,6 @@ logger = logging.getLogger(__name__)
 
 # Repository root (assuming script is in scripts/ directory)
 REPO_ROOT = Path(__file__).resolve().parents[1]
-ALLOWED_USER_IDS = os.getenv('TELEGRAM_ALLOWED_USER_IDS', '').split(',')
-ALLOWED_USER_IDS = [uid.strip() for uid in ALLOWED_USER_IDS if uid.strip()]
-
 # Deployment commands mapping
 DEPLOY_COMMANDS = {
     'flyio': ['python', str(REPO_ROOT / 'scripts' / 'deploy_cloud.py'), 'flyio'],
@@ -39,17 +49,106 @@ DEPLOY_COMMANDS = {
     'docker': ['python', str(REPO_ROOT / 'scripts' / 'deploy_cloud.py'), 'docker'],
 }
 
+DEPLOY_TITLES = {
+    'flyio': "🚀 Fly.io deployment",
+    'render': "🚀 Render deployment",
+    'railway': "🚀 Railway deployment",
+    'docker': "🐳 Docker image build",
+}
+MAX_CONCURRENT_DEPLOYS = int(os.getenv('TELEGRAM_MAX_CONCURRENT_DEPLOYS', '2'))
+STATUS_INTERVAL = int(os.getenv('TELEGRAM_STATUS_INTERVAL', '300'))  # seconds
+PLATFORM_NAMES = {'flyio': 'Fly.io', 'render': 'Render', 'railway': 'Railway'}
+
+DEPLOY_TIMEOUT = 300  # seconds
+# Progress edits are throttled to stay well inside Telegram's per-chat limits
+EDIT_INTERVAL = 2.0  # seconds
+EDIT_EVERY_LINES = 20
+MIN_EDIT_GAP = 1.0  # seconds; caps edits on very fast output
+TAIL_LINES = 15  # lines shown in the progress message
+MAX_LINE_CHARS = 300  # longer lines are cut in the progress message (the log keeps them)
+MESSAGE_LIMIT = 4096
+DOCUMENT_LIMIT = 50 * 1024 * 1024  # Bot API upload limit
+LOG_TAIL_BYTES = 1024 * 1024  # sent instead of a log over the upload limit
+
 
 def check_authorized(user_id: int) -> bool:
-    """Check if user is authorized to use deployment commands"""
-    if not ALLOWED_USER_IDS:
-        logger.warning("No ALLOWED_USER_IDS set - DENYING all users. Set TELEGRAM_ALLOWED_USER_IDS to enable access.")
+    """Check if user is authorized to use deployment commands
+
+    Allowed IDs come from TELEGRAM_ALLOWED_USER_IDS or telegram_bot.allowed_user_ids
+    in the vault, looked up on every check so revoking a user needs no restart
+    (the vault is cached in memory and re-read only when the file changes).
+    """
+    allowed_user_ids = [str(uid) for uid in vault.get_list('telegram_bot.allowed_user_ids')]
+    if not allowed_user_ids:
+        logger.warning("No allowed user IDs set - DENYING all users. Set TELEGRAM_ALLOWED_USER_IDS "
+                       "(or telegram_bot.allowed_user_ids in config/vault.json) to enable access.")
         return False
-    return str(user_id) in ALLOWED_USER_IDS
+    return str(user_id) in allowed_user_ids
 
 
-async def run_deployment(platform: str) -> Tuple[bool, str]:
-    """Run deployment command and capture output"""
+class ProgressMessage:
+    """
+    Keeps one Telegram message updated with the tail of a growing log.
+
+    Only the last TAIL_LINES lines are held in memory. The message is edited
+    every EDIT_INTERVAL seconds or EDIT_EVERY_LINES lines, but never more
+    often than MIN_EDIT_GAP or during a flood wait.
+    """
+
+    def __init__(self, message, header: str, clock=time.monotonic):
+        self.message = message
+        self.header = header
+        self.clock = clock
+        self.tail = deque(maxlen=TAIL_LINES)
+        self.lines = 0
+        self.pending = 0
+        self.last_edit = clock()
+        self.blocked_until = 0.0
+
+    def render(self, footer: str = "") -> str:
+        body = "\n".join(self.tail)
+        text = f"{self.header}\n\n{body}" if body else self.header
+        if footer:
+            text += f"\n\n{footer}"
+        if len(text) > MESSAGE_LIMIT:
+            text = text[:100] + "\n…\n" + text[-(MESSAGE_LIMIT - 110):]
+        return text
+
+    async def add_line(self, line: str):
+        self.tail.append(line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS] + "…")
+        self.lines += 1
+        self.pending += 1
+        now = self.clock()
+        if now < self.blocked_until:
+            return
+        elapsed = now - self.last_edit
+        if elapsed >= EDIT_INTERVAL or (self.pending >= EDIT_EVERY_LINES and elapsed >= MIN_EDIT_GAP):
+            await self.edit(f"⏳ {self.lines} lines so far...")
+
+    async def edit(self, footer: str = ""):
+        self.pending = 0
+        self.last_edit = self.clock()
+        try:
+            await self.message.edit_text(self.render(footer))
+        except RetryAfter as e:
+            # Drop this update and stay quiet until the flood wait is over
+            retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else e.retry_after
+            self.blocked_until = self.clock() + retry_after
+        except (BadRequest, TimedOut) as e:
+            # "Message is not modified" and transient network errors are harmless here
+            logger.debug(f"Progress edit skipped: {e}")
+
+
+async def run_deployment(
+    platform: str,
+    log: Optional[BinaryIO] = None,
+    on_line: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> Tuple[bool, str]:
+    """
+    Run a deployment, streaming its combined stdout/stderr. The raw output is
+    written to `log` and each decoded line is passed to `on_line` as it
+    arrives; nothing but the current partial line is kept in memory.
+    """
     if platform not in DEPLOY_COMMANDS:
         return False, f"Unknown platform: {platform}"
     
@@ -60,29 +159,126 @@ async def run_deployment(platform: str) -> Tuple[bool, str]:
             *cmd,
             cwd=REPO_ROOT,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.STDOUT
         )
 
-        try:
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=300)
-
-            output = stdout.decode('utf-8', errors='replace') + stderr.decode('utf-8', errors='replace')
+        async def pump():
+            partial = b""
+            while True:
+                chunk = await process.stdout.read(65536)
+                if not chunk:
+                    break
+                if log is not None:
+                    log.write(chunk)
+                lines = (partial + chunk).split(b"\n")
+                # Bound a runaway line without newlines (e.g. progress bars using \r)
+                partial = lines.pop()[-65536:]
+                if on_line:
+                    for line in lines:
+                        await on_line(line.decode('utf-8', errors='replace').rstrip("\r"))
+            if partial and on_line:
+                await on_line(partial.decode('utf-8', errors='replace').rstrip("\r"))
+            return await process.wait()
 
-            if process.returncode == 0:
-                return True, f"✅ Deployment to {platform} successful!\n\n{output[:1000]}"
+        try:
+            returncode = await asyncio.wait_for(pump(), timeout=DEPLOY_TIMEOUT)
+            if returncode == 0:
+                return True, f"✅ Deployment to {platform} successful!"
             else:
-                return False, f"❌ Deployment to {platform} failed:\n\n{output[:1000]}"
+                return False, f"❌ Deployment to {platform} failed (exit code {returncode})"
         except asyncio.TimeoutError:
             try:
                 process.kill()
                 await process.wait()
             except Exception:
                 pass
-            return False, f"⏱️ Deployment to {platform} timed out after 5 minutes"
+            return False, f"⏱️ Deployment to {platform} timed out after {DEPLOY_TIMEOUT // 60} minutes"
+        except asyncio.CancelledError:
+            # /cancel: do not leave the deploy running without anyone watching it
+            try:
+                process.kill()
+                await process.wait()
+            except Exception:
+                pass
+            raise
     except Exception as e:
         return False, f"❌ Error running deployment: {str(e)}"
 
 
+async def send_deploy_log(message, log, platform: str, summary: str):
+    """
+    Reply with the deploy log attached (only its tail when over the upload
+    limit). An upload failure falls back to the summary alone, so it never
+    turns a finished deploy into a crashed job.
+    """
+    size = log.tell()
+    if not size:
+        await message.reply_text(summary)
+        return
+    filename = f"deploy_{platform}_{datetime.now():%Y%m%d_%H%M%S}.log"
+    caption = summary
+    if size > DOCUMENT_LIMIT:
+        log.seek(size - LOG_TAIL_BYTES)
+        document = io.BytesIO(log.read())
+        filename = filename.replace(".log", "_tail.log")
+        caption = f"{summary}\n(last {LOG_TAIL_BYTES // 1024} KB of a {size // (1024 * 1024)} MB log)"
+    else:
+        log.seek(0)
+        document = log
+    try:
+        await message.reply_document(document=document, filename=filename, caption=caption)
+    except Exception as e:
+        logger.warning(f"Could not attach deploy log: {e}")
+        try:
+            await message.reply_text(f"{summary}\n⚠️ The deployment log could not be attached.")
+        except Exception as e:
+            logger.warning(f"Could not send deploy summary: {e}")
+
+
+async def deploy_with_progress(update: Update, platform: str, title: str) -> Tuple[bool, str]:
+    """Run a deployment with a live progress message, then attach the full log."""
+    message = await update.message.reply_text(f"{title}\n⏳ This may take a few minutes...")
+    progress = ProgressMessage(message, title)
+    
+    # The full log goes to a temporary file, not memory, so verbose builds stay cheap
+    with tempfile.TemporaryFile() as log:
+        try:
+            success, summary = await run_deployment(platform, log=log, on_line=progress.add_line)
+        except asyncio.CancelledError:
+            await progress.edit("🛑 Cancelled")
+            raise
+        await progress.edit(summary)
+        await send_deploy_log(update.message, log, platform, summary)
+    return success, summary
+
+
+async def run_job(job: DeployJob) -> Tuple[bool, str]:
+    """DeployQueue runner: report progress to the chat that started the job."""
+    return await deploy_with_progress(job.context, job.platform, f"{DEPLOY_TITLES[job.platform]} (job #{job.id})")
+
+
+deploy_queue = DeployQueue(run_job, max_concurrent=MAX_CONCURRENT_DEPLOYS)
+status_poller = StatusPoller(interval=STATUS_INTERVAL)
+
+
+async def enqueue_deploy(update: Update, platform: str):
+    """Queue a deployment without blocking the handler; duplicates join the queued job."""
+    async def notify(job: DeployJob):
+        # The requester who started the job already got the progress message and log
+        if job.context is update and job.state != CANCELLED:
+            return
+        await update.message.reply_text(job.summary)
+    
+    job, created = deploy_queue.submit(platform, context=update, on_finish=notify)
+    if created:
+        await update.message.reply_text(f"📋 Job #{job.id} queued: {platform}\nUse /cancel {job.id} to stop it, /jobs to list jobs.")
+    else:
+        await update.message.reply_text(
+            f"🔁 A {platform} deployment is already queued as job #{job.id}; "
+            f"you will be notified when it finishes."
+        )
+
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command"""
     user_id = update.effective_user.id
@@ -101,7 +297,9 @@ Available commands:
 /deploy_docker - Build Docker image
 /deploy_exness - Deploy to Exness MT5
 /deploy_dashboard - Deploy web dashboard
-/status - Check deployment status
+/status [--refresh] - Check platform status
+/jobs - List queued and running deployments
+/cancel &lt;id&gt; - Cancel a deployment job
 /help - Show this help message
 
 Made for MQL5 Trading Automation
@@ -117,10 +315,7 @@ async def deploy_flyio(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ You are not authorized to use this bot.")
         return
     
-    await update.message.reply_text("🚀 Starting Fly.io deployment...\n⏳ This may take a few minutes...")
-    
-    success, message = await run_deployment('flyio')
-    await update.message.reply_text(message)
+    await enqueue_deploy(update, 'flyio')
 
 
 async def deploy_render(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -131,10 +326,7 @@ async def deploy_render(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ You are not authorized to use this bot.")
         return
     
-    await update.message.reply_text("🚀 Starting Render deployment...\n⏳ This may take a few minutes...")
-    
-    success, message = await run_deployment('render')
-    await update.message.reply_text(message)
+    await enqueue_deploy(update, 'render')
 
 
 async def deploy_railway(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -145,10 +337,7 @@ async def deploy_railway(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ You are not authorized to use this bot.")
         return
     
-    await update.message.reply_text("🚀 Starting Railway deployment...\n⏳ This may take a few minutes...")
-    
-    success, message = await run_deployment('railway')
-    await update.message.reply_text(message)
+    await enqueue_deploy(update, 'railway')
 
 
 async def deploy_docker(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -159,37 +348,83 @@ async def deploy_docker(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ You are not authorized to use this bot.")
         return
     
-    await update.message.reply_text("🐳 Building Docker image...\n⏳ This may take a few minutes...")
+    await enqueue_deploy(update, 'docker')
+
+
+async def jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /jobs command - List deployment jobs"""
+    user_id = update.effective_user.id
+    
+    if not check_authorized(user_id):
+        await update.message.reply_text("❌ You are not authorized to use this bot.")
+        return
+    
+    active = deploy_queue.active()
+    recent = deploy_queue.recent()[:5]
+    if not active and not recent:
+        await update.message.reply_text("📋 No deployment jobs yet.")
+        return
     
-    success, message = await run_deployment('docker')
-    await update.message.reply_text(message)
+    lines = ["📋 Deployment jobs"]
+    if active:
+        lines.append("\nActive:")
+        lines.extend(f"  {job.describe()}" for job in active)
+    if recent:
+        lines.append("\nRecent:")
+        lines.extend(f"  {job.describe()}" for job in recent)
+    await update.message.reply_text("\n".join(lines))
+
+
+async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /cancel command - Cancel a deployment job"""
+    user_id = update.effective_user.id
+    
+    if not check_authorized(user_id):
+        await update.message.reply_text("❌ You are not authorized to use this bot.")
+        return
+    
+    if not context.args or not context.args[0].lstrip('#').isdigit():
+        await update.message.reply_text("Usage: /cancel <job id> (see /jobs)")
+        return
+    
+    job_id = int(context.args[0].lstrip('#'))
+    job = deploy_queue.cancel(job_id)
+    if job:
+        await update.message.reply_text(f"🛑 Cancelling job #{job.id} ({job.platform})...")
+    else:
+        await update.message.reply_text(f"❌ Job #{job_id} is not queued or running.")
+
+
+def format_status(statuses) -> str:
+    """HTML message for cached platform statuses."""
+    parts = ["📊 <b>Platform Status</b>"]
+    for platform, st in statuses.items():
+        icon = "✅" if st.ok else "❌"
+        parts.append(
+            f"\n{icon} <b>{PLATFORM_NAMES.get(platform, platform)}</b> "
+            f"(checked {int(st.age())}s ago)\n<code>{html.escape(st.output)}</code>"
+        )
+    return "\n".join(parts)
 
 
 async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /status command - Check Fly.io app status"""
+    """Handle /status command - Platform status from the background poller"""
     user_id = update.effective_user.id
     
     if not check_authorized(user_id):
         await update.message.reply_text("❌ You are not authorized to use this bot.")
         return
     
-    try:
-        result = subprocess.run(
-            ['flyctl', 'status'],
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            await update.message.reply_text(f"📊 <b>Fly.io Status:</b>\n\n<code>{result.stdout}</code>", parse_mode='HTML')
-        else:
-            await update.message.reply_text(f"❌ Status check failed:\n\n{result.stderr}")
-    except FileNotFoundError:
-        await update.message.reply_text("❌ flyctl not found. Is Fly CLI installed?")
-    except Exception as e:
-        await update.message.reply_text(f"❌ Error checking status: {str(e)}")
+    args = [a.lower() for a in (context.args or [])]
+    refresh = any(a in ("--refresh", "refresh") for a in args)
+    platforms = [a for a in args if a in PLATFORM_NAMES] or list(PLATFORM_NAMES)
+    
+    statuses = status_poller.get(platforms)
+    if refresh or len(statuses) < len(platforms):
+        await update.message.reply_text("🔄 Checking platform status...")
+        statuses = await status_poller.refresh(platforms)
+    
+    await update.message.reply_text(format_status(statuses), parse_mode='HTML')
 
 
 async def deploy_exness(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -261,7 +496,9 @@ async def help_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 /deploy_docker - Build Docker image locally
 /deploy_exness - Deploy to Exness MT5 (Desktop only)
 /deploy_dashboard [platform] - Deploy web dashboard (flyio/render/github/local/all)
-/status - Check Fly.io app deployment status
+/status [platform] [--refresh] - Fly.io/Render/Railway status (cached; --refresh polls now)
+/jobs - List queued, running and recent deployment jobs
+/cancel &lt;id&gt; - Cancel a queued or running deployment job
 /help - Show this help message
 
 <b>Note:</b> Deployments may take several minutes. Be patient!
@@ -269,28 +506,23 @@ async def help_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(help_text, parse_mode='HTML')
 
 
-def main():
-    """Main function to start the bot"""
-    bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
+def build_application(bot_token: str, base_url: Optional[str] = None) -> Application:
+    """Create the bot Application with all command handlers registered."""
+    async def start_background_tasks(app: Application):
+        status_poller.start()
     
-    # Try to load from vault if not in environment
-    if not bot_token:
-        try:
-            from load_vault import get_telegram_token
-            bot_token = get_telegram_token()
-        except ImportError:
-            pass
+    async def stop_background_tasks(app: Application):
+        await status_poller.stop()
     
-    if not bot_token:
-        logger.error("TELEGRAM_BOT_TOKEN environment variable not set!")
-        logger.info("Get a token from @BotFather on Telegram")
-        logger.info("Save it in config/vault.json or set: export TELEGRAM_BOT_TOKEN=your_token_here")
-        return
-    
-    logger.info("Starting Telegram Deployment Bot...")
-    
-    # Create application
-    application = Application.builder().token(bot_token).build()
+    builder = (
+        Application.builder()
+        .token(bot_token)
+        .post_init(start_background_tasks)
+        .post_shutdown(stop_background_tasks)
+    )
+    if base_url:
+        builder = builder.base_url(base_url)
+    application = builder.build()
     
     # Register command handlers
     application.add_handler(CommandHandler("start", start))
@@ -302,6 +534,55 @@ def main():
     application.add_handler(CommandHandler("deploy_exness", deploy_exness))
     application.add_handler(CommandHandler("deploy_dashboard", deploy_dashboard))
     application.add_handler(CommandHandler("status", status))
+    application.add_handler(CommandHandler("jobs", jobs))
+    application.add_handler(CommandHandler("cancel", cancel))
+    return application
+
+
+def get_webhook_url() -> Optional[str]:
+    """Webhook URL from TELEGRAM_WEBHOOK_URL or the vault (the vault's placeholder default does not count)."""
+    url = get_telegram_webhook_url()
+    return url if url and url != DEFAULT_TELEGRAM_WEBHOOK_URL else None
+
+
+def main():
+    """Main function to start the bot"""
+    parser = argparse.ArgumentParser(description="Telegram deployment bot")
+    parser.add_argument('--mode', choices=['auto', 'polling', 'webhook'], default='auto',
+                        help="auto: webhook when a webhook URL is configured, otherwise long polling")
+    parser.add_argument('--listen', default=os.getenv('TELEGRAM_WEBHOOK_LISTEN', '0.0.0.0'), help="Webhook server address")
+    parser.add_argument('--port', type=int, default=int(os.getenv('TELEGRAM_WEBHOOK_PORT') or os.getenv('PORT') or 8443),
+                        help="Webhook server port")
+    args = parser.parse_args()
+    
+    # TELEGRAM_BOT_TOKEN, or the token from the vault
+    bot_token = get_telegram_token()
+    
+    if not bot_token:
+        logger.error("TELEGRAM_BOT_TOKEN environment variable not set!")
+        logger.info("Get a token from @BotFather on Telegram")
+        logger.info("Save it in config/vault.json or set: export TELEGRAM_BOT_TOKEN=your_token_here")
+        return
+    
+    webhook_url = get_webhook_url() if args.mode != 'polling' else None
+    if args.mode == 'webhook' and not webhook_url:
+        logger.error("Webhook mode needs TELEGRAM_WEBHOOK_URL or telegram_bot.webhook_url in config/vault.json")
+        return
+    
+    logger.info("Starting Telegram Deployment Bot...")
+    application = build_application(bot_token)
+    
+    if webhook_url:
+        from telegram_webhook import run_webhook
+        logger.info(f"Bot is running in webhook mode on port {args.port}. Press Ctrl+C to stop.")
+        asyncio.run(run_webhook(
+            application,
+            webhook_url,
+            host=args.listen,
+            port=args.port,
+            secret_token=os.getenv('TELEGRAM_WEBHOOK_SECRET'),
+        ))
+        return
     
     # Start the bot
     logger.info("Bot is running. Press Ctrl+C to stop.")
@@ -0,0 +1,187 @@
+"""
+Webhook serving mode for the Telegram bots.
+
+A small asyncio HTTP server that receives updates pushed by Telegram and
+feeds them into a python-telegram-bot Application, instead of holding a
+long-polling connection open:
+
+- only POSTs to the webhook path are accepted
+- the X-Telegram-Bot-Api-Secret-Token header must match the secret passed
+  to setWebhook (constant-time comparison)
+- update_ids seen recently are dropped, so Telegram's redeliveries do not run
+  a command twice
+- updates are queued and acknowledged immediately; handlers run afterwards
+
+No extra dependency is needed (python-telegram-bot's own webhook support
+requires tornado).
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import secrets
+import signal
+from collections import deque
+from typing import Optional
+from urllib.parse import urlsplit
+
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 1024 * 1024
+READ_TIMEOUT = 30  # seconds
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class RecentIds:
+    """Bounded set of recently seen update IDs."""
+
+    def __init__(self, size: int = 1024):
+        self._order = deque(maxlen=size)
+        self._seen = set()
+
+    def add(self, update_id) -> bool:
+        """Record update_id; False if it was already seen."""
+        if update_id in self._seen:
+            return False
+        if len(self._order) == self._order.maxlen:
+            self._seen.discard(self._order[0])
+        self._order.append(update_id)
+        self._seen.add(update_id)
+        return True
+
+
+class WebhookServer:
+    def __init__(self, application, path: str, secret_token: str, host: str = "0.0.0.0", port: int = 8443):
+        self.application = application
+        self.path = path or "/"
+        self.secret_token = secret_token
+        self.host = host
+        self.port = port
+        self.recent = RecentIds()
+        self.received = 0
+        self.duplicates = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Webhook server listening on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            # Telegram keeps connections alive, so serve requests until it closes
+            while True:
+                request = await asyncio.wait_for(self._read_request(reader), timeout=READ_TIMEOUT)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status = await self.handle_request(method, path, headers, body) if body is not None else 413
+                payload = REASONS[status].encode("ascii")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: text/plain\r\nContent-Length: {len(payload)}\r\n\r\n".encode("ascii") + payload
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close" or body is None:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """(method, path, headers, body) or None at EOF; body is None when too large."""
+        line = await reader.readline()
+        if not line:
+            return None
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+            if len(headers) > 100:
+                raise ValueError("too many headers")
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            return method, target, headers, None
+        body = await reader.readexactly(length) if length else b""
+        return method, target, headers, body
+
+    async def handle_request(self, method: str, path: str, headers: dict, body: bytes) -> int:
+        """Validate one webhook request and queue its update. Returns the HTTP status."""
+        if urlsplit(path).path != self.path:
+            return 404
+        if method != "POST":
+            return 405
+        if not hmac.compare_digest(headers.get(SECRET_HEADER, "").encode(), self.secret_token.encode()):
+            logger.warning("Webhook request with a missing or wrong secret token rejected")
+            return 403
+        try:
+            data = json.loads(body)
+            update_id = data["update_id"]
+        except (ValueError, KeyError, TypeError):
+            return 400
+
+        self.received += 1
+        if not self.recent.add(update_id):
+            self.duplicates += 1
+            return 200  # already queued; acknowledge so Telegram stops resending
+
+        update = Update.de_json(data, self.application.bot)
+        await self.application.update_queue.put(update)
+        return 200
+
+
+def webhook_secret(configured: Optional[str] = None) -> str:
+    """The configured secret, or a fresh random one (registered again on every start)."""
+    return configured or secrets.token_urlsafe(32)
+
+
+async def run_webhook(application, webhook_url: str, host: str = "0.0.0.0", port: int = 8443,
+                      secret_token: Optional[str] = None, stop: Optional[asyncio.Event] = None):
+    """
+    Register `webhook_url` with Telegram and serve updates until `stop` is set
+    (or SIGINT/SIGTERM). The local path is the path of the webhook URL; a
+    reverse proxy or the platform's router terminates TLS in front of it.
+    """
+    secret_token = webhook_secret(secret_token)
+    stop = stop or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows, or not the main thread
+
+    server = WebhookServer(application, urlsplit(webhook_url).path, secret_token, host, port)
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    try:
+        await application.bot.set_webhook(url=webhook_url, secret_token=secret_token, allowed_updates=Update.ALL_TYPES)
+        await application.start()
+        await server.start()
+        logger.info(f"Webhook registered: {webhook_url}")
+        await stop.wait()
+    finally:
+        await server.stop()
+        if application.running:
+            await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for analyze_pr_optimizations.py against a throwaway origin with PR refs
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import analyze_pr_optimizations as analyze
+
+EA_PATH = analyze.EA_FILE.relative_to(analyze.REPO_ROOT)
+
+BASE_EA = """
+void OnTick()
+  {
+   MqlRates rates[];
+   CopyRates(_Symbol, _Period, 0, 2, rates);
+  }
+"""
+
+GUARDED_EA = """
+datetime g_lastBarTime = 0;
+void OnTick()
+  {
+   datetime t = iTime(_Symbol, _Period, 0);
+   if(t == g_lastBarTime) return;
+   g_lastBarTime = t;
+   MqlRates rates[];
+   CopyRates(_Symbol, _Period, 0, 2, rates);
+  }
+"""
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+def commit_ea(repo, content, message):
+    path = Path(repo) / EA_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    git(repo, "add", str(EA_PATH))
+    git(repo, "commit", "-q", "-m", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+def make_origin(tmp):
+    """A bare origin whose refs/pull/<n>/head point at two PR commits, plus a clone without them."""
+    author, origin, clone = tmp / "author", tmp / "origin.git", tmp / "clone"
+    git(tmp, "init", "-q", "--bare", "-b", "main", str(origin))
+    git(tmp, "clone", "-q", str(origin), str(author))
+    git(author, "checkout", "-q", "-b", "main")
+    commit_ea(author, BASE_EA, "base")
+    git(author, "push", "-q", "origin", "main")
+    git(tmp, "clone", "-q", str(origin), str(clone))
+
+    heads = {}
+    for number, content in ((7, GUARDED_EA), (8, BASE_EA + "// comment only\n")):
+        git(author, "checkout", "-q", "-B", f"pr{number}", "main")
+        heads[number] = commit_ea(author, content, f"PR {number}")
+        git(author, "push", "-q", "origin", f"HEAD:refs/pull/{number}/head")
+    return clone, heads
+
+
+def test_batched_fetch_and_pool_analysis():
+    """PR heads come from one ls-remote + fetch by commit id and are analyzed in a process pool."""
+    print("Testing batched PR fetch and analysis...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clone, heads = make_origin(Path(tmp))
+
+        assert analyze.list_pr_heads([7, 8, 99], root=clone) == heads
+        assert analyze.fetch_prs([7, 8, 99], root=clone) == heads
+        # Fetched by commit id only: no branches or tags appear in the clone
+        assert git(clone, "for-each-ref", "--format=%(refname)") == "refs/heads/main\nrefs/remotes/origin/HEAD\nrefs/remotes/origin/main"
+
+        results = dict(analyze.analyze_prs([7, 8, 99], base="main", jobs=2, root=clone))
+        assert set(results) == {7, 8, 99} and results[99] is None
+
+        guarded = results[7]
+        assert guarded["head"] == heads[7]
+        assert guarded["analysis"]["new_bar_check"] or guarded["analysis"]["early_exit"]
+        # The base copies on every tick; the PR fixes both findings
+        assert (guarded["analysis"]["hot_path_findings"], guarded["analysis"]["hot_path_delta"]) == (0, -2)
+        assert results[8]["analysis"]["hot_path_delta"] == 0
+        assert results[8]["diff"].startswith(f"--- a/{EA_PATH.as_posix()}")
+
+    print("✓ Batched PR fetch and analysis OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing PR Optimization Analysis")
+    print("=" * 60)
+
+    try:
+        test_batched_fetch_and_pool_analysis()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for benchmark_git.py synthetic repositories and statistics
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import benchmark_git
+
+
+def test_synthetic_repo_shape():
+    """Generated refs match the parameters and all strategies agree on them."""
+    print("Testing synthetic repository...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = benchmark_git.make_synthetic_repo(Path(tmp) / "repo", branches=40, commits=30, prs=10, merged_fraction=0.5)
+
+        branches = benchmark_git._remote_branches(repo)
+        unmerged = benchmark_git._remote_branches(repo, "--no-merged", benchmark_git.BASE)
+        assert len(branches) == 40
+        assert 0 < len(unmerged) < 40
+        assert len(benchmark_git._pr_refs(repo)) == 10
+
+        assert benchmark_git.per_branch_rev_list(repo) == 40
+        assert benchmark_git.no_merged_rev_list(repo) == len(unmerged)
+        assert benchmark_git.git_batch_branches(repo) == 40
+        assert benchmark_git.per_pr_merge_base_diff(repo) == benchmark_git.git_batch_prs(repo) == 10
+
+        result = benchmark_git.measure(benchmark_git.git_batch_prs, repo, iterations=3, warmup=1)
+        assert result["runs"] == 3 and result["items"] == 10
+
+    print("✓ Synthetic repository OK")
+
+
+def test_summarize_and_history():
+    """Median/IQR use inclusive quartiles; history lookups match on parameters."""
+    print("Testing statistics and history...")
+
+    stats = benchmark_git.summarize([0.005, 0.001, 0.002, 0.003, 0.004])
+    assert stats == {"runs": 5, "median_ms": 3.0, "iqr_ms": 2.0, "min_ms": 1.0, "max_ms": 5.0}, stats
+    assert benchmark_git.summarize([0.25])["iqr_ms"] == 0.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "history.jsonl"
+        benchmark_git.append_history(path, {"params": {"branches": 10}, "results": {}, "timestamp": "a"})
+        benchmark_git.append_history(path, {"params": {"branches": 20}, "results": {}, "timestamp": "b"})
+        benchmark_git.append_history(path, {"params": {"branches": 10}, "results": {}, "timestamp": "c"})
+        history = benchmark_git.load_history(path)
+        assert benchmark_git.previous_run(history, {"branches": 10})["timestamp"] == "c"
+        assert benchmark_git.previous_run(history, {"branches": 30}) is None
+
+    print("✓ Statistics and history OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Git Benchmark Harness")
+    print("=" * 60)
+
+    try:
+        test_synthetic_repo_shape()
+        test_summarize_and_history()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the service worker precache manifest builder in build_sw_precache.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import build_sw_precache as precache
+
+SERVICE_WORKER = f"""const CACHE_NAME = 'app';
+{precache.MARKER_START}
+const PRECACHE_VERSION = 'old';
+const PRECACHE_ASSETS = [];
+{precache.MARKER_END}
+self.addEventListener('install', () => {{}});
+"""
+
+
+def make_site(root: Path):
+    (root / "icons").mkdir()
+    (root / "index.html").write_text("<html>home</html>\n", encoding="utf-8")
+    (root / "manifest.json").write_text("{}\n", encoding="utf-8")
+    (root / "icons" / "icon.svg").write_text("<svg/>\n", encoding="utf-8")
+    (root / "notes.md").write_text("not deployed\n", encoding="utf-8")
+    sw = root / "service-worker.js"
+    sw.write_text(SERVICE_WORKER, encoding="utf-8")
+    return sw
+
+
+def test_write_and_read_back():
+    """The generated block round-trips, and rewriting an up-to-date file is a no-op."""
+    print("Testing precache list generation...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        sw = make_site(root)
+        entries = precache.build_manifest(root)
+        assert [e["url"] for e in entries] == ["/", "/icons/icon.svg", "/index.html", "/manifest.json"], entries
+        assert entries[0]["revision"] == entries[2]["revision"]  # "/" is served by index.html
+
+        assert precache.write_service_worker(entries, sw) is True
+        written = sw.read_text(encoding="utf-8")
+        assert written.startswith("const CACHE_NAME = 'app';\n")
+        assert written.endswith("self.addEventListener('install', () => {});\n")
+        assert f"const PRECACHE_VERSION = '{precache.manifest_version(entries)}';" in written
+        assert precache.read_precache_list(sw) == entries
+
+        # Idempotent: same entries, same bytes, no write
+        mtime = sw.stat().st_mtime_ns
+        assert precache.write_service_worker(precache.build_manifest(root), sw) is False
+        assert sw.read_text(encoding="utf-8") == written and sw.stat().st_mtime_ns == mtime
+
+        # No generated block: nothing to read, and refuse to write
+        sw.write_text("self.addEventListener('fetch', () => {});\n", encoding="utf-8")
+        assert precache.read_precache_list(sw) is None
+        assert precache.read_precache_list(root / "missing.js") is None
+        try:
+            precache.write_service_worker(entries, sw)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("write_service_worker accepted a file without markers")
+
+    print("✓ Precache list generation OK")
+
+
+def test_stale_list_is_detected():
+    """Edited, added and removed assets all show up in the diff."""
+    print("Testing stale precache detection...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        sw = make_site(root)
+        precache.write_service_worker(precache.build_manifest(root), sw)
+        assert precache.diff_manifest(precache.read_precache_list(sw), precache.build_manifest(root)) == []
+
+        old = {e["url"]: e["revision"] for e in precache.read_precache_list(sw)}
+        (root / "manifest.json").write_text('{"name": "app"}\n', encoding="utf-8")
+        (root / "offline.html").write_text("<html>offline</html>\n", encoding="utf-8")
+        (root / "icons" / "icon.svg").unlink()
+        expected = precache.build_manifest(root)
+        new = {e["url"]: e["revision"] for e in expected}
+
+        assert precache.diff_manifest(precache.read_precache_list(sw), expected) == [
+            "missing from precache list: /offline.html",
+            "listed but not on disk: /icons/icon.svg",
+            f"stale revision for /manifest.json: {old['/manifest.json']} (file is {new['/manifest.json']})",
+        ]
+
+        # Regenerating fixes it and changes the version
+        assert precache.write_service_worker(expected, sw) is True
+        assert precache.diff_manifest(precache.read_precache_list(sw), precache.build_manifest(root)) == []
+        assert precache.manifest_version(expected) != precache.manifest_version(
+            [{"url": url, "revision": rev} for url, rev in sorted(old.items())]
+        )
+
+    print("✓ Stale precache detection OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Service Worker Precache Builder")
+    print("=" * 60)
+
+    try:
+        test_write_and_read_back()
+        test_stale_list_is_detected()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
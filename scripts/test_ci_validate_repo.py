@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Tests for ci_validate_repo.py secret scanning and validation modes
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import ci_validate_repo as validator
+
+
+# Assembled at runtime so this file doesn't trip the scanner itself
+FAKE_PAT = "ghp" + "_" + "a1b2c3d4e5" * 4
+FAKE_AWS = "AKI" + "A" + "ABCDEFGHIJKLMNOP"
+FAKE_TG = "123456789" + ":" + "AAbbCCddEEffGGhhIIjjKKll"
+
+
+def test_scan_bytes_reports_line_numbers_once_per_line():
+    """Each hit is reported with its line number, one finding per line."""
+    print("Testing single-pass secret scanner...")
+
+    data = (
+        "line one\n"
+        f"token = '{FAKE_TG}' and '{FAKE_PAT}'\n"
+        "\n"
+        f"aws = {FAKE_AWS}\n"
+    ).encode("utf-8")
+
+    findings = validator.scan_bytes(data)
+    assert findings == [("telegram_bot_token", 2), ("aws_access_key_id", 4)], findings
+    assert validator.scan_bytes(b"no credentials here\nport: 8080\n") == []
+
+    print("✓ Secret scanner OK")
+
+
+def test_validate_blobs_flags_nul_and_secrets():
+    """Blob validation applies the same checks as the working-tree scan."""
+    print("Testing blob validation...")
+
+    ok = [("mt5/MQL5/Experts/A.mq5", b"int OnInit(){return 0;}\n"), ("docs/x.md", b"# Doc\n")]
+    assert validator.validate_blobs(ok) == 2
+
+    for blobs in (
+        [("mt5/MQL5/Experts/A.mq5", b"int\x00x;")],
+        [("scripts/x.py", f"T = '{FAKE_PAT}'\n".encode("utf-8"))],
+    ):
+        try:
+            validator.validate_blobs(blobs)
+        except SystemExit as e:
+            assert e.code == 1
+        else:
+            raise AssertionError(f"validate_blobs accepted {blobs[0][0]}")
+
+    print("✓ Blob validation OK")
+
+
+def test_split_range():
+    """Revision ranges resolve to the commit whose blobs are checked."""
+    print("Testing revision range parsing...")
+
+    assert validator.split_range("origin/main..feature") == ("origin/main", "feature")
+    assert validator.split_range("origin/main...HEAD") == ("origin/main", "HEAD")
+    assert validator.split_range("origin/main...") == ("origin/main", "HEAD")
+    assert validator.split_range("origin/main") == ("origin/main", "HEAD")
+
+    print("✓ Revision range parsing OK")
+
+
+OLD_NS = 1_600_000_000 * 10**9  # long before any cache entry is written
+
+
+def make_tree(root: Path, files: dict, mtime_ns: int = OLD_NS):
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class CheckRecorder:
+    """Wraps run_checks to record which files each validate_repo run re-read."""
+
+    def __init__(self):
+        self.runs = []
+        self.wrapped = validator.run_checks
+
+    def __call__(self, tasks, jobs):
+        results = self.wrapped(tasks, jobs)
+        self.runs.append({task[1]: "unchanged" if results[task[1]].get("unchanged") else "checked" for task in tasks})
+        return results
+
+
+def test_walk_repo_prunes_excluded_dirs():
+    """Excluded directories are skipped without being listed at all."""
+    print("Testing pruned tree walk...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root, {
+            "a.txt": "a", "sub/b.md": "b", ".git/config": "x",
+            "node_modules/pkg/index.js": "x", "sub/__pycache__/m.pyc": "x", "logs/run.log": "x",
+        })
+        listed = []
+        real_scandir = os.scandir
+
+        def scandir(path):
+            listed.append(Path(path).relative_to(root).as_posix())
+            return real_scandir(path)
+
+        validator.os.scandir = scandir
+        try:
+            found = validator.walk_repo(root)
+        finally:
+            validator.os.scandir = real_scandir
+
+        assert sorted(rel for rel, _, _ in found) == ["a.txt", "sub/b.md"], found
+        assert sorted(listed) == [".", "sub"], listed
+        assert dict((rel, size) for rel, size, _ in found)["sub/b.md"] == 1
+
+    print("✓ Pruned tree walk OK")
+
+
+def test_result_cache():
+    """Unchanged files are served from the cache; racy, resized and touched files are re-read."""
+    print("Testing result cache...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        cache_path = root / ".cache" / "ci.json"
+        make_tree(root, {"mt5/MQL5/Experts/A.mq5": "int OnInit(){return 0;}\n", "docs/a.md": "# A\n", "docs/b.md": "# B\n"})
+        racy_ns = time.time_ns()  # modified "just now"
+        make_tree(root, {"docs/new.md": "x" * len(FAKE_PAT) + "\n"}, mtime_ns=racy_ns)
+
+        recorder = CheckRecorder()
+        validator.run_checks = recorder
+        try:
+            def validate():
+                return validator.validate_repo(jobs=1, root=root, cache_path=cache_path)
+
+            assert validate() == [root / "mt5/MQL5/Experts/A.mq5"]
+            assert len(recorder.runs[-1]) == 4
+
+            # Unchanged stat: nothing is read, except the entry inside the racy window
+            validate()
+            assert recorder.runs[-1] == {"docs/new.md": "unchanged"}, recorder.runs[-1]
+
+            # Size change (same mtime) and mtime change (same content) both invalidate
+            make_tree(root, {"docs/a.md": "# A, longer\n"})
+            os.utime(root / "docs/b.md", ns=(OLD_NS + 10**9, OLD_NS + 10**9))
+            validate()
+            assert recorder.runs[-1] == {"docs/a.md": "checked", "docs/b.md": "unchanged", "docs/new.md": "unchanged"}
+
+            # Rewritten within the same mtime tick, same size: only the racy re-hash catches it
+            make_tree(root, {"docs/new.md": f"{FAKE_PAT}\n"}, mtime_ns=racy_ns)
+            try:
+                validate()
+            except SystemExit as e:
+                assert e.code == 1
+            else:
+                raise AssertionError("secret in a re-hashed file was not reported")
+        finally:
+            validator.run_checks = recorder.wrapped
+
+    print("✓ Result cache OK")
+
+
+def test_process_pool_above_threshold():
+    """Enough pending files are checked in a process pool with the same results."""
+    print("Testing process pool checks...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        count = validator.PARALLEL_THRESHOLD + 6
+        files = {f"docs/f{i:03}.md": f"# {i}\n" for i in range(count)}
+        files["docs/f007.md"] = f"token {FAKE_AWS}\n"
+        make_tree(root, files)
+        tasks = [(str(root), rel, False, True, None) for rel in sorted(files)]
+
+        pools = []
+        real_pool = validator.concurrent.futures.ProcessPoolExecutor
+
+        def pool(*args, **kwargs):
+            pools.append(kwargs.get("max_workers"))
+            return real_pool(*args, **kwargs)
+
+        validator.concurrent.futures.ProcessPoolExecutor = pool
+        try:
+            parallel = validator.run_checks(tasks, jobs=2)
+            serial = validator.run_checks(tasks, jobs=1)
+            validator.run_checks(tasks[:validator.PARALLEL_THRESHOLD - 1], jobs=2)
+        finally:
+            validator.concurrent.futures.ProcessPoolExecutor = real_pool
+
+        assert pools == [2], pools  # only the run above the threshold used a pool
+        assert parallel == serial and len(parallel) == count
+        assert parallel["docs/f007.md"]["secrets"] == [("aws_access_key_id", 1)]
+
+    print("✓ Process pool checks OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Repository Validator")
+    print("=" * 60)
+
+    try:
+        test_scan_bytes_reports_line_numbers_once_per_line()
+        test_validate_blobs_flags_nul_and_secrets()
+        test_split_range()
+        test_walk_repo_prunes_excluded_dirs()
+        test_result_cache()
+        test_process_pool_above_threshold()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for deploy_cloud.py concurrent "all" mode
+"""
+
+import io
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import deploy_cloud
+
+FAKE_DEPLOYS = {
+    "render": "import time; print('render ready'); time.sleep(1)",
+    "railway": "import time; print('railway up'); time.sleep(1)",
+    "flyio": "import sys; print('flyctl: not logged in'); sys.exit(1)",
+    "gcp": "import time; print('waiting for build'); time.sleep(30)",
+}
+
+
+def fake_command(platform):
+    return [sys.executable, "-c", FAKE_DEPLOYS[platform]]
+
+
+def test_concurrent_deploys_with_timeouts():
+    """Platforms run in parallel; a hung one is killed at its timeout; logs are kept."""
+    print("Testing concurrent deploys...")
+
+    saved = deploy_cloud.DEPLOY_LOG_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        deploy_cloud.DEPLOY_LOG_DIR = Path(tmp)
+        try:
+            out = io.StringIO()
+            start = time.monotonic()
+            runs = deploy_cloud.deploy_all_concurrently(
+                list(FAKE_DEPLOYS), timeout=3, command=fake_command, live=True, out=out
+            )
+            wall = time.monotonic() - start
+        finally:
+            deploy_cloud.DEPLOY_LOG_DIR = saved
+
+        states = {run.platform: run.state for run in runs}
+        assert states == {"render": "ok", "railway": "ok", "flyio": "failed", "gcp": "timeout"}, states
+        # Bounded by the slowest platform (the 3 s timeout), not the sum
+        assert wall < 6, wall
+        assert runs[0].log_path.read_text(encoding="utf-8") == "render ready\n"
+        assert runs[2].last_line == "flyctl: not logged in"
+
+        # The live table is redrawn in place
+        assert "\033[F" in out.getvalue() and "Last output" in out.getvalue()
+
+        summary = io.StringIO()
+        deploy_cloud.print_summary(runs, wall, out=summary)
+        assert "2/4 platforms succeeded" in summary.getvalue()
+        assert "flyctl: not logged in" in summary.getvalue()
+
+    print("✓ Concurrent deploys OK")
+
+
+def test_child_options_are_forwarded():
+    """'all' mode passes each child its platform timeout and the docker image options."""
+    print("Testing child deploy options...")
+
+    assert deploy_cloud.docker_args(["mql5-automation", "mql5-automation-cloud"], force=True) == [
+        "--image", "mql5-automation", "--image", "mql5-automation-cloud", "--force-build",
+    ]
+    assert deploy_cloud.docker_args() == []
+
+    real_child_command = deploy_cloud.child_command
+    saved_dir = deploy_cloud.DEPLOY_LOG_DIR
+
+    def echo_command(run, extra_args=()):
+        # Same arguments, but a child that only prints them
+        return [sys.executable, "-c", "import sys; print(' '.join(sys.argv[1:]))", *real_child_command(run, extra_args)[2:]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deploy_cloud.DEPLOY_LOG_DIR = Path(tmp)
+        deploy_cloud.child_command = echo_command
+        try:
+            runs = deploy_cloud.deploy_all_concurrently(
+                ["flyio", "docker"], live=False, out=io.StringIO(),
+                extra_args={"docker": deploy_cloud.docker_args(["mql5-automation-cloud"], force=True)},
+            )
+        finally:
+            deploy_cloud.child_command = real_child_command
+            deploy_cloud.DEPLOY_LOG_DIR = saved_dir
+
+    lines = {run.platform: run.last_line for run in runs}
+    assert lines == {
+        "flyio": f"flyio --timeout {deploy_cloud.PLATFORM_TIMEOUTS['flyio']}",
+        "docker": f"docker --timeout {deploy_cloud.PLATFORM_TIMEOUTS['docker']} --image mql5-automation-cloud --force-build",
+    }, lines
+
+    print("✓ Child deploy options OK")
+
+
+def test_interrupt_stops_children():
+    """Ctrl-C kills the running children right away instead of waiting for their timeouts."""
+    print("Testing interrupted deploys...")
+
+    def sleep_command(platform):
+        return [sys.executable, "-c", "import os, time; print(os.getpid(), flush=True); time.sleep(20)"]
+
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt
+
+    saved_dir = deploy_cloud.DEPLOY_LOG_DIR
+    saved_handler = signal.signal(signal.SIGINT, interrupt)
+    sender = threading.Timer(1, os.kill, (os.getpid(), signal.SIGINT))
+    with tempfile.TemporaryDirectory() as tmp:
+        deploy_cloud.DEPLOY_LOG_DIR = Path(tmp)
+        start = time.monotonic()
+        try:
+            sender.start()
+            deploy_cloud.deploy_all_concurrently(
+                ["render", "railway"], timeout=8, command=sleep_command, live=False, out=io.StringIO()
+            )
+        except KeyboardInterrupt:
+            pass
+        else:
+            raise AssertionError("the interrupt did not propagate")
+        finally:
+            sender.cancel()
+            signal.signal(signal.SIGINT, saved_handler)
+            deploy_cloud.DEPLOY_LOG_DIR = saved_dir
+        wall = time.monotonic() - start
+
+        assert wall < 4, wall  # not the 8 s timeout
+        pids = [int(log.read_text(encoding="utf-8")) for log in Path(tmp).glob("*.log")]
+        assert len(pids) == 2, pids
+        for pid in pids:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                continue
+            raise AssertionError(f"child {pid} is still running")
+
+    print("✓ Interrupted deploys OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Cloud Deployment")
+    print("=" * 60)
+
+    try:
+        test_concurrent_deploys_with_timeouts()
+        test_child_options_are_forwarded()
+        test_interrupt_stops_children()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for deploy_queue.py job scheduling
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from deploy_queue import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, DeployQueue
+
+
+class ControlledRunner:
+    """Runner whose jobs finish only when the test releases them."""
+
+    def __init__(self):
+        self.gates = {}
+        self.running = set()
+        self.peak = 0
+        self.started = []
+
+    async def __call__(self, job):
+        self.started.append(job.id)
+        self.running.add(job.platform)
+        self.peak = max(self.peak, len(self.running))
+        gate = self.gates.setdefault(job.id, asyncio.Event())
+        try:
+            await gate.wait()
+        finally:
+            self.running.discard(job.platform)
+        return job.platform != "broken", f"{job.platform} done"
+
+    def release(self, job):
+        self.gates.setdefault(job.id, asyncio.Event()).set()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_coalescing_and_exclusion():
+    """Duplicates join the queued job; a platform never deploys twice at once."""
+    print("Testing coalescing and per-platform exclusion...")
+
+    async def scenario():
+        runner = ControlledRunner()
+        queue = DeployQueue(runner, max_concurrent=2)
+        finished = []
+
+        async def watch(job):
+            finished.append((job.id, job.state))
+
+        first, created = queue.submit("flyio", on_finish=watch)
+        await settle()
+        assert created and first.state == RUNNING
+
+        # While flyio runs, the next request queues one follow-up...
+        second, created = queue.submit("flyio", on_finish=watch)
+        assert created and second.id != first.id
+        # ...and further requests coalesce into it
+        third, created = queue.submit("flyio", on_finish=watch)
+        assert not created and third is second and second.requests == 2
+        await settle()
+        assert second.state == QUEUED
+
+        runner.release(first)
+        await settle()
+        assert first.state == SUCCEEDED and second.state == RUNNING
+        runner.release(second)
+        await queue.wait(second)
+        assert finished == [(first.id, SUCCEEDED), (second.id, SUCCEEDED), (second.id, SUCCEEDED)]
+        assert [job.id for job in queue.recent()] == [second.id, first.id]
+
+    asyncio.run(scenario())
+
+    print("✓ Coalescing and per-platform exclusion OK")
+
+
+def test_global_cap_and_cancel():
+    """No more than max_concurrent deploys run; queued and running jobs can be cancelled."""
+    print("Testing global cap and cancellation...")
+
+    async def scenario():
+        runner = ControlledRunner()
+        queue = DeployQueue(runner, max_concurrent=2)
+        jobs = [queue.submit(p)[0] for p in ("flyio", "render", "railway", "broken")]
+        await settle()
+        assert [job.state for job in jobs] == [RUNNING, RUNNING, QUEUED, QUEUED]
+
+        # Cancel a queued job and a running one
+        assert queue.cancel(jobs[2].id) is jobs[2]
+        assert queue.cancel(jobs[0].id) is jobs[0]
+        await settle()
+        assert jobs[0].state == CANCELLED and jobs[2].state == CANCELLED
+        assert jobs[3].state == RUNNING and runner.peak == 2
+        assert queue.cancel(jobs[0].id) is None
+
+        runner.release(jobs[1])
+        runner.release(jobs[3])
+        await asyncio.gather(*(queue.wait(job) for job in jobs))
+        assert jobs[1].state == SUCCEEDED and jobs[3].state == FAILED
+        assert runner.started == [jobs[0].id, jobs[1].id, jobs[3].id]
+        assert queue.active() == [] and queue.get(jobs[3].id).summary == "broken done"
+
+    asyncio.run(scenario())
+
+    print("✓ Global cap and cancellation OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Deploy Job Queue")
+    print("=" * 60)
+
+    try:
+        test_coalescing_and_exclusion()
+        test_global_cap_and_cancel()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for docker_cache.py (.dockerignore matching and context hashing)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from ci_validate_repo import RACY_WINDOW_NS
+from docker_cache import build_image, context_files, context_hash, file_digest, is_ignored, parse_dockerignore
+
+
+def test_dockerignore_rules():
+    """Patterns are anchored at the context root and the last match wins."""
+    print("Testing .dockerignore matching...")
+
+    rules = parse_dockerignore("# comment\n*.md\n!README.md\nlogs/\n**/__pycache__\n.git\n")
+    assert is_ignored("NOTES.md", rules)
+    assert not is_ignored("README.md", rules)
+    assert not is_ignored("docs/guide.md", rules)  # *.md only matches at the root
+    assert is_ignored("logs/deploy/fly.log", rules)
+    assert is_ignored("scripts/__pycache__/x.pyc", rules)
+    assert is_ignored(".git/HEAD", rules)
+    assert not is_ignored("scripts/deploy_cloud.py", rules)
+
+    print("✓ .dockerignore matching OK")
+
+
+def test_context_hash():
+    """The hash follows content, modes and the Dockerfile, but not ignored files."""
+    print("Testing context hashing...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "scripts").mkdir()
+        (root / "logs").mkdir()
+        (root / "Dockerfile").write_text("FROM python:3.11-slim\nCOPY . .\n")
+        (root / ".dockerignore").write_text("logs\n*.log\n")
+        (root / "scripts" / "run.py").write_text("print('hi')\n")
+        (root / "requirements.txt").write_text("requests\n")
+        (root / "logs" / "old.txt").write_text("x\n")
+
+        assert context_files(root) == [".dockerignore", "Dockerfile", "requirements.txt", "scripts/run.py"]
+
+        cache = {}
+        base = context_hash(root / "Dockerfile", root, cache=cache)
+        assert context_hash(root / "Dockerfile", root, cache=cache) == base
+        assert context_hash(root / "Dockerfile", root) == base  # cache does not change the result
+
+        (root / "logs" / "new.txt").write_text("ignored\n")
+        (root / "build.log").write_text("ignored\n")
+        assert context_hash(root / "Dockerfile", root, cache=cache) == base
+
+        assert context_hash(root / "Dockerfile", root, build_args={"PY": "3.12"}) != base
+
+        os.chmod(root / "scripts" / "run.py", 0o755)
+        chmodded = context_hash(root / "Dockerfile", root, cache=cache)
+        assert chmodded != base
+
+        (root / "scripts" / "run.py").write_text("print('bye')\n")
+        os.utime(root / "scripts" / "run.py", ns=(1, 1))  # new mtime so the cached digest is not reused
+        edited = context_hash(root / "Dockerfile", root, cache=cache)
+        assert edited not in (base, chmodded)
+
+        (root / "Dockerfile").write_text("FROM python:3.12-slim\nCOPY . .\n")
+        assert context_hash(root / "Dockerfile", root, cache=cache) != edited
+
+    print("✓ Context hashing OK")
+
+
+def test_racy_entries_are_rehashed():
+    """A digest taken right after a write is not trusted for files rewritten in the same mtime tick."""
+    print("Testing racy digest cache entries...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "run.py"
+        path.write_text("print('hi')\n")
+        now_ns = time.time_ns()
+        os.utime(path, ns=(now_ns, now_ns))
+
+        cache = {}
+        first = file_digest(path, cache, "run.py")
+        assert cache["run.py"]["checked_ns"] - now_ns <= RACY_WINDOW_NS
+
+        # Same size, same mtime, different content: only the re-hash notices
+        path.write_text("print('yo')\n")
+        os.utime(path, ns=(now_ns, now_ns))
+        second = file_digest(path, cache, "run.py")
+        assert second != first
+
+        # Once the entry is older than the window the digest is reused unread
+        old_ns = now_ns - 2 * RACY_WINDOW_NS
+        os.utime(path, ns=(old_ns, old_ns))
+        assert file_digest(path, cache, "run.py") == second
+        path.write_text("print('hi')\n")
+        os.utime(path, ns=(old_ns, old_ns))
+        assert file_digest(path, cache, "run.py") == second
+
+    print("✓ Racy digest cache entries OK")
+
+
+def test_cached_image_retag_failure():
+    """A cached image whose :latest tag cannot be moved is reported as failed, not cached."""
+    print("Testing cached image retagging...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A docker stand-in: every image exists, and `docker tag` fails unless RETAG_OK is set
+        docker = Path(tmp) / "docker"
+        docker.write_text(
+            "#!/bin/sh\n"
+            'if [ "$1" = tag ] && [ -z "$RETAG_OK" ]; then echo "no such image" >&2; exit 1; fi\n'
+            "exit 0\n"
+        )
+        docker.chmod(0o755)
+        saved_path = os.environ["PATH"]
+        os.environ["PATH"] = f"{tmp}{os.pathsep}{saved_path}"
+        try:
+            assert build_image("mql5-automation", Path(tmp) / "Dockerfile", Path(tmp), "a" * 64) == "failed"
+            os.environ["RETAG_OK"] = "1"
+            assert build_image("mql5-automation", Path(tmp) / "Dockerfile", Path(tmp), "a" * 64) == "cached"
+        finally:
+            os.environ["PATH"] = saved_path
+            os.environ.pop("RETAG_OK", None)
+
+    print("✓ Cached image retagging OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Docker Build Cache")
+    print("=" * 60)
+
+    try:
+        test_dockerignore_rules()
+        test_context_hash()
+        test_racy_entries_are_rehashed()
+        test_cached_image_retag_failure()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for docker_context.py (Dockerfile parsing and minimal context tracing)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from docker_cache import context_files
+from docker_context import dockerfile_plan, minimal_context, render_dockerignore
+
+DOCKERFILE = """\
+FROM python:3.11-slim
+WORKDIR /app
+# comment
+COPY requirements.txt ./
+RUN pip install --no-cache-dir \\
+    -r requirements.txt
+COPY --from=builder /wheels /wheels
+COPY . .
+CMD ["python", "scripts/bot.py"]
+"""
+
+BOT = """\
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import helper
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CONFIG_DIR = REPO_ROOT / "config"
+DOCS_DIR = REPO_ROOT / "docs"
+DOCS_DIR.mkdir(exist_ok=True)
+GUIDE = DOCS_DIR / "guide.txt"
+COMMANDS = {"deploy": ["python", str(REPO_ROOT / "scripts" / "deploy.py")]}
+"""
+
+
+def make_repo(root: Path):
+    files = {
+        "Dockerfile": DOCKERFILE,
+        ".dockerignore": "*.md\n!README.md\n",
+        "requirements.txt": "requests\n",
+        "README.md": "readme\n",
+        "NOTES.md": "notes\n",
+        "config/settings.json": '{"script": "scripts/job.sh"}\n',
+        "scripts/bot.py": BOT,
+        "scripts/helper.py": "import json\n",
+        "scripts/deploy.py": "print('deploy')\n",
+        "scripts/job.sh": "#!/bin/bash\npython scripts/report.py\n",
+        "scripts/report.py": "print('report')\n",
+        "scripts/unused.py": "print('unused')\n",
+        "docs/guide.txt": "docs\n",
+        "docs/other.txt": "other docs\n",
+        "mt5/MQL5/Experts/EA.mq5": "// ea\n",
+    }
+    for rel, text in files.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(text)
+
+
+def test_dockerfile_plan():
+    """COPY sources, RUN words and the container command are separated."""
+    print("Testing Dockerfile parsing...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "Dockerfile"
+        path.write_text(DOCKERFILE)
+        sources, commands, entrypoints = dockerfile_plan(path)
+
+    assert sources == ["requirements.txt", "."], sources
+    assert commands == ["pip", "install", "--no-cache-dir", "-r", "requirements.txt"], commands
+    assert entrypoints == ["python", "scripts/bot.py"], entrypoints
+
+    print("✓ Dockerfile parsing OK")
+
+
+def test_minimal_context():
+    """Imports, path expressions and file names in configs/scripts are followed.
+
+    A directory that is only created or joined on pulls in the joined files,
+    not everything under it.
+    """
+    print("Testing minimal context tracing...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_repo(root)
+        full, minimal = minimal_context("mql5-automation", root=root)
+
+        assert "NOTES.md" not in full  # .dockerignore still applies
+        assert minimal == [
+            "requirements.txt",
+            "config/settings.json",
+            "docs/guide.txt",
+            "scripts/bot.py",
+            "scripts/deploy.py",
+            "scripts/helper.py",
+            "scripts/job.sh",
+            "scripts/report.py",
+        ], minimal
+
+        # The generated ignore file makes Docker (and docker_cache) see exactly that set
+        (root / "Dockerfile.dockerignore").write_text(render_dockerignore(minimal))
+        assert context_files(root, root / "Dockerfile") == minimal
+
+        # Extra patterns are kept; an image without a container command keeps everything
+        _, with_docs = minimal_context("mql5-automation", root=root, include=["docs"])
+        assert "docs/other.txt" in with_docs
+        (root / "Dockerfile").write_text(DOCKERFILE.replace('CMD ["python", "scripts/bot.py"]', "CMD tail -f /dev/null"))
+        assert minimal_context("mql5-automation", root=root)[1] is None
+
+    print("✓ Minimal context tracing OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Docker Context Generator")
+    print("=" * 60)
+
+    try:
+        test_dockerfile_plan()
+        test_minimal_context()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for git_batch.py against a throwaway repository
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import git_batch
+
+
+def git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo, check=True, capture_output=True,
+    )
+
+
+def commit(repo, name, content):
+    (Path(repo) / name).write_text(content, encoding="utf-8")
+    git(repo, "add", name)
+    git(repo, "commit", "-q", "-m", f"update {name}")
+
+
+def make_repo(path):
+    """main: 3 commits; feature: +2 on top of main~1; merged: = main~2."""
+    git(path, "init", "-q", "-b", "main")
+    commit(path, "a.txt", "1")
+    git(path, "branch", "merged")
+    commit(path, "a.txt", "2")
+    git(path, "checkout", "-q", "-b", "feature")
+    commit(path, "b.txt", "x")
+    commit(path, "b.txt", "y")
+    git(path, "checkout", "-q", "main")
+    commit(path, "a.txt", "3")
+
+
+def test_count_ahead_behind():
+    """Pure graph computation matches rev-list --left-right semantics."""
+    print("Testing ahead/behind graph walk...")
+
+    # base: c3 -> c2 -> c1 ; tip: f2 -> f1 -> c2
+    parents = {"c3": ["c2"], "c2": ["c1"], "c1": [], "f2": ["f1"], "f1": ["c2"]}
+    assert git_batch.count_ahead_behind(parents, "c3", ["f2", "c1", "c3"]) == {
+        "f2": (2, 1),
+        "c1": (0, 2),
+        "c3": (0, 0),
+    }
+
+    print("✓ Ahead/behind graph walk OK")
+
+
+def test_branch_report_and_objects():
+    """Branch report, file reads and commit parsing on a real repository."""
+    print("Testing batched repository access...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_repo(tmp)
+        with git_batch.GitBatch(tmp, use_cache=False) as repo:
+            report = {b["name"]: b for b in repo.branch_report("main", remote=None)}
+            assert set(report) == {"feature", "merged"}, report
+            assert (report["feature"]["ahead"], report["feature"]["behind"]) == (2, 1)
+            assert report["merged"]["merged"] and report["merged"]["behind"] == 2
+            assert not report["feature"]["merged"]
+
+            assert repo.show("feature", "b.txt") == b"y"
+            assert repo.show("main", "b.txt") is None
+            assert repo.resolve("no-such-branch") is None
+
+            # Feature diff against its merge base only contains its own change
+            base = repo.merge_bases("main", ["feature"])["feature"]
+            assert base == repo.resolve("main~1")
+            feature = repo.resolve("feature")
+            patch = repo.diffs([(base, feature)])[feature]
+            assert "+++ b/b.txt" in patch and "+y" in patch and "a.txt" not in patch, patch
+
+            info = repo.commit("main")
+            assert info["subject"] == "update a.txt" and len(info["parents"]) == 1
+            assert info["author"] == "Test <test@example.com>"
+
+    print("✓ Batched repository access OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Batched Git Access")
+    print("=" * 60)
+
+    try:
+        test_count_ahead_behind()
+        test_branch_report_and_objects()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
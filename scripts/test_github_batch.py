@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Tests for github_batch.py against a local mock GitHub API server
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import github_batch
+
+
+class MockGitHub(BaseHTTPRequestHandler):
+    """
+    Records every request. The first call to each path in `limited` answers
+    with a secondary rate limit; quota headers count down from `quota`.
+    PRs in `unmergeable` refuse to merge; merged PRs report "merged" on GET.
+    """
+
+    def _handle(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        parts = self.path.split("/")
+        merge = self.command == "PUT" and parts[-1] == "merge"
+        with server.lock:
+            server.requests.append((self.command, self.path, body))
+            server.quota -= 1
+            limited = self.path in server.limited
+            server.limited.discard(self.path)
+            if merge:
+                server.merging += 1
+                server.max_merging = max(server.max_merging, server.merging)
+        if merge:
+            time.sleep(0.02)  # long enough for concurrent merges to overlap
+            with server.lock:
+                server.merging -= 1
+
+        if limited:
+            self.send_response(403)
+            self.send_header("Retry-After", "0")
+            payload = {"message": "You have exceeded a secondary rate limit."}
+        elif merge and int(parts[-2]) in server.unmergeable:
+            self.send_response(405)
+            payload = {"message": "Pull Request is not mergeable"}
+        elif self.command == "GET":
+            self.send_response(200)
+            payload = {"number": int(parts[-1]), "merged": int(parts[-1]) in server.merged}
+        else:
+            if merge:
+                server.merged.add(int(parts[-2]))
+            self.send_response(200)
+            payload = {"ok": True}
+        data = json.dumps(payload).encode("utf-8")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-RateLimit-Remaining", str(server.quota))
+        self.send_header("X-RateLimit-Reset", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_PUT = do_POST = do_PATCH = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(quota=5000, limited=()):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockGitHub)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.quota = quota
+    server.limited = set(limited)
+    server.unmergeable = {99}
+    server.merged = set()
+    server.merging = server.max_merging = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_client(server, **state_args):
+    """Client for the mock server; backoff sleeps are skipped to keep the test fast."""
+    state = github_batch.RateLimitState(sleep=lambda seconds: None, **state_args)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    return github_batch.GitHubClient("test-token", "owner/repo", api_url=url, state=state)
+
+
+def test_secondary_limit_backoff_and_journal_resume():
+    """Secondary limits are retried and throttle concurrency; --resume skips journaled steps of the same batch."""
+    print("Testing retries and journal resume...")
+
+    server = start_server(limited={"/repos/owner/repo/pulls/53"})
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            client = make_client(server, initial_concurrency=4)
+            ops = [github_batch.merge_pr_op(75)] + [github_batch.close_pr_op(n, "dup of #75") for n in (52, 53, 54)]
+            finished = []
+            executor = github_batch.BatchExecutor(client, tmp)
+            results = executor.run(ops, on_result=lambda op_id, ok, error: finished.append(op_id))
+
+            assert all(ok for ok, _ in results.values()), results
+            assert sorted(finished) == sorted(results)
+            # 1 merge + 3 comments + 3 closes + 1 retried close
+            assert len(server.requests) == 8
+            assert client.state.limit < 4, client.state.limit  # halved by the secondary limit
+            assert ("PATCH", "/repos/owner/repo/pulls/53", {"state": "closed"}) in server.requests
+            assert ("POST", "/repos/owner/repo/issues/52/comments", {"body": "dup of #75"}) in server.requests
+            assert not executor.journal_path(ops).exists()  # a finished batch leaves no journal
+
+            # An interrupted run: everything but the close of #54 was journaled (plus a torn line)
+            journal = executor.journal_path(ops)
+            steps = [f"{op['id']}:{step[0]}" for op in ops for step in op["steps"] if op["id"] != "close:54"]
+            steps.append("close:54:comment")
+            journal.write_text("".join(json.dumps({"step": s}) + "\n" for s in steps) + "{\"step\": ", encoding="utf-8")
+
+            # The same PRs with another comment are a different batch
+            other = [github_batch.close_pr_op(54, "superseded")]
+            assert github_batch.BatchExecutor(client, tmp, resume=True).journal_path(other) != journal
+
+            server.requests.clear()
+            results = github_batch.BatchExecutor(make_client(server), tmp, resume=True).run(ops)
+            assert all(ok for ok, _ in results.values())
+            assert [(m, p) for m, p, _ in server.requests] == [("PATCH", "/repos/owner/repo/pulls/54")]
+            assert not journal.exists()
+
+            # Without --resume a leftover journal is ignored and the batch runs in full
+            journal.write_text(json.dumps({"step": "merge:75:merge"}) + "\n", encoding="utf-8")
+            server.requests.clear()
+            github_batch.BatchExecutor(make_client(server), tmp).run(ops)
+            assert len(server.requests) == 7
+    finally:
+        server.shutdown()
+
+    print("✓ Retries and journal resume OK")
+
+
+def test_quota_pause_and_errors():
+    """Low remaining quota pauses until reset; API errors are reported, not journaled."""
+    print("Testing quota tracking...")
+
+    state = github_batch.RateLimitState(reserve=10, clock=lambda: 100.0)
+    state.update({"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "130"})
+    assert state.quota_wait() == 30.0
+    state.update({"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": "130"})
+    assert state.quota_wait() == 0.0
+    state.throttle(12)
+    assert state.quota_wait() == 12.0 and state.limit == 1
+
+    server = start_server(quota=3)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            client = make_client(server, reserve=1)
+            executor = github_batch.BatchExecutor(client, tmp)
+            ops = [github_batch.merge_pr_op(n) for n in (97, 98, 99)]
+            results = executor.run(ops)
+            assert results["merge:99"] == (False, "HTTP 405: Pull Request is not mergeable")
+            assert results["merge:97"] == (True, None)
+            assert client.state.remaining == 0
+            journal = executor.journal_path(ops).read_text(encoding="utf-8")  # kept for --resume
+            assert "merge:97" in journal and "merge:99" not in journal
+    finally:
+        server.shutdown()
+
+    assert github_batch.repo_from_remote("git@github.com:A6-9V/MQL5-Google-Onedrive.git") == "A6-9V/MQL5-Google-Onedrive"
+    assert github_batch.repo_from_remote("https://github.com/A6-9V/MQL5-Google-Onedrive") == "A6-9V/MQL5-Google-Onedrive"
+
+    print("✓ Quota tracking OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing GitHub Batch Executor")
+    print("=" * 60)
+
+    try:
+        test_secondary_limit_backoff_and_journal_resume()
+        test_quota_pause_and_errors()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached vault loader in load_vault.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import load_vault
+from load_vault import Vault
+
+VAULT = {
+    "telegram_bot": {"api": "api-token", "allowed_user_ids": [111, 222], "webhook_url": "https://bot.example.com/hook"},
+    "cloudflare": {"zone_id": "zone-1"},
+}
+
+
+def write_vault(path: Path, data, mtime_ns: int):
+    path.write_text(json.dumps(data) if not isinstance(data, str) else data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_single_parse_and_reload():
+    """The file is parsed once and re-read only after it changes."""
+    print("Testing vault caching...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "vault.json"
+        write_vault(path, VAULT, 1_000_000_000)
+        vault = Vault(path, environ={}, reload_interval=0)
+
+        for _ in range(50):
+            assert vault.get_str("telegram_bot.token") is None
+            assert vault.get_str("telegram_bot.api") == "api-token"
+            assert vault.get_list("telegram_bot.allowed_user_ids") == [111, 222]
+        assert vault.loads == 1
+
+        write_vault(path, {"telegram_bot": {"token": "new-token"}}, 2_000_000_000)
+        assert vault.get_str("telegram_bot.token") == "new-token"
+        assert vault.get("telegram_bot.api", "gone") == "gone"
+        assert vault.loads == 2
+
+        # Within the reload interval the file is not even stat()ed
+        slow = Vault(path, environ={}, reload_interval=3600)
+        assert slow.get_str("telegram_bot.token") == "new-token"
+        write_vault(path, VAULT, 3_000_000_000)
+        assert slow.get_str("telegram_bot.token") == "new-token"
+        slow.invalidate()
+        assert slow.get_str("telegram_bot.api") == "api-token" and slow.loads == 2
+
+        # Broken and missing files degrade to defaults
+        write_vault(path, "{not json", 4_000_000_000)
+        assert vault.data() is None and vault.get_list("telegram_bot.allowed_user_ids") == []
+        path.unlink()
+        assert vault.get_str("telegram_bot.name", "fallback") == "fallback"
+
+    print("✓ Vault caching OK")
+
+
+def test_environment_overrides():
+    """Environment variables win over the file, with typed conversions."""
+    print("Testing environment overrides...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "vault.json"
+        write_vault(path, VAULT, 1_000_000_000)
+        environ = {"TELEGRAM_ALLOWED_USER_IDS": "7, 8,", "VAULT_CLOUDFLARE_ZONE_ID": "zone-env", "VAULT_LIMITS_RETRIES": "3"}
+        vault = Vault(path, environ=environ, reload_interval=0)
+
+        assert vault.get_list("telegram_bot.allowed_user_ids") == ["7", "8"]
+        assert vault.get_str("cloudflare.zone_id") == "zone-env"
+        assert vault.get_int("limits.retries") == 3 and vault.get_int("limits.missing", 5) == 5
+        assert vault.get_str("telegram_bot.webhook_url") == "https://bot.example.com/hook"
+
+        # The module-level getters keep their behaviour on top of the shared instance
+        saved = load_vault.vault
+        load_vault.vault = vault
+        try:
+            assert load_vault.get_telegram_token() == "api-token"
+            assert load_vault.get_telegram_bot_name() == load_vault.DEFAULT_TELEGRAM_BOT_NAME
+            assert load_vault.get_github_pat() is None
+            environ["GITHUB_PAT"] = "pat-env"
+            assert load_vault.get_github_pat() == "pat-env"
+        finally:
+            load_vault.vault = saved
+
+    print("✓ Environment overrides OK")
+
+
+def test_encrypted_vault():
+    """vault.json.enc is decrypted with VAULT_KEY (needs the optional cryptography package)."""
+    print("Testing encrypted vault...")
+
+    if load_vault.Fernet is None:
+        print("⚠ cryptography not installed, skipping")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "vault.json"
+        key = load_vault.Fernet.generate_key().decode()
+        encrypted = path.with_name("vault.json.enc")
+        encrypted.write_bytes(load_vault.Fernet(key.encode()).encrypt(json.dumps(VAULT).encode()))
+
+        assert Vault(path, environ={"VAULT_KEY": key}).get_str("cloudflare.zone_id") == "zone-1"
+        assert Vault(path, environ={}).data() is None
+        wrong = load_vault.Fernet.generate_key().decode()
+        assert Vault(path, environ={"VAULT_KEY": wrong}).data() is None
+
+    print("✓ Encrypted vault OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Vault Loader")
+    print("=" * 60)
+
+    try:
+        test_single_parse_and_reload()
+        test_environment_overrides()
+        test_encrypted_vault()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for merge_best_prs.py plan handling against the mock GitHub API of test_github_batch.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import github_batch
+import merge_best_prs
+from test_github_batch import make_client, start_server
+
+CLUSTERS = [
+    {"representative": 75, "members": [52, 75], "similarity": {52: 0.91, 75: 1.0}},
+    {"representative": 80, "members": [80, 81, 83], "similarity": {80: 1.0, 81: 0.88, 83: 0.8}},
+    {"representative": 99, "members": [98, 99], "similarity": {98: 0.95, 99: 1.0}},
+]
+
+
+def test_resume_finishes_the_saved_plan():
+    """--resume replays the saved plan: merged representatives are done, and merges never overlap."""
+    print("Testing resumable merge plan...")
+
+    server = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            client = make_client(server)
+            path = merge_best_prs.plan_path(client.repo, tmp)
+            plan = merge_best_prs.save_plan(path, client.repo, CLUSTERS)
+            assert merge_best_prs.load_plan(path) == plan and plan["clusters"] == CLUSTERS
+
+            # #99 cannot merge yet: its duplicates stay open and the plan is unfinished
+            executor = github_batch.BatchExecutor(client, tmp)
+            assert merge_best_prs.apply_plan(executor, plan) is False
+            assert server.merged == {75, 80} and server.max_merging == 1
+            closed = {path for method, path, _ in server.requests if method == "PATCH"}
+            assert closed == {f"/repos/owner/repo/pulls/{n}" for n in (52, 81, 83)}
+
+            # The resumed run works from the plan on disk, not from the PRs still open
+            server.unmergeable.clear()
+            server.requests.clear()
+            executor = github_batch.BatchExecutor(make_client(server), tmp, resume=True)
+            assert merge_best_prs.apply_plan(executor, merge_best_prs.load_plan(path), check_merged=True) is True
+            writes = [(method, path) for method, path, _ in server.requests if method != "GET"]
+            assert writes == [
+                ("PUT", "/repos/owner/repo/pulls/99/merge"),
+                ("POST", "/repos/owner/repo/issues/98/comments"),
+                ("PATCH", "/repos/owner/repo/pulls/98"),
+            ], writes
+            assert server.merged == {75, 80, 99}
+    finally:
+        server.shutdown()
+
+    print("✓ Resumable merge plan OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing PR Merge Plan")
+    print("=" * 60)
+
+    try:
+        test_resume_finishes_the_saved_plan()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
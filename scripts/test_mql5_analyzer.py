@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for mql5_analyzer.py hot-path rules
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import mql5_analyzer as analyzer
+
+
+UNGUARDED_EA = """
+#property strict
+int handle;
+// CopyRates( in a comment is ignored
+void Refresh()
+  {
+   double buf[];
+   CopyBuffer(handle, 0, 0, 3, buf);
+  }
+void OnTick()
+  {
+   MqlRates rates[];
+   CopyRates(_Symbol, _Period, 0, 2, rates);
+   handle = iMA(_Symbol, _Period, 20, 0, MODE_EMA, PRICE_CLOSE);
+   Refresh();
+   string s = "CopyTime(";
+  }
+"""
+
+GUARDED_EA = """
+datetime g_lastBarTime = 0;
+int OnInit() { handle = iCustom(_Symbol, _Period, "X"); return INIT_SUCCEEDED; }
+void OnTick()
+  {
+   datetime t = iTime(_Symbol, _Period, 0);
+   if(t == g_lastBarTime) { return; }
+   g_lastBarTime = t;
+   double buf[];
+   CopyBuffer(handle, 0, 0, 3, buf);
+  }
+"""
+
+LAZY_INIT_EA = """
+int g_ma = INVALID_HANDLE;
+bool g_ready = false;
+int RsiHandle()
+  {
+   static int h = iRSI(_Symbol, _Period, 14, PRICE_CLOSE);
+   return h;
+  }
+void OnTick()
+  {
+   if(g_ma == INVALID_HANDLE) g_ma = iMA(_Symbol, _Period, 20, 0, MODE_EMA, PRICE_CLOSE);
+   if(!g_ready)
+     {
+      int atr = iATR(_Symbol, _Period, 14);
+      g_ready = true;
+     }
+   int rsi = RsiHandle();
+   if(Bars(_Symbol, _Period) > 100) g_ma = iMA(_Symbol, _Period, 50, 0, MODE_SMA, PRICE_CLOSE);
+  }
+"""
+
+OBJECT_LOOP_INDICATOR = """
+int OnCalculate(const int rates_total, const int prev_calculated, const datetime &time[])
+  {
+   if(prev_calculated == rates_total) return rates_total;
+   for(int i = 0; i < rates_total; i++)
+      ObjectCreate(0, "bar" + i, OBJ_ARROW, 0, time[i], 0);
+   for(int j = 0; j < MaxObjects; j++)
+     {
+      ObjectCreate(0, "cap" + j, OBJ_ARROW, 0, time[j], 0);
+     }
+   return rates_total;
+  }
+"""
+
+
+def rules(findings):
+    return [(f["rule"], f["line"], f["function"]) for f in findings]
+
+
+def test_tokenizer_skips_comments_strings_and_preprocessor():
+    """Only real code becomes tokens, with correct line numbers."""
+    print("Testing tokenizer...")
+
+    tokens = analyzer.tokenize('#define X 1\n/* a\nb */ int x = "y(";\n')
+    assert [(t.kind, t.value, t.line) for t in tokens] == [
+        ("ident", "int", 3), ("ident", "x", 3), ("op", "=", 3), ("string", '"y("', 3), ("op", ";", 3),
+    ], tokens
+
+    print("✓ Tokenizer OK")
+
+
+def test_unguarded_hot_path_is_flagged():
+    """Copies and handle creation reachable from OnTick without a guard are reported."""
+    print("Testing unguarded OnTick...")
+
+    found = rules(analyzer.analyze_source(UNGUARDED_EA))
+    assert found == [
+        ("per-tick-copy", 8, "Refresh"),
+        ("missing-new-bar-guard", 10, "OnTick"),
+        ("per-tick-copy", 13, "OnTick"),
+        ("handle-in-hot-path", 14, "OnTick"),
+    ], found
+
+    print("✓ Unguarded OnTick OK")
+
+
+def test_guarded_hot_path_is_clean():
+    """Copies after a new-bar guard and handles created in OnInit are fine."""
+    print("Testing guarded OnTick...")
+
+    assert analyzer.analyze_source(GUARDED_EA) == []
+
+    print("✓ Guarded OnTick OK")
+
+
+def test_lazy_handle_init_is_allowed():
+    """Handles created once behind INVALID_HANDLE/flag checks or in a static are not flagged."""
+    print("Testing lazy handle creation...")
+
+    # Only the handle created under an unrelated condition remains
+    assert rules(analyzer.analyze_source(LAZY_INIT_EA)) == [
+        ("handle-in-hot-path", 18, "OnTick"),
+    ], rules(analyzer.analyze_source(LAZY_INIT_EA))
+
+    print("✓ Lazy handle creation OK")
+
+
+def test_object_create_loops():
+    """ObjectCreate over every bar is flagged; a capped loop is not."""
+    print("Testing ObjectCreate loops...")
+
+    assert rules(analyzer.analyze_source(OBJECT_LOOP_INDICATOR)) == [
+        ("unbounded-object-loop", 6, "OnCalculate"),
+    ]
+
+    print("✓ ObjectCreate loops OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing MQL5 Analyzer")
+    print("=" * 60)
+
+    try:
+        test_tokenizer_skips_comments_strings_and_preprocessor()
+        test_unguarded_hot_path_is_flagged()
+        test_guarded_hot_path_is_clean()
+        test_lazy_handle_init_is_allowed()
+        test_object_create_loops()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
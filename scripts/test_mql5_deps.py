@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for mql5_deps.py include parsing and affected-program lookup
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import mql5_deps as deps
+
+
+INDEX = {
+    "mt5/MQL5/Experts/A.mq5": {"includes": ["mt5/MQL5/Include/Ai.mqh"], "external": ["Trade/Trade.mqh"]},
+    "mt5/MQL5/Experts/B.mq5": {"includes": ["mt5/MQL5/Include/Bridge.mqh"], "external": ["Gone.mqh"]},
+    "mt5/MQL5/Indicators/C.mq5": {"includes": [], "external": []},
+    "mt5/MQL5/Include/Ai.mqh": {"includes": ["mt5/MQL5/Include/Bridge.mqh"], "external": []},
+    "mt5/MQL5/Include/Bridge.mqh": {"includes": [], "external": []},
+}
+
+
+def test_parse_and_resolve_includes():
+    """Both include forms are parsed; <...> resolves from MQL5/Include case-insensitively."""
+    print("Testing include parsing...")
+
+    data = b'#include <Expert\\Expert.mqh>\n  #include "zolobridge.mqh" // note\n// #include <No.mqh>\n'
+    assert deps.parse_includes(data) == [("<", "Expert/Expert.mqh"), ('"', "zolobridge.mqh")]
+
+    known = {"mt5/mql5/include/zolobridge.mqh": "mt5/MQL5/Include/ZoloBridge.mqh"}
+    source = "mt5/MQL5/Experts/X.mq5"
+    assert deps.resolve_include(source, '"', "zolobridge.mqh", known) == "mt5/MQL5/Include/ZoloBridge.mqh"
+    assert deps.resolve_include(source, "<", "Expert/Expert.mqh", known) is None
+
+    print("✓ Include parsing OK")
+
+
+def test_affected_roots_follow_transitive_includes():
+    """A header change affects every program that reaches it through the graph."""
+    print("Testing affected programs...")
+
+    assert deps.affected_roots(INDEX, ["mt5/MQL5/Include/Bridge.mqh"]) == [
+        "mt5/MQL5/Experts/A.mq5",
+        "mt5/MQL5/Experts/B.mq5",
+    ]
+    assert deps.affected_roots(INDEX, ["mt5/MQL5/Include/Ai.mqh"]) == ["mt5/MQL5/Experts/A.mq5"]
+    assert deps.affected_roots(INDEX, ["mt5/MQL5/Indicators/C.mq5", "README.md"]) == ["mt5/MQL5/Indicators/C.mq5"]
+    # Deleted header: files still including it are affected
+    assert deps.affected_roots(INDEX, ["mt5/MQL5/Include/Gone.mqh"]) == ["mt5/MQL5/Experts/B.mq5"]
+
+    assert deps.dependency_closure(INDEX, ["mt5/MQL5/Experts/A.mq5"]) == {
+        "mt5/MQL5/Experts/A.mq5",
+        "mt5/MQL5/Include/Ai.mqh",
+        "mt5/MQL5/Include/Bridge.mqh",
+    }
+
+    print("✓ Affected programs OK")
+
+
+def test_repo_path_accepts_outside_paths():
+    """--affected arguments outside the repository are passed through instead of crashing."""
+    print("Testing --affected path handling...")
+
+    with tempfile.NamedTemporaryFile(suffix=".mqh") as outside:
+        assert deps.repo_path(outside.name) == outside.name
+        assert deps.affected_roots(INDEX, [deps.repo_path(outside.name)]) == []
+    assert deps.repo_path(str(Path(deps.__file__))) == "scripts/mql5_deps.py"
+    assert deps.repo_path("mt5/MQL5/Include/Gone.mqh") == "mt5/MQL5/Include/Gone.mqh"
+
+    print("✓ --affected path handling OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing MQL5 Dependency Index")
+    print("=" * 60)
+
+    try:
+        test_parse_and_resolve_includes()
+        test_affected_roots_follow_transitive_includes()
+        test_repo_path_accepts_outside_paths()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
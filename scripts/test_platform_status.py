@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for platform_status.py background polling
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from platform_status import StatusPoller
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_poll_results_and_failures():
+    """Successful, failing, missing and hanging CLIs all end up in the cache."""
+    print("Testing status polling...")
+
+    commands = {
+        "flyio": python("print('app mql5-dashboard: running')"),
+        "render": python("import sys; print('unauthorized'); sys.exit(1)"),
+        "railway": ["definitely-not-a-railway-cli", "status"],
+        "slow": python("import time; time.sleep(10)"),
+    }
+
+    async def scenario():
+        poller = StatusPoller(commands, timeout=0.5)
+        assert poller.get() == {}
+        start = time.monotonic()
+        statuses = await poller.refresh()
+        # Platforms are polled concurrently, so the slow one bounds the total
+        assert time.monotonic() - start < 5
+        return statuses
+
+    statuses = asyncio.run(scenario())
+    assert statuses["flyio"].ok and statuses["flyio"].output == "app mql5-dashboard: running"
+    assert not statuses["render"].ok and statuses["render"].output == "unauthorized"
+    assert not statuses["railway"].ok and "not found" in statuses["railway"].output
+    assert not statuses["slow"].ok and "timed out" in statuses["slow"].output
+
+    print("✓ Status polling OK")
+
+
+def test_cache_and_shared_refresh():
+    """Reads come from the cache; concurrent refreshes share one poll; the loop keeps polling."""
+    print("Testing status cache...")
+
+    async def scenario():
+        poller = StatusPoller({"flyio": python("print('ok')")}, interval=0.05)
+        await asyncio.gather(poller.refresh(), poller.refresh(), poller.refresh(["flyio"]))
+        assert poller.polls == 1
+        first = poller.get()["flyio"]
+
+        # Reading the cache never runs the command
+        for _ in range(3):
+            assert poller.get()["flyio"] is first
+        assert poller.polls == 1
+
+        poller.start()
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if poller.polls >= 3:
+                break
+        await poller.stop()
+        assert poller.polls >= 3 and poller.get()["flyio"] is not first
+
+    asyncio.run(scenario())
+
+    print("✓ Status cache OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Platform Status Poller")
+    print("=" * 60)
+
+    try:
+        test_poll_results_and_failures()
+        test_cache_and_shared_refresh()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for pr_cache.py using recorded `gh pr list` JSON fixtures
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from pr_cache import PRCache
+from review_pull_requests import branch_category
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_fixture(name):
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+class RecordedGh:
+    """Replays fixtures in order and records the `since` argument of each call."""
+
+    def __init__(self, *names):
+        self.responses = [load_fixture(n) for n in names]
+        self.calls = []
+
+    def __call__(self, since=None):
+        self.calls.append(since)
+        return self.responses.pop(0)
+
+
+def test_initial_and_incremental_sync():
+    """First sync stores everything; the next one asks only for newer PRs."""
+    print("Testing incremental sync...")
+
+    gh = RecordedGh("gh_pr_list_full.json", "gh_pr_list_updated.json", "gh_pr_list_updated.json")
+    with PRCache(":memory:") as cache:
+        assert cache.sync(fetch=gh, categorize=branch_category) == 4
+        assert gh.calls == [None]
+        assert cache.counts_by_state() == {"CLOSED": 1, "MERGED": 1, "OPEN": 2}
+        assert cache.counts_by_category("OPEN") == {"ai-generated": 1, "optimization": 1}
+
+        assert cache.sync(fetch=gh, categorize=branch_category) == 2
+        assert gh.calls[1] == "2026-01-22T18:03:10Z"
+        assert cache.counts_by_state() == {"CLOSED": 1, "MERGED": 2, "OPEN": 2}
+
+        # Replaying the same page changes nothing
+        assert cache.sync(fetch=gh, categorize=branch_category) == 0
+        assert gh.calls[2] == "2026-01-24T13:05:00Z"
+
+        merged = cache.prs(state="MERGED")
+        assert [pr["number"] for pr in merged] == [78, 71]
+        assert merged[1]["labels"] == ["enhancement", "performance"]
+        assert merged[1]["author"] == "A6-9V" and merged[1]["category"] == "feature"
+
+        # New category rules reach PRs the incremental fetch does not return
+        assert cache.sync(fetch=lambda since=None: [], categorize=lambda ref: "other") == 5
+        assert cache.counts_by_category() == {"other": 5}
+
+    print("✓ Incremental sync OK")
+
+
+def test_failed_fetch_keeps_cache():
+    """When gh is unavailable the cached rows are still served."""
+    print("Testing offline fallback...")
+
+    with PRCache(":memory:") as cache:
+        cache.sync(fetch=RecordedGh("gh_pr_list_full.json"), categorize=branch_category)
+        assert cache.sync(fetch=lambda since=None: None) is None
+        assert cache.count_prs() == 4
+
+    print("✓ Offline fallback OK")
+
+
+def test_branch_sync_skips_unchanged_tips():
+    """Branch rows are rewritten only when their tip, base or category changes, and pruned when gone."""
+    print("Testing branch sync...")
+
+    def branch(name, oid, ahead, merged=False, behind=0, base="m" * 40):
+        return {"name": name, "oid": oid, "ahead": ahead, "behind": behind, "merged": merged,
+                "date": "2026-01-01", "base_oid": base}
+
+    with PRCache(":memory:") as cache:
+        report = [branch("origin/bolt-x", "a" * 40, 2), branch("origin/feat/y", "b" * 40, 0, merged=True)]
+        assert cache.sync_branches(report, categorize=branch_category) == 2
+        assert cache.sync_branches(report, categorize=branch_category) == 0
+
+        # main moved (and merged bolt-x) while neither branch tip did
+        report = [branch("origin/bolt-x", "a" * 40, 0, merged=True, behind=3, base="n" * 40),
+                  branch("origin/feat/y", "b" * 40, 0, merged=True, behind=3, base="n" * 40)]
+        assert cache.sync_branches(report, categorize=branch_category) == 2
+        row = cache.branches(merged=True)[0]
+        assert (row["name"], row["ahead"], row["behind"], row["base_oid"]) == ("origin/bolt-x", 0, 3, "n" * 40)
+        assert cache.branches(merged=False) == []
+
+        # Changed category rules are applied without any git change
+        assert cache.sync_branches(report, categorize=lambda name: "other") == 2
+
+        assert cache.sync_branches([branch("origin/bolt-x", "c" * 40, 3)], categorize=branch_category) == 1
+        rows = cache.branches()
+        assert [(r["name"], r["ahead"], r["category"]) for r in rows] == [("origin/bolt-x", 3, "optimization")]
+
+    print("✓ Branch sync OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing PR Metadata Cache")
+    print("=" * 60)
+
+    try:
+        test_initial_and_incremental_sync()
+        test_failed_fetch_keeps_cache()
+        test_branch_sync_skips_unchanged_tips()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for pr_clusters.py MinHash/LSH duplicate detection
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pr_clusters
+
+
+NEW_BAR_GUARD = """\
+--- a/mt5/MQL5/Experts/SMC_TrendBreakout_MTF_EA.mq5
++++ b/mt5/MQL5/Experts/SMC_TrendBreakout_MTF_EA.mq5
+@@ -332,6 +332,12 @@ void OnTick()
+ {
++   static datetime lastBarTime = 0;
++   datetime barTime = iTime(_Symbol, _Period, 0);
++   if(barTime == lastBarTime)
++      return;
++   lastBarTime = barTime;
++   // Only evaluate signals once per bar
+    MqlRates rates[];
+-   CopyRates(_Symbol, _Period, 0, 200, rates);
++   if(CopyRates(_Symbol, _Period, 0, 200, rates) <= 0) return;
+"""
+
+EARLY_EXIT = """\
+--- a/mt5/MQL5/Experts/SMC_TrendBreakout_MTF_EA.mq5
++++ b/mt5/MQL5/Experts/SMC_TrendBreakout_MTF_EA.mq5
+@@ -340,4 +340,8 @@ void OnTick()
++   if(!TerminalInfoInteger(TERMINAL_TRADE_ALLOWED))
++      return;
++   if(PositionsTotal() >= MaxOpenPositions)
++      return;
+"""
+
+
+def variant(diff, comment):
+    """The same change with one extra comment line, like bot PRs often differ."""
+    return diff + f"+   // {comment}\n"
+
+
+def test_shingles_ignore_context_and_headers():
+    """Only changed lines contribute, so unrelated context does not matter."""
+    print("Testing shingling...")
+
+    with_context = NEW_BAR_GUARD.replace("@@ -332,6 +332,12 @@ void OnTick()", "@@ -1,1 +1,1 @@ int OnInit()")
+    assert pr_clusters.shingles(NEW_BAR_GUARD) == pr_clusters.shingles(with_context)
+    assert pr_clusters.shingles("--- a/x\n+++ b/x\n context only\n") == set()
+
+    print("✓ Shingling OK")
+
+
+def test_choose_bands_matches_threshold():
+    """The LSH band layout approximates the requested similarity threshold."""
+    print("Testing band selection...")
+
+    for threshold in (0.5, 0.7, 0.8, 0.9):
+        bands, rows = pr_clusters.choose_bands(128, threshold)
+        assert bands * rows <= 128
+        assert abs((1 / bands) ** (1 / rows) - threshold) < 0.05, (threshold, bands, rows)
+
+    print("✓ Band selection OK")
+
+
+def test_near_duplicates_cluster_with_representative():
+    """Variants of one change cluster together; a different change stays apart."""
+    print("Testing clustering...")
+
+    diffs = {
+        74: variant(NEW_BAR_GUARD, "faster"),
+        73: NEW_BAR_GUARD,
+        75: NEW_BAR_GUARD,
+        76: EARLY_EXIT,
+        77: variant(EARLY_EXIT, "skip when trading is disabled"),
+        80: "",
+    }
+    clusters = pr_clusters.cluster_prs(diffs, threshold=0.6)
+    assert [c["members"] for c in clusters] == [[73, 74, 75], [76, 77]], clusters
+
+    # The change submitted twice is the medoid; the older PR wins the tie
+    assert clusters[0]["representative"] == 73
+    assert clusters[0]["similarity"][73] == 1.0
+
+    # Drafts lose ties
+    assert pr_clusters.cluster_prs({1: NEW_BAR_GUARD, 2: NEW_BAR_GUARD}, drafts={1})[0]["representative"] == 2
+
+    print("✓ Clustering OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Duplicate PR Clustering")
+    print("=" * 60)
+
+    try:
+        test_shingles_ignore_context_and_headers()
+        test_choose_bands_matches_threshold()
+        test_near_duplicates_cluster_with_representative()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
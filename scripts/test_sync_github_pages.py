@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental GitHub Pages sync in sync_github_pages.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from sync_github_pages import prepare_checkout, stage_paths, sync_content
+
+MAPPING = [("mt5/MQL5", "mql5"), ("docs", "docs"), ("README.md", "README.md")]
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_incremental_sync():
+    """Only changed files are copied, removed ones deleted, and only those staged."""
+    print("Testing incremental pages sync...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src, pages, cache = Path(tmp) / "src", Path(tmp) / "pages", Path(tmp) / "manifest.json"
+        write(src / "README.md", "# Readme\n")
+        write(src / "docs" / "guide.md", "guide\n")
+        write(src / "docs" / "old" / "notes.md", "notes\n")
+        write(src / "mt5" / "MQL5" / "Experts" / "EA.mq5", "// ea\n")
+        pages.mkdir()
+        git(pages, "init", "-q")
+        write(pages / "index.html", "<html></html>\n")  # not a synced path: left alone
+        write(pages / "docs" / "stale.md", "stale\n")
+
+        def sync():
+            return sync_content(pages, src, MAPPING, jobs=4, cache_path=cache)
+
+        copied, deleted, unchanged = sync()
+        assert copied == ["README.md", "docs/guide.md", "docs/old/notes.md", "mql5/Experts/EA.mq5"], copied
+        assert deleted == ["docs/stale.md"] and unchanged == []
+        assert (pages / "mql5" / "Experts" / "EA.mq5").read_text() == "// ea\n"
+        assert not (pages / "docs" / "stale.md").exists() and (pages / "index.html").exists()
+        git(pages, "add", "-A")
+        git(pages, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "initial")
+
+        # Nothing changed: no copies, no deletions
+        copied, deleted, unchanged = sync()
+        assert (copied, deleted) == ([], []) and len(unchanged) == 4
+
+        # Touched but identical: compared by hash, not copied
+        os.utime(src / "docs" / "guide.md", ns=(1, 1))
+        assert sync()[:2] == ([], [])
+
+        # Edited, removed and an unrelated untracked file in the pages repo
+        write(src / "docs" / "guide.md", "guide v2\n")
+        (src / "docs" / "old" / "notes.md").unlink()
+        write(pages / "scratch.txt", "not ours\n")
+        copied, deleted, _ = sync()
+        assert copied == ["docs/guide.md"] and deleted == ["docs/old/notes.md"], (copied, deleted)
+        assert not (pages / "docs" / "old").exists()
+
+        stage_paths(pages, copied, deleted)
+        staged = git(pages, "diff", "--cached", "--name-status").split("\n")
+        assert [line for line in staged if line] == ["M\tdocs/guide.md", "D\tdocs/old/notes.md"], staged
+
+    print("✓ Incremental pages sync OK")
+
+
+def test_shallow_sparse_checkout():
+    """The pages repo is cloned shallow, blobless and sparse, then fast-forwarded in place."""
+    print("Testing shallow sparse checkout...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        origin, work, cache = tmp / "origin.git", tmp / "work", tmp / "cache" / "pages-repo"
+        git(tmp, "init", "-q", "--bare", "-b", "main", str(origin))
+        git(origin, "config", "uploadpack.allowFilter", "true")
+        git(tmp, "clone", "-q", str(origin), str(work))
+        for rel in ("README.md", "index.html", "docs/a.md", "mql5/Experts/EA.mq5", "assets/big.bin"):
+            write(work / rel, f"{rel} v1\n")
+        identity = ["-c", "user.name=t", "-c", "user.email=t@t"]
+        git(work, "add", "-A")
+        git(work, *identity, "commit", "-q", "-m", "one")
+        write(work / "docs" / "a.md", "docs/a.md v2\n")
+        git(work, *identity, "commit", "-q", "-am", "two")
+        git(work, "push", "-q", "origin", "main")
+
+        url = origin.resolve().as_uri()
+        prepare_checkout(cache, url, "main", ["mql5", "docs"])
+        assert (cache / ".git" / "shallow").exists()
+        assert git(cache, "rev-list", "--count", "HEAD").strip() == "1"
+        assert (cache / "docs" / "a.md").read_text() == "docs/a.md v2\n"
+        assert (cache / "README.md").exists() and (cache / "mql5" / "Experts" / "EA.mq5").exists()
+        assert not (cache / "assets").exists()  # outside the sparse cone
+
+        # A leftover edit from an interrupted run is discarded and new commits are fetched
+        write(cache / "docs" / "a.md", "half-synced\n")
+        write(work / "docs" / "b.md", "docs/b.md v1\n")
+        git(work, "add", "-A")
+        git(work, *identity, "commit", "-q", "-m", "three")
+        git(work, "push", "-q", "origin", "main")
+        prepare_checkout(cache, url, "main", ["mql5", "docs"])
+        assert (cache / "docs" / "a.md").read_text() == "docs/a.md v2\n"
+        assert (cache / "docs" / "b.md").exists() and not (cache / "assets").exists()
+        assert git(cache, "rev-list", "--count", "HEAD").strip() == "1"
+
+    print("✓ Shallow sparse checkout OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing GitHub Pages Sync")
+    print("=" * 60)
+
+    try:
+        test_incremental_sync()
+        test_shallow_sparse_checkout()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
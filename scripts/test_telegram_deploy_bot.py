@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for telegram_deploy_bot.py deploy output streaming
+"""
+
+import asyncio
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import telegram_deploy_bot as bot
+
+
+class FakeMessage:
+    """Stands in for a telegram.Message; records the text of every edit and reply."""
+
+    def __init__(self, upload_error=None):
+        self.edits = []
+        self.replies = []
+        self.upload_error = upload_error
+
+    async def edit_text(self, text):
+        self.edits.append(text)
+
+    async def reply_text(self, text):
+        self.replies.append(("text", text))
+
+    async def reply_document(self, document, filename, caption):
+        if self.upload_error:
+            raise self.upload_error
+        self.replies.append(("document", filename, document.read(), caption))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_streaming_keeps_full_log():
+    """Every line reaches the callback as it is printed; the log gets the raw output."""
+    print("Testing deploy output streaming...")
+
+    script = "import sys\nfor i in range(500): print(f'step {i}')\nsys.stderr.write('warning\\n')\nprint('x' * 100000, end='')"
+    bot.DEPLOY_COMMANDS["test"] = [sys.executable, "-c", script]
+    bot.DEPLOY_COMMANDS["failing"] = [sys.executable, "-c", "import sys; print('boom'); sys.exit(3)"]
+    try:
+        lines = []
+
+        async def collect(line):
+            lines.append(line)
+
+        log = io.BytesIO()
+        success, summary = asyncio.run(bot.run_deployment("test", log=log, on_line=collect))
+        assert success and "successful" in summary
+        assert lines[:2] == ["step 0", "step 1"] and lines[499] == "step 499" and lines[500] == "warning"
+        # A huge unterminated line is bounded in the callback but kept whole in the log
+        assert len(lines) == 502 and len(lines[-1]) == 65536
+        assert len(log.getvalue()) == sum(len(f"step {i}\n") for i in range(500)) + len("warning\n") + 100000
+
+        success, summary = asyncio.run(bot.run_deployment("failing"))
+        assert not success and "exit code 3" in summary
+    finally:
+        del bot.DEPLOY_COMMANDS["test"], bot.DEPLOY_COMMANDS["failing"]
+
+    print("✓ Deploy output streaming OK")
+
+
+def test_progress_edits_are_throttled():
+    """Edits happen every 20 lines or 2 s, never faster than the minimum gap."""
+    print("Testing progress message throttling...")
+
+    async def scenario():
+        message, clock = FakeMessage(), FakeClock()
+        progress = bot.ProgressMessage(message, "🚀 Test deployment", clock=clock)
+
+        # A burst of 100 lines within one second: one edit at most
+        for i in range(100):
+            clock.now = 1.0 + i / 1000
+            await progress.add_line(f"line {i}")
+        assert len(message.edits) == 1, message.edits
+
+        # A slow trickle: one edit per 2 s
+        for i in range(6):
+            clock.now = 3.0 + i
+            await progress.add_line(f"slow {i}")
+        assert len(message.edits) == 4, len(message.edits)
+
+        # The message only carries the tail
+        last = message.edits[-1]
+        assert "slow 4" in last and "line 0\n" not in last and last.count("\n") < bot.TAIL_LINES + 5
+
+        await progress.edit("✅ done")
+        assert message.edits[-1].endswith("✅ done")
+
+    asyncio.run(scenario())
+
+    print("✓ Progress message throttling OK")
+
+
+def test_log_upload_failures_keep_the_result():
+    """A failed or oversized log upload still reports the deploy summary."""
+    print("Testing deploy log upload...")
+
+    def written(data):
+        log = io.BytesIO()
+        log.write(data)
+        return log
+
+    async def scenario():
+        message = FakeMessage()
+        await bot.send_deploy_log(message, written(b"step 1\nstep 2\n"), "flyio", "✅ done")
+        kind, filename, data, caption = message.replies[-1]
+        assert (kind, data, caption) == ("document", b"step 1\nstep 2\n", "✅ done")
+        assert filename.startswith("deploy_flyio_") and filename.endswith(".log")
+
+        await bot.send_deploy_log(message, io.BytesIO(), "flyio", "✅ done")
+        assert message.replies[-1] == ("text", "✅ done")
+
+        # Over the upload limit only the tail is sent
+        saved = bot.DOCUMENT_LIMIT, bot.LOG_TAIL_BYTES
+        bot.DOCUMENT_LIMIT, bot.LOG_TAIL_BYTES = 1000, 10
+        try:
+            await bot.send_deploy_log(message, written(b"x" * 2000 + b"last line\n"), "flyio", "✅ done")
+        finally:
+            bot.DOCUMENT_LIMIT, bot.LOG_TAIL_BYTES = saved
+        kind, filename, data, caption = message.replies[-1]
+        assert data == b"last line\n" and filename.endswith("_tail.log") and caption.startswith("✅ done\n")
+
+        failing = FakeMessage(upload_error=RuntimeError("Request Entity Too Large"))
+        await bot.send_deploy_log(failing, written(b"log\n"), "flyio", "✅ done")
+        assert failing.replies == [("text", "✅ done\n⚠️ The deployment log could not be attached.")]
+
+    asyncio.run(scenario())
+
+    print("✓ Deploy log upload OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Telegram Deploy Bot")
+    print("=" * 60)
+
+    try:
+        test_streaming_keeps_full_log()
+        test_progress_edits_are_throttled()
+        test_log_upload_failures_keep_the_result()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
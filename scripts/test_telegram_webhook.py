@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for telegram_webhook.py against a local fake Telegram Bot API server
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import telegram_deploy_bot as bot
+from telegram_webhook import RecentIds, run_webhook
+
+TOKEN = "123456:TEST"
+SECRET = "s3cret-token"
+USER_ID = 4242
+
+
+class FakeTelegramAPI(BaseHTTPRequestHandler):
+    """Answers Bot API methods and records (method, params) for each call."""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8")
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            params = json.loads(raw or "{}")
+        else:
+            params = dict(parse_qsl(raw))
+        method = self.path.rsplit("/", 1)[-1]
+        self.server.calls.append((method, params))
+
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Deploy", "username": "deploy_test_bot"}
+        elif method == "sendMessage":
+            result = {"message_id": len(self.server.calls), "date": 0,
+                      "chat": {"id": int(params["chat_id"]), "type": "private"}, "text": params["text"]}
+        else:
+            result = True
+        data = json.dumps({"ok": True, "result": result}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def command_update(update_id, text):
+    user = {"id": USER_ID, "is_bot": False, "first_name": "Ops"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1700000000,
+            "chat": {"id": USER_ID, "type": "private"},
+            "from": user,
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}],
+        },
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_webhook_round_trip():
+    """Updates are verified, deduplicated and answered through the fake API."""
+    print("Testing webhook mode...")
+
+    api = ThreadingHTTPServer(("127.0.0.1", 0), FakeTelegramAPI)
+    api.calls = []
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    saved_users = os.environ.get("TELEGRAM_ALLOWED_USER_IDS")
+    os.environ["TELEGRAM_ALLOWED_USER_IDS"] = str(USER_ID)
+    # Read on every check, not frozen at import
+    assert bot.check_authorized(USER_ID) and not bot.check_authorized(USER_ID + 1)
+
+    async def scenario():
+        application = bot.build_application(TOKEN, base_url=f"http://127.0.0.1:{api.server_address[1]}/bot")
+        application.post_init = application.post_shutdown = None  # no background status polling here
+        stop = asyncio.Event()
+        port = free_port()
+        webhook = asyncio.create_task(run_webhook(
+            application, "https://bot.example.com/telegram/hook", host="127.0.0.1", port=port,
+            secret_token=SECRET, stop=stop,
+        ))
+        url = f"http://127.0.0.1:{port}/telegram/hook"
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1):
+                    break
+            except OSError:
+                continue
+
+        async with httpx.AsyncClient() as client:
+            headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+            ok = await client.post(url, json=command_update(1, "/help"), headers=headers)
+            again = await client.post(url, json=command_update(1, "/help"), headers=headers)
+            forged = await client.post(url, json=command_update(2, "/jobs"), headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"})
+            wrong_path = await client.post(f"http://127.0.0.1:{port}/other", json=command_update(3, "/help"), headers=headers)
+            bad_json = await client.post(url, content=b"not json", headers=headers)
+        assert [r.status_code for r in (ok, again, forged, wrong_path, bad_json)] == [200, 200, 403, 404, 400]
+
+        for _ in range(100):
+            if any(m == "sendMessage" for m, _ in api.calls):
+                break
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.2)  # a duplicate would have been answered by now
+        stop.set()
+        await webhook
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        if saved_users is None:
+            os.environ.pop("TELEGRAM_ALLOWED_USER_IDS", None)
+        else:
+            os.environ["TELEGRAM_ALLOWED_USER_IDS"] = saved_users
+        api.shutdown()
+
+    methods = [m for m, _ in api.calls]
+    assert methods.count("setWebhook") == 1
+    set_webhook = next(p for m, p in api.calls if m == "setWebhook")
+    assert set_webhook["url"] == "https://bot.example.com/telegram/hook" and set_webhook["secret_token"] == SECRET
+    sent = [p for m, p in api.calls if m == "sendMessage"]
+    assert len(sent) == 1, sent
+    assert "Deployment Bot Commands" in sent[0]["text"] and int(sent[0]["chat_id"]) == USER_ID
+
+    print("✓ Webhook mode OK")
+
+
+def test_recent_ids_are_bounded():
+    """The duplicate filter forgets the oldest IDs once full."""
+    print("Testing update deduplication...")
+
+    recent = RecentIds(size=3)
+    assert [recent.add(i) for i in (1, 2, 1, 3, 4)] == [True, True, False, True, True]
+    assert recent.add(1) and not recent.add(4)
+
+    print("✓ Update deduplication OK")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Testing Telegram Webhook Mode")
+    print("=" * 60)
+
+    try:
+        test_recent_ids_are_bounded()
+        test_webhook_round_trip()
+
+        print("=" * 60)
+        print("All tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,7 @@ import json
 # Add scripts directory to path so we can import web_dashboard
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from web_dashboard import app
+from web_dashboard import app, METRICS
 
 class TestWebDashboard(unittest.TestCase):
     def setUp(self):
@@ -49,5 +49,142 @@ class TestWebDashboard(unittest.TestCase):
         self.assertIn('X-Frame-Options', response.headers)
         self.assertIn('Referrer-Policy', response.headers)
 
+    def test_metrics_endpoint(self):
+        """Test that /metrics exposes latency, cache and process metrics."""
+        METRICS.reset()
+        self.app.get('/')
+        self.app.get('/')
+        self.app.get('/health')
+
+        response = self.app.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        body = response.get_data(as_text=True)
+        self.assertIn('dashboard_request_duration_seconds_count{route="/"} 2', body)
+        self.assertIn('dashboard_request_duration_seconds_count{route="/health"} 1', body)
+        self.assertIn('dashboard_request_duration_seconds_bucket{route="/",le="+Inf"} 2', body)
+        # The /metrics request itself is still in flight while rendering
+        self.assertIn('dashboard_requests_in_flight 1', body)
+        self.assertIn('dashboard_content_cache_hit_ratio', body)
+        # Second dashboard render must be served from the markdown cache
+        self.assertNotIn('dashboard_content_cache_hits_total 0\n', body)
+
+    def test_metrics_histogram_buckets(self):
+        """Test that durations land in the right cumulative buckets of the rendered histogram."""
+        from web_dashboard import DashboardMetrics
+        metrics = DashboardMetrics(buckets=(0.005, 0.25, 1.0))
+        for duration in (0.003, 0.005, 0.2, 20.0):
+            metrics.request_started()
+            metrics.request_finished('/', duration)
+        metrics.request_started()
+        metrics.request_finished('/health', 0.001)
+        metrics.request_started()
+
+        # Per-bucket counts, last slot is +Inf; le bounds are inclusive
+        self.assertEqual(metrics._routes['/'][0], [2, 1, 0, 1])
+        self.assertEqual(metrics._routes['/'][2], 4)
+        self.assertEqual(metrics._routes['/health'][0], [1, 0, 0, 0])
+
+        body = metrics.render()
+        route_lines = [line for line in body.splitlines() if 'route="/"' in line]
+        self.assertEqual(route_lines, [
+            'dashboard_request_duration_seconds_bucket{route="/",le="0.005"} 2',
+            'dashboard_request_duration_seconds_bucket{route="/",le="0.25"} 3',
+            'dashboard_request_duration_seconds_bucket{route="/",le="1.0"} 3',
+            'dashboard_request_duration_seconds_bucket{route="/",le="+Inf"} 4',
+            'dashboard_request_duration_seconds_sum{route="/"} 20.208000',
+            'dashboard_request_duration_seconds_count{route="/"} 4',
+        ])
+        self.assertIn('dashboard_request_duration_seconds_count{route="/health"} 1', body)
+        self.assertIn('dashboard_requests_in_flight 1\n', body)
+
+        metrics.reset()
+        self.assertNotIn('dashboard_request_duration_seconds_count', metrics.render())
+
+    def test_load_test_scenario(self):
+        """Test the load generator end to end and its baseline comparison."""
+        import load_test_dashboard as lt
+        base_url, server = lt.start_local_server()
+        try:
+            result = lt.run_scenario(base_url, ['/', '/health'], concurrency=2, total_requests=20)
+        finally:
+            server.shutdown()
+
+        self.assertEqual(result['overall']['requests'], 20)
+        self.assertEqual(result['overall']['errors'], 0)
+        self.assertEqual(result['paths']['/health']['requests'], 10)
+        self.assertLessEqual(result['overall']['p50_ms'], result['overall']['p99_ms'])
+        self.assertEqual(lt.compare_to_baseline(result, result, tolerance=0.0), [])
+
+        slower = json.loads(json.dumps(result))
+        slower['overall']['rps'] = result['overall']['rps'] / 2
+        self.assertTrue(lt.compare_to_baseline(slower, result, tolerance=0.1))
+
+    def test_static_export(self):
+        """Test the static export renders pages with hashed, precompressed assets."""
+        import tempfile
+        from pathlib import Path
+        import export_static_site
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / 'site'
+            manifest = export_static_site.export_site(out)
+
+            css = manifest['assets/dashboard.css']
+            self.assertRegex(css, r'^assets/dashboard\.[0-9a-f]{10}\.css$')
+            self.assertTrue((out / css).exists())
+
+            index = (out / 'index.html').read_text(encoding='utf-8')
+            self.assertIn(f'href="{css}"', index)
+            self.assertNotIn('<style>', index)
+            self.assertIn('Skip to main content', index)
+            self.assertTrue((out / 'index.html.gz').exists())
+            self.assertTrue((out / 'docs' / 'index.html').exists())
+            # README links to docs/*.md are rewritten to the rendered pages
+            self.assertIn('href="docs/SETUP_AND_DEPLOY.html"', index)
+            # PWA icons are copied under the fixed names manifest.json uses
+            self.assertTrue((out / 'icons' / 'icon.svg').exists())
+            self.assertEqual(manifest['icons/icon.svg'], 'icons/icon.svg')
+
+            # A previous export is replaced; anything else is left alone
+            (out / 'stale.html').write_text('old', encoding='utf-8')
+            export_static_site.export_site(out, compress=False)
+            self.assertFalse((out / 'stale.html').exists())
+            other = Path(tmp) / 'other'
+            other.mkdir()
+            (other / 'keep.txt').write_text('mine', encoding='utf-8')
+            with self.assertRaises(ValueError):
+                export_static_site.export_site(other)
+            self.assertEqual((other / 'keep.txt').read_text(encoding='utf-8'), 'mine')
+
+        repo = export_static_site.REPO_ROOT
+        for unsafe in (repo, repo.parent, export_static_site.DOCS_DIR, export_static_site.DOCS_DIR / 'site'):
+            with self.assertRaises(ValueError):
+                export_static_site.prepare_output_dir(unsafe)
+        self.assertTrue((repo / 'README.md').exists())
+
+    def test_static_export_images(self):
+        """Test relative image references are resolved against the page source."""
+        from pathlib import Path
+        import export_static_site
+
+        repo = export_static_site.REPO_ROOT
+        page = ('<img src="icons/icon.svg"> <img src="https://example.com/a.png">'
+                ' <img src="../../etc/logo.png"> <img src="missing.png"> <a href="docs/X.md">x</a>')
+        self.assertEqual(export_static_site.local_images(page, repo / 'README.md'), {repo / 'icons' / 'icon.svg'})
+        self.assertEqual(
+            export_static_site.local_images('<img src="../icons/icon.svg?v=2">', repo / 'docs' / 'PAGE.md'),
+            {repo / 'icons' / 'icon.svg'},
+        )
+
+        # Referenced images get content-hashed names; other references are untouched
+        assets = {}
+        rewritten = export_static_site.rewrite_images(
+            '<img src="../icons/icon.svg?v=2" alt="i"> <img src="missing.png">', repo / 'docs' / 'PAGE.md', 'docs/PAGE.html', assets
+        )
+        hashed = assets[repo / 'icons' / 'icon.svg']
+        self.assertRegex(hashed, r'^icons/icon\.[0-9a-f]{10}\.svg$')
+        self.assertEqual(rewritten, f'<img src="../{hashed}" alt="i"> <img src="missing.png">')
+
 if __name__ == '__main__':
     unittest.main()
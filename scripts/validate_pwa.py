@@ -8,6 +8,8 @@ import os
 import json
 import sys
 
+from build_sw_precache import build_manifest, diff_manifest, read_precache_list
+
 def check_file_exists(filepath, description):
     """Check if a file exists and return status."""
     exists = os.path.exists(filepath)
@@ -67,6 +69,24 @@ def check_html_has_manifest(filepath):
         print(f"  ✗ Error reading file: {e}")
         return False
 
+def check_precache_manifest():
+    """Check that the service worker precache list matches the files on disk."""
+    current = read_precache_list()
+    if current is None:
+        print("  ✗ No generated precache list in service-worker.js")
+        print("    Run: python scripts/build_sw_precache.py")
+        return False
+
+    problems = diff_manifest(current, build_manifest())
+    if problems:
+        for problem in problems:
+            print(f"  ✗ {problem}")
+        print("    Run: python scripts/build_sw_precache.py")
+        return False
+
+    print(f"  ✓ Precache list matches files on disk ({len(current)} entries)")
+    return True
+
 def main():
     """Run PWA validation checks."""
     print("=" * 60)
@@ -133,6 +153,14 @@ def main():
     
     print()
     
+    # Check service worker precache list
+    print("Service Worker Precache:")
+    print("-" * 60)
+    if not check_precache_manifest():
+        all_checks_passed = False
+
+    print()
+
     # Check HTML files
     print("HTML Files:")
     print("-" * 60)
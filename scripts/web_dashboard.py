@@ -1,6 +1,7 @@
 import os
 import sys
-from flask import Flask, render_template_string, jsonify
+from bisect import bisect_left
+from flask import Flask, render_template_string, jsonify, request, g
 import markdown
 import time
 
@@ -9,11 +10,151 @@ app = Flask(__name__)
 # Cache storage: filepath -> (mtime, html_content)
 _content_cache = {}
 
+# Latency histogram bucket upper bounds in seconds (Prometheus defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class DashboardMetrics:
+    """
+    In-process request metrics rendered in Prometheus text format.
+
+    ⚡ Performance: Recording a request is one bisect over a short tuple and a
+    few integer increments, with no lock on the hot path, so the
+    instrumentation can stay enabled in production. Increments rely on the GIL
+    and may very rarely drop a count under heavy thread contention, which is
+    acceptable for monitoring. All formatting work is deferred to render(),
+    which only runs when /metrics is scraped.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        # route -> [per-bucket counts (last slot is +Inf), sum, count]
+        self._routes = {}
+        self.in_flight = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def request_started(self):
+        self.in_flight += 1
+
+    def request_finished(self, route, duration):
+        self.in_flight -= 1
+        entry = self._routes.get(route)
+        if entry is None:
+            # setdefault is atomic, so concurrent first requests share one entry
+            entry = self._routes.setdefault(route, [[0] * (len(self.buckets) + 1), 0.0, 0])
+        entry[0][bisect_left(self.buckets, duration)] += 1
+        entry[1] += duration
+        entry[2] += 1
+
+    def cache_hit(self):
+        self.cache_hits += 1
+
+    def cache_miss(self):
+        self.cache_misses += 1
+
+    def reset(self):
+        self._routes.clear()
+        self.in_flight = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def render(self):
+        """Return all metrics in Prometheus text exposition format (0.0.4)."""
+        routes = {r: (list(e[0]), e[1], e[2]) for r, e in list(self._routes.items())}
+        in_flight = self.in_flight
+        hits, misses = self.cache_hits, self.cache_misses
+        lookups = hits + misses
+
+        lines = [
+            "# HELP dashboard_request_duration_seconds Request latency by route.",
+            "# TYPE dashboard_request_duration_seconds histogram",
+        ]
+        for route, (counts, total, count) in sorted(routes.items()):
+            label = route.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'dashboard_request_duration_seconds_bucket{{route="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'dashboard_request_duration_seconds_bucket{{route="{label}",le="+Inf"}} {count}')
+            lines.append(f'dashboard_request_duration_seconds_sum{{route="{label}"}} {total:.6f}')
+            lines.append(f'dashboard_request_duration_seconds_count{{route="{label}"}} {count}')
+
+        lines += [
+            "# HELP dashboard_requests_in_flight Requests currently being served.",
+            "# TYPE dashboard_requests_in_flight gauge",
+            f"dashboard_requests_in_flight {in_flight}",
+            "# HELP dashboard_content_cache_hits_total Markdown cache hits.",
+            "# TYPE dashboard_content_cache_hits_total counter",
+            f"dashboard_content_cache_hits_total {hits}",
+            "# HELP dashboard_content_cache_misses_total Markdown cache misses (file read and re-rendered).",
+            "# TYPE dashboard_content_cache_misses_total counter",
+            f"dashboard_content_cache_misses_total {misses}",
+            "# HELP dashboard_content_cache_hit_ratio Fraction of markdown lookups served from cache.",
+            "# TYPE dashboard_content_cache_hit_ratio gauge",
+            f"dashboard_content_cache_hit_ratio {hits / lookups if lookups else 0.0:.6f}",
+            "# HELP dashboard_content_cache_entries Rendered documents held in the cache.",
+            "# TYPE dashboard_content_cache_entries gauge",
+            f"dashboard_content_cache_entries {len(_content_cache)}",
+        ]
+
+        rss = get_process_rss_bytes()
+        if rss is not None:
+            lines += [
+                "# HELP process_resident_memory_bytes Resident memory size in bytes.",
+                "# TYPE process_resident_memory_bytes gauge",
+                f"process_resident_memory_bytes {rss}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def get_process_rss_bytes():
+    """
+    Returns the current resident set size of this process, or None if it
+    cannot be determined on this platform.
+    """
+    try:
+        # Linux: second field of statm is resident pages
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak RSS; kilobytes on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+METRICS = DashboardMetrics()
+
 # Constants for paths to avoid re-calculating on every request
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 README_PATH = os.path.join(BASE_DIR, '..', 'README.md')
 VERIFICATION_PATH = os.path.join(BASE_DIR, '..', 'VERIFICATION.md')
 
+# Stylesheet shared by the live dashboard (inlined) and the static export
+# (written out as a content-hashed file, see export_static_site.py)
+DASHBOARD_CSS = """
+body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; line-height: 1.6; max-width: 1000px; margin: 0 auto; padding: 20px; background: #f0f2f5; color: #1c1e21; }
+.card { background: white; padding: 30px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); margin-bottom: 20px; }
+h1, h2 { color: #050505; border-bottom: 1px solid #ddd; padding-bottom: 10px; }
+pre { background: #f8f9fa; padding: 15px; border-radius: 5px; overflow-x: auto; border: 1px solid #eee; }
+.status-badge { display: inline-block; padding: 4px 12px; border-radius: 15px; font-weight: bold; background: #42b983; color: white; }
+.nav { margin-bottom: 20px; background: #fff; padding: 10px 20px; border-radius: 8px; box-shadow: 0 1px 2px rgba(0,0,0,0.1); }
+.nav a { margin-right: 15px; color: #1877f2; text-decoration: none; font-weight: bold; }
+.nav a:hover { text-decoration: underline; }
+footer { text-align: center; margin-top: 40px; color: #65676b; font-size: 0.9em; }
+img { max-width: 100%; height: auto; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 1em; }
+th, td { text-align: left; padding: 8px; border-bottom: 1px solid #ddd; }
+th { background-color: #f8f9fa; }
+.skip-link { position: absolute; top: -40px; left: 0; background: #42b983; color: white; padding: 8px; z-index: 100; transition: top 0.3s; text-decoration: none; border-radius: 0 0 8px 0; font-weight: 600; }
+.skip-link:focus { top: 0; }
+"""
+
 # HTML Template
 DASHBOARD_HTML = """
 <!DOCTYPE html>
@@ -21,29 +162,18 @@ DASHBOARD_HTML = """
 <head>
     <title>MQL5 Trading Automation Dashboard</title>
     <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; line-height: 1.6; max-width: 1000px; margin: 0 auto; padding: 20px; background: #f0f2f5; color: #1c1e21; }
-        .card { background: white; padding: 30px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); margin-bottom: 20px; }
-        h1, h2 { color: #050505; border-bottom: 1px solid #ddd; padding-bottom: 10px; }
-        pre { background: #f8f9fa; padding: 15px; border-radius: 5px; overflow-x: auto; border: 1px solid #eee; }
-        .status-badge { display: inline-block; padding: 4px 12px; border-radius: 15px; font-weight: bold; background: #42b983; color: white; }
-        .nav { margin-bottom: 20px; background: #fff; padding: 10px 20px; border-radius: 8px; box-shadow: 0 1px 2px rgba(0,0,0,0.1); }
-        .nav a { margin-right: 15px; color: #1877f2; text-decoration: none; font-weight: bold; }
-        .nav a:hover { text-decoration: underline; }
-        footer { text-align: center; margin-top: 40px; color: #65676b; font-size: 0.9em; }
-        img { max-width: 100%; height: auto; }
-        table { border-collapse: collapse; width: 100%; margin-bottom: 1em; }
-        th, td { text-align: left; padding: 8px; border-bottom: 1px solid #ddd; }
-        th { background-color: #f8f9fa; }
-        .skip-link { position: absolute; top: -40px; left: 0; background: #42b983; color: white; padding: 8px; z-index: 100; transition: top 0.3s; text-decoration: none; border-radius: 0 0 8px 0; font-weight: 600; }
-        .skip-link:focus { top: 0; }
-    </style>
+    {% if stylesheet_href %}
+    <link rel="stylesheet" href="{{ stylesheet_href }}">
+    {% else %}
+    <style>{{ dashboard_css|safe }}</style>
+    {% endif %}
 </head>
 <body>
     <a href="#status" class="skip-link">Skip to main content</a>
     <div class="nav">
         <a href="#status">System Status</a>
         <a href="#docs">Documentation</a>
+        {% if docs_index_href %}<a href="{{ docs_index_href }}">All Docs</a>{% endif %}
     </div>
 
     <div id="status" class="card">
@@ -86,9 +216,11 @@ def get_cached_markdown(filepath):
         if filepath in _content_cache:
             cached_mtime, cached_html = _content_cache[filepath]
             if cached_mtime == mtime:
+                METRICS.cache_hit()
                 return cached_html
 
         # Cache miss or file changed
+        METRICS.cache_miss()
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
 
@@ -99,6 +231,23 @@ def get_cached_markdown(filepath):
         print(f"Error reading/converting {filepath}: {e}")
         return None
 
+@app.before_request
+def start_request_timer():
+    """Record request start time and bump the in-flight gauge."""
+    g.request_start = time.perf_counter()
+    METRICS.request_started()
+
+
+@app.teardown_request
+def record_request_metrics(exc=None):
+    """Observe request latency under its route template (runs even on errors)."""
+    start = g.pop('request_start', None)
+    if start is None:
+        return
+    rule = request.url_rule
+    METRICS.request_finished(rule.rule if rule is not None else '<unmatched>', time.perf_counter() - start)
+
+
 @app.route('/health')
 def health_check():
     """Lightweight health check for load balancers."""
@@ -107,6 +256,12 @@ def health_check():
         "timestamp": time.time()
     })
 
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint."""
+    return METRICS.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 @app.after_request
 def add_security_headers(response):
     """
@@ -131,19 +286,35 @@ def add_security_headers(response):
 
     return response
 
-@app.route('/')
-def dashboard():
+def render_dashboard(stylesheet_href=None, docs_index_href=None):
+    """
+    Render the dashboard page to an HTML string.
+
+    Works outside a request context so the static exporter can reuse it.
+    When stylesheet_href is given the CSS is linked instead of inlined.
+    """
     global DASHBOARD_TEMPLATE
-    try:
-        # Use pre-calculated paths
-        html_readme = get_cached_markdown(README_PATH) or "<p>README.md not found.</p>"
-        html_verification = get_cached_markdown(VERIFICATION_PATH) or "<p>VERIFICATION.md not found.</p>"
+    # Use pre-calculated paths
+    html_readme = get_cached_markdown(README_PATH) or "<p>README.md not found.</p>"
+    html_verification = get_cached_markdown(VERIFICATION_PATH) or "<p>VERIFICATION.md not found.</p>"
+
+    # ⚡ Performance Optimization: Compile template once instead of every request
+    if DASHBOARD_TEMPLATE is None:
+        DASHBOARD_TEMPLATE = app.jinja_env.from_string(DASHBOARD_HTML)
 
-        # ⚡ Performance Optimization: Compile template once instead of every request
-        if DASHBOARD_TEMPLATE is None:
-            DASHBOARD_TEMPLATE = app.jinja_env.from_string(DASHBOARD_HTML)
+    return DASHBOARD_TEMPLATE.render(
+        html_readme=html_readme,
+        html_verification=html_verification,
+        year=2026,
+        dashboard_css=DASHBOARD_CSS,
+        stylesheet_href=stylesheet_href,
+        docs_index_href=docs_index_href,
+    )
 
-        return DASHBOARD_TEMPLATE.render(html_readme=html_readme, html_verification=html_verification, year=2026)
+@app.route('/')
+def dashboard():
+    try:
+        return render_dashboard()
     except Exception as e:
         return f"Error: {str(e)}", 500
 
@@ -4,15 +4,46 @@
 const CACHE_NAME = 'mql5-automation-v1';
 const RUNTIME_CACHE = 'mql5-runtime-v1';
 
-// Assets to cache on install
+// Assets to cache on install, with content revisions
+// PRECACHE_MANIFEST:START (generated by scripts/build_sw_precache.py - do not edit)
+const PRECACHE_VERSION = '511868206d07';
 const PRECACHE_ASSETS = [
-  '/',
-  '/index.html',
-  '/dashboard/index.html',
-  '/manifest.json',
-  '/sw-inspector.html',
-  '/offline.html'
+  {
+    "url": "/",
+    "revision": "bd098e678677532c"
+  },
+  {
+    "url": "/dashboard/index.html",
+    "revision": "9f902acc4cde8f60"
+  },
+  {
+    "url": "/icons/icon.svg",
+    "revision": "b792fcb046a3abb3"
+  },
+  {
+    "url": "/index.html",
+    "revision": "bd098e678677532c"
+  },
+  {
+    "url": "/manifest.json",
+    "revision": "97d8ef602e26902d"
+  },
+  {
+    "url": "/offline.html",
+    "revision": "9c7be018da1bb110"
+  },
+  {
+    "url": "/sw-inspector.html",
+    "revision": "379da48a4f434c51"
+  }
 ];
+// PRECACHE_MANIFEST:END
+
+// Precached responses are stored under a revisioned key, so files whose
+// revision did not change are not downloaded again when the worker updates.
+const precacheKey = (entry) => `${entry.url}?__rev=${entry.revision}`;
+const PRECACHE_KEYS = new Map(PRECACHE_ASSETS.map((entry) => [entry.url, precacheKey(entry)]));
+const EXPECTED_PRECACHE_KEYS = new Set(PRECACHE_KEYS.values());
 
 // Install event - cache essential assets
 self.addEventListener('install', (event) => {
@@ -21,8 +52,21 @@ self.addEventListener('install', (event) => {
   event.waitUntil(
     caches.open(CACHE_NAME)
       .then((cache) => {
-        console.log('[Service Worker] Precaching assets');
-        return cache.addAll(PRECACHE_ASSETS);
+        console.log('[Service Worker] Precaching assets', PRECACHE_VERSION);
+        return Promise.all(PRECACHE_ASSETS.map((entry) => {
+          const key = precacheKey(entry);
+          return cache.match(key).then((cached) => {
+            if (cached) {
+              return; // Unchanged since the previous install
+            }
+            return fetch(entry.url, { cache: 'reload' }).then((response) => {
+              if (!response.ok) {
+                throw new Error(`Precache of ${entry.url} failed: ${response.status}`);
+              }
+              return cache.put(key, response);
+            });
+          });
+        }));
       })
       .then(() => {
         console.log('[Service Worker] Installation complete');
@@ -52,6 +96,18 @@ self.addEventListener('activate', (event) => {
             })
         );
       })
+      .then(() => caches.open(CACHE_NAME))
+      .then((cache) => {
+        // Drop precache entries for old revisions and removed files
+        return cache.keys().then((requests) => Promise.all(
+          requests
+            .filter((request) => {
+              const url = new URL(request.url);
+              return !EXPECTED_PRECACHE_KEYS.has(url.pathname + url.search);
+            })
+            .map((request) => cache.delete(request))
+        ));
+      })
       .then(() => {
         console.log('[Service Worker] Activation complete');
         return self.clients.claim();
@@ -66,6 +122,19 @@ self.addEventListener('fetch', (event) => {
     return;
   }
 
+  // Precached assets: served from cache, refreshed only when their revision changes
+  const precachedKey = event.request.method === 'GET'
+    ? PRECACHE_KEYS.get(new URL(event.request.url).pathname)
+    : undefined;
+  if (precachedKey) {
+    event.respondWith(
+      caches.open(CACHE_NAME)
+        .then((cache) => cache.match(precachedKey))
+        .then((cachedResponse) => cachedResponse || fetch(event.request))
+    );
+    return;
+  }
+
   // Network-first strategy for API requests
   if (event.request.url.includes('/api/')) {
     event.respondWith(
@@ -118,7 +187,8 @@ self.addEventListener('fetch', (event) => {
           .catch((error) => {
             console.error('[Service Worker] Fetch failed:', error);
             // Return offline page if available
-            return caches.match('/offline.html') || new Response('Offline');
+            return caches.match(PRECACHE_KEYS.get('/offline.html') || '/offline.html')
+              .then((offline) => offline || new Response('Offline'));
           });
       })
   );